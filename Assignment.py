@@ -1,4 +1,9 @@
+from math import factorial
+from typing import Dict, List, Optional, Tuple
+
 import numpy as np
+from Metrics import ASSIGNMENTS
+from Regulation import Regulation
 from ScoreMatrix import ScoreMatrix
 from Util import Util
 
@@ -6,10 +11,12 @@ from aiwolf import Agent, GameInfo, GameSetting, Role, Status
 
 
 class Assignment:
+    # role_table のキャッシュ
+    role_tables: Dict[Tuple[Tuple[int, ...], int], np.ndarray] = {}
 
     def __init__(self, game_info: GameInfo, game_setting: GameSetting, _player, _assignment) -> None:
         self.N = game_setting.player_num
-        self.M = len(game_info.existing_role_list)
+        self.M = Regulation.of(game_setting.role_num_map).M
         self.player = _player
         self.me = _player.me
         self.score = 0.0
@@ -51,6 +58,7 @@ class Assignment:
         
     # 役職の割り当ての評価値を計算する
     def evaluate(self, score_matrix: ScoreMatrix, debug = False) -> float:
+        ASSIGNMENTS.inc()
         score = 0.0
 
         # 既に負けているような割り当ての評価値は-inf
@@ -73,6 +81,11 @@ class Assignment:
         #     if score_matrix.get_score(i, self.assignment[i], i, self.assignment[i]) == -float("inf"):
         #         return -float("inf")
 
+        # デバッグ表示をしない場合は ScoreMatrix の実装 (SparseScoreMatrix なら変更された要素だけ) で計算する
+        if not debug:
+            self.score = score_matrix.evaluate_assignment([score_matrix.rtoi[r] for r in self.assignment])
+            return self.score
+
         for i in range(self.N):
             for j in range(self.N):
                 # if i == j:
@@ -108,3 +121,144 @@ class Assignment:
             self.assignment[i], self.assignment[j] = self.assignment[j], self.assignment[i]
         
         self.hash = hash(self)
+
+    # 役職の割り当てを全列挙した表 (K, N) を返す
+    # role_list: 役職番号のリスト (ScoreMatrix.role_list)
+    # 割り当ての数が max_count を超える場合は、乱数で max_count 個を選ぶ
+    @staticmethod
+    def role_table(role_list: List[int], max_count: int = 100000) -> np.ndarray:
+        key = (tuple(sorted(role_list)), max_count)
+        if key in Assignment.role_tables:
+            return Assignment.role_tables[key]
+        if Assignment.count(role_list) <= max_count:
+            table = np.array(list(Util.unique_permutations(sorted(role_list))), dtype=np.intp)
+        else:
+            rng = np.random.default_rng(0)
+            table = np.array([rng.permutation(role_list) for _ in range(max_count)], dtype=np.intp)
+            table = np.unique(table, axis=0)
+        table.setflags(write=False)
+        Assignment.role_tables[key] = table
+        return table
+
+    # 役職の割り当ての数 (role_list の異なる並べ方の数)
+    @staticmethod
+    def count(role_list: List[int]) -> int:
+        count = factorial(len(role_list))
+        for r in set(role_list):
+            count //= factorial(role_list.count(r))
+        return count
+
+    # 事後分布 (スコアを 1/10 倍した相対確率の対数) から役職の割り当てを count 個引く (全列挙できない場合の role_table の代わり)
+    # count // sweeps 本の連鎖を、役職の候補が少ないエージェントから既に決めたエージェントとの項を含めたスコアの比で引いた割り当てから始め、
+    # 2人の役職を入れ替える MCMC (Metropolis 法) を burn_in + sweeps 回 (1回で N 回入れ替えを試す) 回して、burn_in 以降の状態を集める
+    # alive (N,) と werewolf を指定すると、負けている割り当て (人狼が生存者の半数以上) へは移らない
+    # 戻り値: (重複を除いた割り当ての表 (K, N), 各割り当てを引いた回数 (K,))
+    @staticmethod
+    def sample_table(score_matrix: np.ndarray, role_list: List[int], count: int, rng: np.random.Generator,
+                     alive: Optional[np.ndarray] = None, werewolf: int = -1, sweeps: int = 20,
+                     burn_in: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        N, M = score_matrix.shape[0], score_matrix.shape[1]
+        i = np.arange(N)
+        r = np.arange(M)
+        # -inf は差を取れるように十分小さい値にする
+        score = np.maximum(score_matrix, -1e9)
+        unary = score[i[:, None], r[None, :], i[:, None], r[None, :]]
+        # pair[a, ra, b, rb]: a と b の組の項 (a == b は 0、pair[a, ra] は pair[:, :, a, ra] と同じ)
+        pair = score + score.transpose(2, 3, 0, 1)
+        pair[i, :, i, :] = 0
+        chains = max(1, count // sweeps)
+        c = np.arange(chains)
+        state = np.empty((chains, N), dtype=np.intp)
+        remaining = np.tile(np.bincount(role_list, minlength=M), (chains, 1))
+        # value[c, a, r]: 連鎖 c で a が r のときの、a の単項と他のエージェントとの項の合計
+        value = np.broadcast_to(unary, (chains, N, M)).copy()
+        feasible = (unary > -1e9 / 2).sum(axis=1)
+        for k in np.argsort(feasible, kind="stable"):
+            logits = value[:, k, :] / 10
+            logits[remaining == 0] = -np.inf
+            cum = np.exp(logits - logits.max(axis=1, keepdims=True)).cumsum(axis=1)
+            choice = (cum > rng.random((chains, 1)) * cum[:, -1:]).argmax(axis=1)
+            state[:, k] = choice
+            remaining[c, choice] -= 1
+            value += pair[k, choice]
+        lost = alive is not None and werewolf >= 0
+        if lost:
+            alive = alive.astype(int)
+            half = alive.sum() / 2
+            wolves = ((state == werewolf) * alive).sum(axis=1)
+        movable = np.nonzero(feasible > 1)[0]
+        samples = []
+        for sweep in range(burn_in + sweeps):
+            for _ in range(N if len(movable) > 1 else 0):
+                x = rng.integers(len(movable), size=chains)
+                a = movable[x]
+                b = movable[(x + 1 + rng.integers(len(movable) - 1, size=chains)) % len(movable)]
+                ra, rb = state[c, a], state[c, b]
+                # a と b の役職を入れ替えたときのスコアの差 (value に含まれる a と b の組の項を直す)
+                delta = (value[c, a, rb] - value[c, a, ra] + value[c, b, ra] - value[c, b, rb]
+                         + pair[a, rb, b, ra] - pair[a, rb, b, rb] - pair[b, ra, a, ra] + pair[b, rb, a, ra])
+                accept = np.log(rng.random(chains)) < delta / 10
+                if lost:
+                    change = (alive[a] - alive[b]) * ((rb == werewolf).astype(int) - (ra == werewolf))
+                    accept &= (wolves + change < half) | (wolves >= half)
+                    wolves += change * accept
+                c1, a, b, ra, rb = c[accept], a[accept], b[accept], ra[accept], rb[accept]
+                state[c1, a] = rb
+                state[c1, b] = ra
+                value[c1] += pair[a, rb] - pair[a, ra] + pair[b, ra] - pair[b, rb]
+            if sweep >= burn_in:
+                samples.append(state.copy())
+        samples = np.concatenate(samples)
+        # 割り当てを M 進数の整数にして重複を数える
+        _, index, counts = np.unique(samples @ M ** np.arange(N, dtype=np.int64), return_index=True, return_counts=True)
+        table = samples[index]
+        if lost:
+            # 負けている割り当てから始まった連鎖の状態は、他に割り当てがあれば除く
+            won = ((table == werewolf) * alive).sum(axis=1) < half
+            if won.any():
+                table, counts = table[won], counts[won]
+        return table, counts
+
+    # 割り当ての表の各行の評価値をまとめて計算する (evaluate のベクトル版、負け判定はしない)
+    # score_matrix: (N, M, N, M) または バッチ (B, N, M, N, M) の配列
+    # 戻り値: (K,) または (B, K) の配列
+    @staticmethod
+    def evaluate_table(score_matrix: np.ndarray, table: np.ndarray, chunk_size: int = 1 << 22) -> np.ndarray:
+        N = table.shape[1]
+        i = np.arange(N)[None, :, None]
+        j = np.arange(N)[None, None, :]
+        batch_shape = score_matrix.shape[:-4]
+        ASSIGNMENTS.inc(len(table) * int(np.prod(batch_shape)))
+        scores = np.empty(batch_shape + (len(table),), dtype=score_matrix.dtype)
+        # 中間配列 (..., chunk, N, N) が大きくなりすぎないように分割する
+        chunk = max(1, chunk_size // (N * N * max(1, int(np.prod(batch_shape)))))
+        for start in range(0, len(table), chunk):
+            t = table[start:start + chunk]
+            scores[..., start:start + chunk] = score_matrix[..., i, t[:, :, None], j, t[:, None, :]].sum(axis=(-2, -1))
+        return scores
+
+    # 割り当ての表の各行の確率 (..., K) を計算する
+    # スコアは 1/10 倍して相対確率の対数にする
+    # alive (..., N) を指定すると、既に負けている割り当て (人狼が生存者の半数以上) を除く
+    @staticmethod
+    def weights(score_matrix: np.ndarray, table: np.ndarray, alive: Optional[np.ndarray] = None,
+                werewolf: int = -1) -> np.ndarray:
+        scores = Assignment.evaluate_table(score_matrix, table) / 10
+        if alive is not None and werewolf >= 0:
+            alive = alive.astype(bool)
+            werewolf_num = (alive[..., None, :] & (table == werewolf)).sum(axis=-1)
+            scores[werewolf_num >= alive.sum(axis=-1)[..., None] / 2] = -float("inf")
+        top = scores.max(axis=-1, keepdims=True)
+        top[~np.isfinite(top)] = 0
+        weights = np.exp(scores - top)
+        total = weights.sum(axis=-1, keepdims=True)
+        total[total == 0] = 1
+        weights /= total
+        return weights
+
+    # 割り当ての表から各エージェントの役職の周辺確率 (..., N, M) を計算する
+    @staticmethod
+    def marginals(score_matrix: np.ndarray, table: np.ndarray, M: int, alive: Optional[np.ndarray] = None,
+                  werewolf: int = -1) -> np.ndarray:
+        weights = Assignment.weights(score_matrix, table, alive, werewolf)
+        return np.einsum("...k,knm->...nm", weights, np.eye(M)[table])
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from Budget import Budget
+from EventLog import WARNING, EventLog
+from Protocol import DecodedPacket, PacketHandler, decode
+from Util import Util
+
+from aiwolf import AbstractPlayer
+
+# 返答を待たないリクエスト (サーバはすぐに次のリクエストを送ってくる)
+NO_RESPONSE_REQUESTS = {"INITIALIZE", "DAILY_INITIALIZE", "DAILY_FINISH", "FINISH"}
+
+
+class AsyncClient:
+    """asyncio version of aiwolf.TcpipClient.
+
+    Packets are read and decoded (JSON and GameInfo) on the event loop while the player works on the previous request
+    in a single worker thread, so the player is never called concurrently.
+    When no request is waiting, the player's speculate() (if it has one) runs in the worker thread to prepare
+    the next decision; it should return quickly, because the next request waits for it.
+    """
+
+    def __init__(self, player: AbstractPlayer, name: str, host: str, port: int, request_role: str = "none",
+                 limit: int = 1 << 24) -> None:
+        self.handler = PacketHandler(player, name, request_role)
+        self.host = host
+        self.port = port
+        # 1行 (1パケット) の最大長
+        self.limit = limit
+        self.speculate: Optional[Callable[[], None]] = getattr(player, "speculate", None)
+
+    def connect(self) -> None:
+        asyncio.run(self.run())
+
+    async def run(self) -> None:
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=self.limit)
+        queue: "asyncio.Queue[Optional[DecodedPacket]]" = asyncio.Queue()
+        receiver = asyncio.create_task(self.receive(reader, queue))
+        loop = asyncio.get_running_loop()
+        # 実行中または実行待ちの先読み
+        speculation: Optional[asyncio.Future] = None
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            try:
+                while True:
+                    decoded = await queue.get()
+                    # まだ始まっていない先読みは取り消す (始まっていれば、終わるまで次のリクエストを待たせる)
+                    if speculation is not None:
+                        speculation.cancel()
+                        speculation = None
+                    if decoded is None:
+                        break
+                    response = await loop.run_in_executor(executor, self.process, decoded)
+                    if response is not None:
+                        writer.write((response + "\n").encode("utf-8"))
+                        await writer.drain()
+                    # 次のリクエストが来ていなければ、次の行動を先に計算しておく (結果は待たず、例外は speculated で記録する)
+                    if self.speculate is not None and queue.empty() and decoded.request not in NO_RESPONSE_REQUESTS:
+                        speculation = loop.run_in_executor(executor, self.speculate)
+                        speculation.add_done_callback(AsyncClient.speculated)
+            finally:
+                receiver.cancel()
+                writer.close()
+
+    # 先読みで起きた例外を記録する (先読みの失敗はリクエストの処理には影響しない)
+    @staticmethod
+    def speculated(future: "asyncio.Future[None]") -> None:
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is not None:
+            Util.error_print("speculate:", repr(exc))
+            EventLog.log("speculate", WARNING, "speculate_failed", error=repr(exc))
+
+    # パケットを読み込んで decode し、キューに入れる (接続が切れたら None を入れる)
+    async def receive(self, reader: asyncio.StreamReader, queue: "asyncio.Queue[Optional[DecodedPacket]]") -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                arrival = time.perf_counter()
+                line = line.strip()
+                if line:
+                    await queue.put(decode(json.loads(line), arrival))
+        finally:
+            await queue.put(None)
+
+    def process(self, decoded: DecodedPacket) -> Optional[str]:
+        # 制限時間は、前のリクエストの処理中に届いた場合も届いた時点から数える (Budget)
+        Budget.arrive(decoded.request, decoded.arrival)
+        self.handler.apply(decoded)
+        return self.handler.respond(decoded.request)
@@ -0,0 +1,126 @@
+from typing import Dict, List, Optional
+
+from Belief import Belief
+
+from aiwolf import Agent, Content, GameInfo, Role, Topic
+from aiwolf.constant import AGENT_NONE
+
+# 襲撃して得られる価値 (役職ごとの重み)
+# 能力者ほど価値が高く、狂人は味方なので負にする
+ROLE_VALUE: Dict[Role, float] = {
+    Role.SEER: 3.0,
+    Role.BODYGUARD: 2.0,
+    Role.MEDIUM: 1.5,
+    Role.VILLAGER: 1.0,
+    Role.POSSESSED: -1.0,
+}
+# 護衛先の選ばれやすさ: 占い・霊媒COしているエージェントは何倍守られやすいか
+GUARD_CO_WEIGHT = 3.0
+# 前夜の襲撃が護衛で失敗した場合、同じエージェントが何倍守られやすいか (連続護衛)
+GUARD_REPEAT_WEIGHT = 2.0
+
+
+class AttackPlanner:
+    """Chooses the attack target of the werewolves and converges the team on it through whispers.
+
+    Each living human is valued by its role probabilities (marginals of the werewolf's ScoreMatrix)
+    times the probability that it is not guarded. Values are cached per state of the Belief,
+    so repeated whispers in a night cost only the scan of the new whispers.
+    Every werewolf whispers its best target first; afterwards all of them follow the same rule
+    on the shared whisper list (most declared target, ties broken by the smallest agent index of the declarer),
+    so they agree by the second whisper turn.
+    """
+
+    def __init__(self, belief: Belief) -> None:
+        self.belief = belief
+        self.me: Agent = AGENT_NONE
+        self.allies: List[Agent] = []
+        # 前夜に襲撃したエージェント
+        self.last_target: Agent = AGENT_NONE
+        # その日の人狼ごとの最新の襲撃宣言
+        self.declared: Dict[Agent, Agent] = {}
+        self.whisper_day = -1
+        self.whisper_head = 0
+
+    def start(self, game_info: GameInfo) -> None:
+        self.me = game_info.me
+        self.allies = [a for a, r in game_info.role_map.items() if r == Role.WEREWOLF]
+        self.last_target = AGENT_NONE
+        self.declared.clear()
+        self.whisper_day = -1
+        self.whisper_head = 0
+
+    def candidates(self, game_info: GameInfo) -> List[Agent]:
+        return [a for a in game_info.alive_agent_list if a not in self.allies]
+
+    # 各エージェントが護衛されている確率
+    def guard_probability(self, game_info: GameInfo) -> Dict[Agent, float]:
+        candidates = self.candidates(game_info)
+        if Role.BODYGUARD not in game_info.existing_role_list or not candidates:
+            return {a: 0.0 for a in candidates}
+        marginals = self.belief.marginals()
+        comingout_map = self.belief.public.comingout_map
+        # 前夜の襲撃で誰も死ななかった場合は護衛が成功している
+        guarded_last = self.last_target if game_info.day >= 2 and not game_info.last_dead_agent_list else AGENT_NONE
+        weight: Dict[Agent, float] = {}
+        for a in candidates:
+            w = GUARD_CO_WEIGHT if comingout_map.get(a) in (Role.SEER, Role.MEDIUM) else 1.0
+            weight[a] = w * (GUARD_REPEAT_WEIGHT if a == guarded_last else 1.0)
+        total = sum(weight.values())
+        bodyguard = {a: self.belief.probability(a, Role.BODYGUARD, marginals) for a in candidates}
+        bodyguard_alive = sum(bodyguard.values())
+        # 狩人は自分を護衛できないので、a 以外の生存者が狩人である確率を掛ける
+        return {a: max(0.0, bodyguard_alive - bodyguard[a]) * weight[a] / total for a in candidates}
+
+    # 各候補を襲撃する価値 (belief の状態ごとにキャッシュする)
+    def values(self, game_info: GameInfo) -> Dict[Agent, float]:
+        def compute() -> Dict[Agent, float]:
+            marginals = self.belief.marginals()
+            guard = self.guard_probability(game_info)
+            return {a: sum(self.belief.probability(a, r, marginals) * v for r, v in ROLE_VALUE.items()) * (1 - guard[a])
+                    for a in self.candidates(game_info)}
+        return self.belief.cached("attack_values", compute)
+
+    # 自分だけで決めた襲撃先 (価値が同じなら番号の小さいエージェント)
+    def best(self, game_info: GameInfo) -> Agent:
+        values = self.values(game_info)
+        if not values:
+            return AGENT_NONE
+        return max(values, key=lambda a: (values[a], -a.agent_idx))
+
+    # 新しい囁きから人狼の襲撃宣言を読む
+    def read_whispers(self, game_info: GameInfo) -> None:
+        if game_info.day != self.whisper_day:
+            self.whisper_day = game_info.day
+            self.whisper_head = 0
+            self.declared.clear()
+        for i in range(self.whisper_head, len(game_info.whisper_list)):
+            whisper = game_info.whisper_list[i]
+            content: Content = Content.compile(whisper.text)
+            if content.topic == Topic.ATTACK and whisper.agent in self.allies:
+                self.declared[whisper.agent] = content.target
+        self.whisper_head = len(game_info.whisper_list)
+
+    # 人狼全体で合わせる襲撃先 (新しい囁きを読む以外は状態を変えないので先読みに使える)
+    # 宣言された候補のうち宣言数が最も多いもの (同数なら宣言した人狼の番号が小さいもの)、宣言がなければ自分の最善
+    def team_target(self, game_info: GameInfo) -> Agent:
+        self.read_whispers(game_info)
+        candidates = self.candidates(game_info)
+        declared = {w: t for w, t in self.declared.items() if t in candidates}
+        if not declared:
+            return self.best(game_info)
+        count: Dict[Agent, int] = {}
+        first: Dict[Agent, int] = {}
+        for w in sorted(declared, key=lambda a: a.agent_idx):
+            t = declared[w]
+            count[t] = count.get(t, 0) + 1
+            first.setdefault(t, w.agent_idx)
+        return max(count, key=lambda t: (count[t], -first[t]))
+
+    # 囁きで宣言する襲撃先 (前回の自分の宣言から変わらなければ None)
+    def whisper(self, game_info: GameInfo) -> Optional[Agent]:
+        target = self.team_target(game_info)
+        if target == AGENT_NONE or self.declared.get(self.me) == target:
+            return None
+        self.declared[self.me] = target
+        return target
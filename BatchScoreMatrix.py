@@ -0,0 +1,95 @@
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from Assignment import Assignment
+from Regulation import Regulation
+from ScoreMatrix import START_BELIEF, ScoreMatrix
+
+from aiwolf import Agent, Role
+
+# バッチの行の指定: 1行 (int)、スライス、または行番号の配列
+Rows = Union[int, slice, Sequence[int], np.ndarray]
+
+
+class BatchScoreMatrix:
+    """B score matrices of the same setting stacked as a (B, N, M, N, M) tensor.
+
+    get_score, set_score and add_score follow the semantics of ScoreMatrix and apply to each of the given rows.
+    """
+
+    def __init__(self, B: int, regulation: Regulation, tensor: Optional[np.ndarray] = None) -> None:
+        self.B = B
+        self.regulation = regulation
+        self.N = regulation.N
+        self.M = regulation.M
+        self.rtoi: Dict[Role, int] = regulation.rtoi
+        self.role_list: List[int] = list(regulation.role_list)
+        # 新しいバッチは ScoreMatrix.init_scores と同じ初期値から始める
+        self.score_matrix: np.ndarray = tensor if tensor is not None else np.full((B, self.N, self.M, self.N, self.M), START_BELIEF)
+
+    # ScoreMatrix (または同じ形の配列) を積み重ねる
+    @staticmethod
+    def stack(score_matrices: List[ScoreMatrix], arrays: Optional[List[np.ndarray]] = None) -> "BatchScoreMatrix":
+        first = score_matrices[0]
+        tensor = np.stack(arrays if arrays is not None else [sm.to_dense() for sm in score_matrices])
+        return BatchScoreMatrix(len(tensor), first.regulation, tensor)
+
+    def __len__(self) -> int:
+        return self.B
+
+    def __getitem__(self, b: int) -> np.ndarray:
+        return self.score_matrix[b]
+
+    def _index(self, agent) -> int:
+        return agent.agent_idx-1 if type(agent) is Agent else agent
+
+    def _role_index(self, role) -> int:
+        return self.rtoi.get(role, -1) if type(role) is Role else role
+
+    # スコアの取得 (指定した行のスコアの配列を返す)
+    def get_score(self, b: Rows, agent1: Agent, role1: Role, agent2: Agent, role2: Role) -> np.ndarray:
+        i, j = self._index(agent1), self._index(agent2)
+        ri, rj = self._role_index(role1), self._role_index(role2)
+        if ri >= self.M or rj >= self.M or ri < 0 or rj < 0: # 存在しない役職の場合はスコアを-infにする (5人村の場合)
+            return np.full(np.shape(self.score_matrix[b, 0, 0, 0, 0]), -float('inf'))
+        return self.score_matrix[b, i, ri, j, rj]
+
+    # スコアの設定
+    # score: スカラー または 行ごとの配列
+    def set_score(self, b: Rows, agent1: Agent, role1: Role, agent2: Agent, role2: Role, score) -> None:
+        i, j = self._index(agent1), self._index(agent2)
+        ri, rj = self._role_index(role1), self._role_index(role2)
+        if ri >= self.M or rj >= self.M or ri < 0 or rj < 0: # 存在しない役職の場合はスコアを設定しない (5人村の場合)
+            return
+        score = np.asarray(score, dtype=self.score_matrix.dtype)
+        if score.ndim == 0:
+            if score == float('inf'):
+                self.score_matrix[b, i, :, j, :] = -float('inf')
+                self.score_matrix[b, i, ri, j, rj] = 0
+            else:
+                self.score_matrix[b, i, ri, j, rj] = np.clip(score, -100, 100)
+            return
+        # 行ごとにスコアが異なる場合: +inf の行だけ ScoreMatrix.set_score と同じ処理をする
+        rows = np.arange(self.B)[b]
+        inf = score == float('inf')
+        if inf.any():
+            self.score_matrix[rows[inf], i, :, j, :] = -float('inf')
+        self.score_matrix[rows, i, ri, j, rj] = np.where(inf, 0, np.clip(score, -100, 100))
+
+    # スコアの加算
+    # role1, role2: Role, int, Species, Side or List
+    def add_score(self, b: Rows, agent1: Agent, role1, agent2: Agent, role2, score) -> None:
+        for r1 in ScoreMatrix.resolve_roles(role1, self.regulation):
+            for r2 in ScoreMatrix.resolve_roles(role2, self.regulation):
+                self.set_score(b, agent1, r1, agent2, r2, self.get_score(b, agent1, r1, agent2, r2) + score)
+
+    # スコアの加算をまとめて行う
+    def add_scores(self, b: Rows, agent: Agent, score_dict: Dict[Role, float]) -> None:
+        for key, value in score_dict.items():
+            self.add_score(b, agent, key, agent, key, value)
+
+    # 全行の役職の周辺確率 (B, N, M)
+    # alive: (B, N) の生存フラグ。指定すると既に負けている割り当てを除く
+    def marginals(self, alive: Optional[np.ndarray] = None, max_count: int = 2000) -> np.ndarray:
+        table = Assignment.role_table(self.role_list, max_count)
+        return Assignment.marginals(self.score_matrix, table, self.M, alive, self.rtoi[Role.WEREWOLF])
@@ -0,0 +1,135 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from Assignment import Assignment
+from Budget import Budget
+from GameLog import (GameInfoReader, ScoreMatrixHandler, changes_scores,
+                     dispatch)
+from Util import Util
+
+from aiwolf import Agent, GameInfo, GameSetting, Role, Status
+
+
+class Belief:
+    """ScoreMatrix of a running game, kept up to date from the GameInfo given to the agent.
+
+    The GameInfo is turned into records (GameInfoReader) and fed to a ScoreMatrixHandler,
+    so the agent infers in the same way as the replay of game logs.
+    Marginal probabilities of the roles are computed on demand and cached until a new record changes the ScoreMatrix
+    or the public information (talks such as Skip and Over, and whispers, do not).
+    """
+
+    def __init__(self, sparse: bool = False, max_count: int = 20000, samples: int = 5000) -> None:
+        self.reader = GameInfoReader()
+        self.handler = ScoreMatrixHandler(sparse)
+        # 周辺確率の計算で全列挙する割り当ての数の上限
+        self.max_count = max_count
+        # 全列挙できない場合に事後分布から引く割り当ての数
+        self.samples = samples
+        self.rng = np.random.default_rng()
+        # ScoreMatrix か公開情報を変えるレコードを反映するたびに増やす (キャッシュの鍵)
+        self.version = 0
+        self.cache: Dict[str, Tuple[int, object]] = {}
+
+    def start(self, game_info: GameInfo, game_setting: GameSetting) -> None:
+        self.cache.clear()
+        self.version += 1
+        # 過去のゲームの対戦相手の行動を事前スコアに使う
+        self.handler.stats = Util.stats
+        dispatch(self.reader.start_game(game_info, game_setting), self.handler)
+
+    def update(self, game_info: GameInfo) -> None:
+        records = self.reader.update(game_info)
+        if records:
+            if changes_scores(records):
+                self.version += 1
+            dispatch(records, self.handler)
+
+    @property
+    def score_matrix(self):
+        return self.handler.score_matrix
+
+    # 公開情報 (CO, 占い結果など) を反映したプレイヤーの代用品 (ReplayPlayer)
+    @property
+    def public(self):
+        return self.handler.player
+
+    # 今の version で計算済みの値を返す (無ければ compute() を呼んで保存する)
+    def cached(self, name: str, compute):
+        entry = self.cache.get(name)
+        if entry is not None and entry[0] == self.version:
+            return entry[1]
+        value = compute()
+        self.cache[name] = (self.version, value)
+        return value
+
+    def alive(self) -> np.ndarray:
+        game_info = self.handler.game_info
+        return np.array([game_info.status_map[a] == Status.ALIVE for a in game_info.agent_list])
+
+    # 役職が確定しているエージェント (自分、仲間の人狼、占い結果の黒など) と、残りの役職のリスト
+    def fixed_roles(self, dense: np.ndarray) -> Tuple[Dict[int, int], List[int]]:
+        sm = self.score_matrix
+        N, M = sm.N, sm.M
+        i = np.arange(N)
+        unary = dense[i[:, None], np.arange(M)[None, :], i[:, None], np.arange(M)[None, :]]
+        rest: List[int] = sm.role_list()
+        fixed: Dict[int, int] = {}
+        for k in range(N):
+            feasible = np.nonzero(np.isfinite(unary[k]))[0]
+            if len(feasible) == 1 and int(feasible[0]) in rest:
+                fixed[k] = int(feasible[0])
+                rest.remove(fixed[k])
+        return fixed, rest
+
+    # 割り当ての表 (K, N)
+    # 役職が確定しているエージェントは固定して、残りのエージェントだけを並べ替える
+    def role_table(self, dense: np.ndarray, max_count: Optional[int] = None) -> np.ndarray:
+        N = self.score_matrix.N
+        fixed, rest = self.fixed_roles(dense)
+        sub = Assignment.role_table(rest, max_count if max_count is not None else self.max_count) if rest else np.empty((1, 0), dtype=np.intp)
+        table = np.empty((len(sub), N), dtype=np.intp)
+        free = [k for k in range(N) if k not in fixed]
+        table[:, free] = sub
+        for k, r in fixed.items():
+            table[:, k] = r
+        return table
+
+    # 割り当ての事後分布: (割り当ての表 (K, N), 各割り当ての確率 (K,))
+    # 割り当てが max_count 個より多ければ、スコアが変わるたびに事後分布から引き直す (Assignment.sample_table)
+    # リクエストの残り時間 (Budget) がいつもの計算時間に足りなければ、割り当ての数を減らして近似する
+    def posterior(self) -> Tuple[np.ndarray, np.ndarray]:
+        def compute() -> Tuple[np.ndarray, np.ndarray]:
+            sm = self.score_matrix
+            dense = sm.to_dense()
+            scale = 1 if not Budget.short("posterior") else 10
+            max_count = self.max_count // scale
+            Budget.enter("posterior")
+            try:
+                if Assignment.count(self.fixed_roles(dense)[1]) <= max_count:
+                    table = self.role_table(dense, max_count)
+                    weights = Assignment.weights(dense, table, self.alive(), sm.rtoi[Role.WEREWOLF])
+                else:
+                    table, counts = Assignment.sample_table(dense, sm.role_list(), self.samples // scale, self.rng,
+                                                            self.alive(), sm.rtoi[Role.WEREWOLF])
+                    weights = counts / counts.sum()
+            finally:
+                # 近似した分布の所要時間は、全部の割り当てを使った場合の時間に直して記録する
+                Budget.leave("posterior", scale)
+            return table, weights
+        return self.cached("posterior", compute)
+
+    # 各エージェントの役職の周辺確率 (N, M)
+    def marginals(self) -> np.ndarray:
+        def compute() -> np.ndarray:
+            table, weights = self.posterior()
+            return np.einsum("k,knm->nm", weights, np.eye(self.score_matrix.M)[table])
+        return self.cached("marginals", compute)
+
+    # agent が role である確率 (役職が存在しない場合は 0)
+    def probability(self, agent: Agent, role: Role, marginals: Optional[np.ndarray] = None) -> float:
+        r = self.score_matrix.rtoi[role]
+        if r < 0 or r >= self.score_matrix.M:
+            return 0.0
+        marginals = marginals if marginals is not None else self.marginals()
+        return float(marginals[agent.agent_idx - 1, r])
@@ -0,0 +1,162 @@
+import time
+from typing import Dict, Optional
+
+from EventLog import WARNING, EventLog
+from Metrics import LATENCY, TIMEOUTS, Histogram
+
+# 返答を待たないリクエスト (制限時間は response_timeout)
+RESPONSE_REQUESTS = {"INITIALIZE", "DAILY_INITIALIZE", "DAILY_FINISH", "FINISH"}
+
+
+class Deadline:
+    """Time left to answer the current request, measured from the arrival of its packet.
+
+    remaining() is one call of time.perf_counter, so inference engines can poll it in their loops.
+    """
+
+    def __init__(self, start: float, limit_ms: float) -> None:
+        self.start = start
+        self.end = start + limit_ms / 1000
+
+    # 残り時間 (ms)
+    def remaining(self) -> float:
+        return (self.end - time.perf_counter()) * 1000
+
+    # パケットの到着からの経過時間 (ms)
+    def elapsed(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    # expected_ms かかる処理をする時間が残っていなければ True
+    def short(self, expected_ms: float) -> bool:
+        return self.remaining() < expected_ms
+
+
+# 制限の無い Deadline (リクエストを処理していない間、ベンチマーク、リプレイ)
+UNLIMITED = Deadline(0.0, float("inf"))
+
+
+class Budget:
+    """Time budget of the request being answered, shared by all entry points of the agent.
+
+    The deadline starts when the packet arrives (AsyncClient stamps it with Budget.arrive),
+    or else when SamplePlayer.update is called for the request, and ends at the server timeout minus a margin,
+    so the time spent in update counts against the action that follows.
+    The latency of each entry point (update, talk, vote, ...) is tracked as an exponential moving average
+    of the mean and of the absolute deviation; expected(entry) is their mean + 2 deviations.
+    An entry run on a reduced workload records its latency scaled up to the full workload (leave(entry, scale)),
+    and an entry skipped for lack of time decays its estimate (skip), so one slow measurement cannot make
+    short(entry) true for the rest of the process.
+    Requests answered after the deadline are counted in overruns and logged as "time" warnings.
+    """
+
+    # サーバの制限時間 (ms) と、通信などのために残しておく余裕 (ms)
+    action_timeout: float = 3000
+    response_timeout: float = 6000
+    margin: float = 300
+    # 移動平均の重み
+    alpha: float = 0.2
+    # エントリポイントごとの所要時間の移動平均と平均偏差 (ms)
+    mean: Dict[str, float] = {}
+    deviation: Dict[str, float] = {}
+    # エントリポイントごとの制限時間の超過回数
+    overruns: Dict[str, int] = {}
+    # 処理中のリクエストの Deadline と、到着を記録したパケットの時刻・リクエスト
+    current: Deadline = UNLIMITED
+    arrival: Optional[float] = None
+    request: str = ""
+    # 処理中のエントリポイントと開始時刻
+    entered: Dict[str, float] = {}
+    # 自分の役職と、エントリポイントごとの所要時間のヒストグラム (役職が変わるまで使い回す)
+    role: str = ""
+    histograms: Dict[str, Histogram] = {}
+
+    @staticmethod
+    def configure(action_timeout: Optional[float] = None, response_timeout: Optional[float] = None) -> None:
+        if action_timeout:
+            Budget.action_timeout = action_timeout
+        if response_timeout:
+            Budget.response_timeout = response_timeout
+
+    # ゲームの開始時に自分の役職を設定する (所要時間のヒストグラムを役職ごとに分ける)
+    @staticmethod
+    def set_role(role: str) -> None:
+        if role != Budget.role:
+            Budget.role = role
+            Budget.histograms = {}
+
+    # パケットの到着時刻を記録する (次の start で Deadline の起点にする)
+    @staticmethod
+    def arrive(request: str, arrival: Optional[float] = None) -> None:
+        Budget.arrival = arrival if arrival is not None else time.perf_counter()
+        Budget.request = request
+
+    # リクエストの処理を始める
+    # 到着が記録されていなければ今を起点にし、リクエストが分からなければ短い方の制限時間 (action_timeout) を使う
+    @staticmethod
+    def start() -> Deadline:
+        start = Budget.arrival if Budget.arrival is not None else time.perf_counter()
+        limit = Budget.response_timeout if Budget.request in RESPONSE_REQUESTS else Budget.action_timeout
+        Budget.arrival = None
+        Budget.request = ""
+        Budget.current = Deadline(start, limit - Budget.margin)
+        return Budget.current
+
+    # リクエストを処理していない間 (先読みなど) は制限しない
+    @staticmethod
+    def idle() -> None:
+        Budget.current = UNLIMITED
+
+    @staticmethod
+    def deadline() -> Deadline:
+        return Budget.current
+
+    # エントリポイントの処理にかかると見込まれる時間 (ms)
+    @staticmethod
+    def expected(entry: str) -> float:
+        return Budget.mean.get(entry, 0.0) + 2 * Budget.deviation.get(entry, 0.0)
+
+    # entry の処理をする時間が残っていなければ True
+    @staticmethod
+    def short(entry: str) -> bool:
+        return Budget.current.short(Budget.expected(entry))
+
+    # 所要時間の移動平均と平均偏差を更新する
+    @staticmethod
+    def observe(entry: str, latency: float) -> None:
+        mean = Budget.mean.get(entry)
+        if mean is None:
+            Budget.mean[entry] = latency
+            Budget.deviation[entry] = 0.0
+        else:
+            Budget.mean[entry] = mean + Budget.alpha * (latency - mean)
+            Budget.deviation[entry] += Budget.alpha * (abs(latency - mean) - Budget.deviation[entry])
+
+    # 時間が足りずに entry を処理しなかったときは見込みを減らす (いつかはもう一度測る)
+    @staticmethod
+    def skip(entry: str) -> None:
+        if entry in Budget.mean:
+            Budget.mean[entry] *= 1 - Budget.alpha
+            Budget.deviation[entry] *= 1 - Budget.alpha
+
+    @staticmethod
+    def enter(entry: str) -> None:
+        Budget.entered[entry] = time.perf_counter()
+
+    # エントリポイントの所要時間を記録し、制限時間を超えていれば数えて記録する
+    # scale: 処理を減らして近似した場合に、全部処理した場合の所要時間に直す倍率 (移動平均にだけ使う)
+    @staticmethod
+    def leave(entry: str, scale: float = 1.0) -> None:
+        start = Budget.entered.pop(entry, None)
+        if start is None:
+            return
+        latency = (time.perf_counter() - start) * 1000
+        Budget.observe(entry, latency * scale)
+        histogram = Budget.histograms.get(entry)
+        if histogram is None:
+            histogram = Budget.histograms[entry] = LATENCY.labels(entry, Budget.role)
+        histogram.observe(latency)
+        if Budget.current.remaining() < 0:
+            TIMEOUTS.inc()
+            Budget.overruns[entry] = Budget.overruns.get(entry, 0) + 1
+            EventLog.log("time", WARNING, "budget_overrun", entry=entry, ms=round(latency, 1),
+                         elapsed=round(Budget.current.elapsed(), 1), overruns=Budget.overruns[entry])
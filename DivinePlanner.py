@@ -0,0 +1,62 @@
+from typing import Dict, List
+
+import numpy as np
+from Belief import Belief
+
+from aiwolf import Agent, GameInfo, Role
+from aiwolf.constant import AGENT_NONE
+
+
+# 行ごとのエントロピー (0 log 0 = 0)
+def entropy(p: np.ndarray) -> np.ndarray:
+    logp = np.log(np.where(p > 0, p, 1))
+    return -(p * logp).sum(axis=-1)
+
+
+class DivinePlanner:
+    """Chooses the divination target of the seer that maximizes the expected information gain.
+
+    The uncertainty is the sum of the entropies of the role marginals of all agents.
+    For every candidate the marginals after a black and after a white result are computed at once
+    from the posterior over assignments (Belief.posterior) with one matrix product,
+    and the gain is the current uncertainty minus its expectation over the two results.
+    Gains are cached per state of the Belief, so they are computed once a night.
+    """
+
+    def __init__(self, belief: Belief) -> None:
+        self.belief = belief
+        self.me: Agent = AGENT_NONE
+
+    def start(self, game_info: GameInfo) -> None:
+        self.me = game_info.me
+
+    def candidates(self, game_info: GameInfo) -> List[Agent]:
+        return [a for a in game_info.alive_agent_list if a != self.me]
+
+    # 全エージェントを占った場合の情報利得 (N,)
+    def information_gain(self) -> np.ndarray:
+        def compute() -> np.ndarray:
+            sm = self.belief.score_matrix
+            table, weights = self.belief.posterior()
+            K, N = table.shape
+            # onehot[k, j * M + r]: 割り当て k でエージェント j が役職 r
+            onehot = np.eye(sm.M)[table].reshape(K, N * sm.M)
+            werewolf = (table == sm.rtoi[Role.WEREWOLF]).astype(float)
+            total = weights @ onehot
+            # black[i]: エージェント i を占って黒が出る割り当ての周辺確率の和 (正規化前)
+            black = (werewolf * weights[:, None]).T @ onehot
+            white = total[None, :] - black
+            p_black = werewolf.T @ weights
+            p_white = 1 - p_black
+            h_black = entropy(black / np.where(p_black > 0, p_black, 1)[:, None])
+            h_white = entropy(np.clip(white, 0, None) / np.where(p_white > 0, p_white, 1)[:, None])
+            return entropy(total) - (p_black * h_black + p_white * h_white)
+        return self.belief.cached("information_gain", compute)
+
+    def gains(self, game_info: GameInfo) -> Dict[Agent, float]:
+        gain = self.information_gain()
+        return {a: float(gain[a.agent_idx - 1]) for a in self.candidates(game_info)}
+
+    def divine(self, game_info: GameInfo) -> Agent:
+        gains = self.gains(game_info)
+        return max(gains, key=lambda a: (gains[a], -a.agent_idx)) if gains else AGENT_NONE
@@ -0,0 +1,165 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, TextIO
+
+# ログのレベル (カテゴリごとに、このレベル以上のイベントだけを記録する)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+LEVELS: Dict[str, int] = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "OFF": OFF}
+
+
+class Event(NamedTuple):
+    time: float
+    game: int
+    day: int
+    phase: str
+    category: str
+    level: int
+    event: str
+    values: dict
+
+
+# JSON にできない値 (Agent, Role, numpy の配列など) の変換
+def to_json(value):
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "name") and hasattr(value, "value"):
+        return value.name
+    return str(value)
+
+
+class EventLog:
+    """Structured log of game events, written by a background thread.
+
+    Events are typed records (game, day, phase, category, event, values) appended to a bounded deque;
+    append and popleft of a deque are atomic, so the agent never waits for a lock or for the file.
+    Each category has its own level, and EventLog.enabled is checked before the values are built,
+    so a disabled event costs one dictionary lookup. Formatting and writing happen in EventWriter.
+    """
+
+    # カテゴリごとのレベル (無いカテゴリは default_level)
+    levels: Dict[str, int] = {}
+    default_level: int = OFF
+    # 書き出し待ちのイベント (溢れた場合は古いものから捨てる)
+    queue: Deque[Event] = deque(maxlen=1 << 16)
+    dropped: int = 0
+    writer: Optional["EventWriter"] = None
+    # イベントに付ける文脈
+    game: int = 0
+    day: int = -1
+    phase: str = ""
+
+    # "score=DEBUG,time=INFO,*=WARNING" の形式でカテゴリごとのレベルを設定する ("*" はその他のカテゴリ)
+    @staticmethod
+    def set_levels(spec: str) -> None:
+        for item in filter(None, spec.split(",")):
+            category, _, level = item.partition("=")
+            level = level.strip().upper() or "DEBUG"
+            if category.strip() == "*":
+                EventLog.default_level = LEVELS[level]
+            else:
+                EventLog.levels[category.strip()] = LEVELS[level]
+
+    # ログの書き出しを始める
+    @staticmethod
+    def configure(path: str, spec: str = "*=INFO", max_bytes: int = 1 << 24, backup_count: int = 3) -> None:
+        EventLog.close()
+        EventLog.set_levels(spec)
+        EventLog.writer = EventWriter(path, max_bytes, backup_count)
+        EventLog.writer.start()
+
+    @staticmethod
+    def close() -> None:
+        if EventLog.writer is not None:
+            EventLog.writer.stop()
+            EventLog.writer = None
+
+    @staticmethod
+    def enabled(category: str, level: int = DEBUG) -> bool:
+        return level >= EventLog.levels.get(category, EventLog.default_level)
+
+    @staticmethod
+    def log(category: str, level: int, event: str, **values) -> None:
+        if level < EventLog.levels.get(category, EventLog.default_level):
+            return
+        queue = EventLog.queue
+        if len(queue) == queue.maxlen:
+            EventLog.dropped += 1
+        queue.append(Event(time.time(), EventLog.game, EventLog.day, EventLog.phase, category, level, event, values))
+
+    @staticmethod
+    def start_game(day: int) -> None:
+        EventLog.game += 1
+        EventLog.day = day
+        EventLog.phase = "initialize"
+
+    @staticmethod
+    def enter(phase: str, day: Optional[int] = None) -> None:
+        EventLog.phase = phase
+        if day is not None:
+            EventLog.day = day
+
+
+class EventWriter(threading.Thread):
+    """Background thread that drains EventLog.queue into a rotating JSONL file.
+
+    The file is rotated to path.1, path.2, ... when it grows beyond max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int, interval: float = 0.5) -> None:
+        super().__init__(name="EventWriter", daemon=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.interval = interval
+        self.file: TextIO = open(path, "a", encoding="utf-8")
+        self.stopping = threading.Event()
+        atexit.register(self.stop)
+
+    def run(self) -> None:
+        while not self.stopping.wait(self.interval):
+            self.drain()
+        self.drain()
+
+    def stop(self) -> None:
+        if not self.stopping.is_set():
+            self.stopping.set()
+            if self.is_alive():
+                self.join()
+            self.file.close()
+
+    def drain(self) -> None:
+        queue = EventLog.queue
+        lines = []
+        while queue:
+            e = queue.popleft()
+            lines.append(json.dumps({"time": round(e.time, 6), "game": e.game, "day": e.day, "phase": e.phase,
+                                     "category": e.category, "level": e.level, "event": e.event, **e.values},
+                                    ensure_ascii=False, default=to_json))
+        if EventLog.dropped:
+            lines.append(json.dumps({"time": round(time.time(), 6), "category": "log", "event": "dropped",
+                                     "count": EventLog.dropped}))
+            EventLog.dropped = 0
+        if not lines:
+            return
+        self.file.write("\n".join(lines) + "\n")
+        self.file.flush()
+        if self.file.tell() >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self) -> None:
+        self.file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
@@ -0,0 +1,131 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+from Belief import Belief
+from Budget import Budget
+from const import JUDGE_EMPTY
+
+from aiwolf import Agent, GameInfo, Judge, Role, Species
+from aiwolf.constant import AGENT_NONE
+
+# 1日の評価に使うロールアウトの数 (残り時間が足りなければ 1/4 にする)
+ROLLOUTS = 256
+# 占い結果で変わる疑われやすさ (処刑されやすさの対数)
+# 偽の結果は本物の占い師の結果と同じように扱われると考える
+BLACK_SUSPICION = 2.0
+WHITE_SUSPICION = 1.0
+# 本物の占い師が生きていれば襲撃されやすさを何倍にするか (対数)
+SEER_ATTACK_BIAS = float(np.log(3.0))
+
+
+# 公開されている占い結果による疑われやすさ (N,)
+def suspicion(belief: Belief) -> np.ndarray:
+    s = np.zeros(belief.score_matrix.N)
+    for judge in belief.public.divination_reports:
+        s[judge.target.agent_idx - 1] += BLACK_SUSPICION if judge.result == Species.WEREWOLF else -WHITE_SUSPICION
+    return s
+
+
+class FakeJudgePlanner:
+    """Chooses the fake divination (target and result) of the werewolf side by Monte Carlo rollouts.
+
+    The true roles are sampled from the posterior of my own ScoreMatrix (Belief.posterior),
+    so the rollouts know, with the uncertainty of my view, who the werewolves and the real seer are.
+    Every option (each alive agent, white or black) is played out on the same samples and random numbers:
+    the village executes by suspicion (the divination reports, the option and the results of the real seer,
+    who divines one agent a night) and the werewolves attack a human, the real seer more likely,
+    until one side wins. The option with the highest win rate of the werewolves is reported.
+    The bodyguard and the medium are not modelled.
+    All options are rolled out in one batch (options, rollouts, agents) and the win rates are cached per state of the Belief,
+    so they are computed once a day.
+    """
+
+    def __init__(self, belief: Belief, rollouts: int = ROLLOUTS) -> None:
+        self.belief = belief
+        self.rollouts = rollouts
+        self.me: Agent = AGENT_NONE
+        self.rng = np.random.default_rng()
+
+    def start(self, game_info: GameInfo) -> None:
+        self.me = game_info.me
+
+    def candidates(self, game_info: GameInfo) -> List[Agent]:
+        return [a for a in game_info.alive_agent_list if a != self.me]
+
+    # 選択肢 (対象, 結果) ごとの人狼陣営の勝率 (belief の状態ごとにキャッシュする)
+    def values(self, game_info: GameInfo) -> Dict[Tuple[Agent, Species], float]:
+        def compute() -> Dict[Tuple[Agent, Species], float]:
+            options = [(a, r) for a in self.candidates(game_info) for r in (Species.HUMAN, Species.WEREWOLF)]
+            if not options:
+                return {}
+            rollouts = self.rollouts if not Budget.short("fake_judge") else self.rollouts // 4
+            delta = np.zeros((len(options), self.belief.score_matrix.N))
+            for o, (a, r) in enumerate(options):
+                delta[o, a.agent_idx - 1] = BLACK_SUSPICION if r == Species.WEREWOLF else -WHITE_SUSPICION
+            Budget.enter("fake_judge")
+            try:
+                win = self.rollout(self.belief.alive(), suspicion(self.belief) + delta, rollouts)
+            finally:
+                # 減らしたロールアウトの所要時間は、全部のロールアウトの時間に直して記録する
+                Budget.leave("fake_judge", self.rollouts / rollouts)
+            return {option: float(w) for option, w in zip(options, win)}
+        return self.belief.cached("fake_judge_values", compute)
+
+    # 残りの日をロールアウトして、選択肢ごとの人狼陣営の勝率を返す
+    # alive: 今の生存者 (N,)、suspicion: 選択肢ごとの疑われやすさ (O, N)
+    def rollout(self, alive: np.ndarray, suspicion: np.ndarray, rollouts: int) -> np.ndarray:
+        sm = self.belief.score_matrix
+        N, O, B = sm.N, len(suspicion), rollouts
+        table, weights = self.belief.posterior()
+        roles = table[self.rng.choice(len(table), size=B, p=weights / weights.sum())]
+        wolf = roles == sm.rtoi[Role.WEREWOLF]
+        r = sm.rtoi[Role.SEER]
+        seer = roles == r if 0 <= r < sm.M else np.zeros((B, N), dtype=bool)
+        has_seer = seer.any(axis=1)
+        seer_idx = seer.argmax(axis=1)
+        b = np.arange(B)
+        s = np.broadcast_to(suspicion[:, None, :], (O, B, N)).copy()
+        living = np.broadcast_to(alive, (O, B, N)).copy()
+        won = np.zeros((O, B), dtype=bool)
+        over = np.zeros((O, B), dtype=bool)
+
+        def check() -> None:
+            werewolves = (living & wolf).sum(axis=-1)
+            humans = (living & ~wolf).sum(axis=-1)
+            won[...] |= ~over & (werewolves > 0) & (werewolves >= humans)
+            over[...] |= (werewolves == 0) | (werewolves >= humans)
+
+        check()
+        # 1日に少なくとも1人は死ぬので、N 日でゲームが終わる
+        for _ in range(N):
+            if over.all():
+                break
+            # 処刑: 疑われやすさ + Gumbel ノイズが最大の生存者 (乱数は全選択肢で共通)
+            noise = self.rng.gumbel(size=(B, N))
+            executed = np.where(living, s + noise, -np.inf).argmax(axis=-1)
+            living &= ~((np.arange(N) == executed[..., None]) & ~over[..., None])
+            check()
+            # 占い: 本物の占い師が生きていれば、生存者をランダムに占って結果で疑われやすさを変える
+            noise = self.rng.gumbel(size=(B, N))
+            divinable = living & ~seer
+            target = np.where(divinable, noise, -np.inf).argmax(axis=-1)
+            divines = living[:, b, seer_idx] & has_seer & divinable.any(axis=-1) & ~over
+            result = np.where(wolf[b, target], BLACK_SUSPICION, -WHITE_SUSPICION)
+            s += (np.arange(N) == target[..., None]) * (divines * result)[..., None]
+            # 襲撃: 人狼は人間から選ぶ (本物の占い師は選ばれやすい)
+            noise = self.rng.gumbel(size=(B, N)) + seer * SEER_ATTACK_BIAS
+            attacked = np.where(living & ~wolf, noise, -np.inf).argmax(axis=-1)
+            living &= ~((np.arange(N) == attacked[..., None]) & ~over[..., None])
+            check()
+        return won.mean(axis=1)
+
+    # 偽の占い結果 (勝率が同じなら白、番号の小さいエージェント)
+    # candidates: 対象にできるエージェント、black_candidates: 黒を出してよいエージェント
+    def judge(self, game_info: GameInfo, candidates: List[Agent], black_candidates: List[Agent]) -> Judge:
+        values = self.values(game_info)
+        options = [(a, r) for (a, r) in values
+                   if a in candidates and (r == Species.HUMAN or a in black_candidates)]
+        if not options:
+            return JUDGE_EMPTY
+        target, result = max(options, key=lambda o: (values[o], o[1] == Species.HUMAN, -o[0].agent_idx))
+        return Judge(self.me, game_info.day, target, result)
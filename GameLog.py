@@ -0,0 +1,592 @@
+import mmap
+import struct
+import sys
+import time
+from collections import defaultdict
+from typing import (BinaryIO, DefaultDict, Dict, Iterable, Iterator, List,
+                    NamedTuple, Optional, Set, Union)
+
+from Metrics import TALKS
+from Util import Util
+
+from aiwolf import (Agent, Content, GameInfo, GameSetting, Judge, Role,
+                    Species, Status, Topic)
+from aiwolf.constant import AGENT_NONE
+
+# ゲームログのバイナリ形式
+# ファイル先頭: MAGIC
+# レコード: 1バイトのタグ + 固定長(一部可変長)のペイロード (リトルエンディアン)
+# エージェントは agent_idx (0 は AGENT_NONE)、役職・種族・話題は下のテーブルの添字で表す
+MAGIC = b"O0GL\x01"
+
+TAG_GAME = 1
+TAG_DAY = 2
+TAG_TALK = 3
+TAG_WHISPER = 4
+TAG_VOTE = 5
+TAG_RESULT = 6
+TAG_NAMES = 7
+
+ROLES: List[Role] = list(Role)
+SPECIES: List[Species] = list(Species)
+TOPICS: List[Topic] = list(Topic)
+RTOC: Dict[Role, int] = {r: i for i, r in enumerate(ROLES)}
+STOC: Dict[Species, int] = {s: i for i, s in enumerate(SPECIES)}
+TTOC: Dict[Topic, int] = {t: i for i, t in enumerate(TOPICS)}
+
+# player_num, me, my_role, 役職の種類数, 既知の役職数 (その後に (役職, 人数) と (agent, 役職) が続く)
+GAME_HEAD = struct.Struct("<BBBBB")
+# day, executed, attacked, guarded, divine_target, divine_result, medium_target, medium_result, alive_mask, 死亡者数 (その後に死亡者が続く)
+DAY_HEAD = struct.Struct("<BBBBBBBBIB")
+# day, turn, talker, topic, target, role, result
+TALK = struct.Struct("<BBBBBBB")
+# day, voter, target
+VOTE = struct.Struct("<BBB")
+# 勝利陣営 (0: 村人, 1: 人狼), 人数 (その後に全員の役職が続く)
+RESULT_HEAD = struct.Struct("<BB")
+PAIR = struct.Struct("<BB")
+# 名前の数 (その後に agent, 名前のバイト数, 名前 (UTF-8) が続く)。サーバが名前を送ってきたゲームだけ、GAME の直前に書く
+NAMES_HEAD = struct.Struct("<B")
+
+
+class GameRecord(NamedTuple):
+    player_num: int
+    me: Agent
+    my_role: Role
+    role_num_map: Dict[Role, int]
+    role_map: Dict[Agent, Role]
+
+
+class DayRecord(NamedTuple):
+    day: int
+    executed: Agent
+    attacked: Agent
+    guarded: Agent
+    divine_result: Optional[Judge]
+    medium_result: Optional[Judge]
+    alive: List[Agent]
+    last_dead: List[Agent]
+
+
+class TalkRecord(NamedTuple):
+    day: int
+    turn: int
+    agent: Agent
+    topic: Topic
+    target: Agent
+    role: Role
+    result: Species
+    whisper: bool
+
+
+class VoteRecord(NamedTuple):
+    day: int
+    agent: Agent
+    target: Agent
+
+
+class ResultRecord(NamedTuple):
+    villager_win: bool
+    role_map: Dict[Agent, Role]
+
+
+class NamesRecord(NamedTuple):
+    names: Dict[Agent, str]
+
+
+Record = Union[NamesRecord, GameRecord, DayRecord, TalkRecord, VoteRecord, ResultRecord]
+
+
+def _idx(agent: Optional[Agent]) -> int:
+    return agent.agent_idx if agent is not None else 0
+
+
+def _agent(idx: int) -> Agent:
+    return Agent(idx) if idx != 0 else AGENT_NONE
+
+
+class GameLogWriter:
+    """Append-only writer of the binary game log.
+
+    The new records since the previous update are taken from a GameInfoReader, so the log holds
+    exactly the records the agent infers from. Records are packed into a buffered file and flushed at the end of each game.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 16) -> None:
+        self.file: BinaryIO = open(path, "ab", buffering=buffer_size)
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.reader = GameInfoReader()
+        self.game_info: Optional[GameInfo] = None
+
+    def start_game(self, game_info: GameInfo, game_setting: GameSetting) -> None:
+        self.game_info = game_info
+        self.write(self.reader.start_game(game_info, game_setting))
+
+    # 前回の update からの差分だけを書き出す
+    def update(self, game_info: GameInfo) -> None:
+        self.game_info = game_info
+        self.write(self.reader.update(game_info))
+
+    def finish(self, game_info: Optional[GameInfo] = None) -> None:
+        game_info = game_info if game_info is not None else self.game_info
+        if game_info is None:
+            return
+        self.update(game_info)
+        # 生存している人狼がいなければ村人陣営の勝利
+        villager_win = not any(game_info.status_map[a] == Status.ALIVE and r == Role.WEREWOLF
+                               for a, r in game_info.role_map.items())
+        self.write([ResultRecord(villager_win, {a: game_info.role_map.get(a, Role.UNC) for a in game_info.agent_list})])
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def write(self, records: List[Record]) -> None:
+        write = self.file.write
+        for rec in records:
+            write(pack_record(rec))
+
+
+# レコードを1つ書き出す形式にする (read_records の逆)
+def pack_record(rec: Record) -> bytes:
+    if isinstance(rec, TalkRecord):
+        return bytes((TAG_WHISPER if rec.whisper else TAG_TALK,)) + TALK.pack(
+            rec.day, rec.turn, rec.agent.agent_idx, TTOC[rec.topic], _idx(rec.target), RTOC[rec.role], STOC[rec.result])
+    if isinstance(rec, VoteRecord):
+        return bytes((TAG_VOTE,)) + VOTE.pack(rec.day, rec.agent.agent_idx, rec.target.agent_idx)
+    if isinstance(rec, DayRecord):
+        alive_mask = 0
+        for a in rec.alive:
+            alive_mask |= 1 << (a.agent_idx - 1)
+        divine, medium = rec.divine_result, rec.medium_result
+        dead = [a.agent_idx for a in rec.last_dead]
+        return bytes((TAG_DAY,)) + DAY_HEAD.pack(
+            rec.day, _idx(rec.executed), _idx(rec.attacked), _idx(rec.guarded),
+            _idx(divine.target) if divine is not None else 0, STOC[divine.result] if divine is not None else 0,
+            _idx(medium.target) if medium is not None else 0, STOC[medium.result] if medium is not None else 0,
+            alive_mask, len(dead)) + bytes(dead)
+    if isinstance(rec, GameRecord):
+        buf = bytearray(GAME_HEAD.pack(rec.player_num, rec.me.agent_idx, RTOC[rec.my_role],
+                                       len(rec.role_num_map), len(rec.role_map)))
+        for r, n in rec.role_num_map.items():
+            buf += PAIR.pack(RTOC[r], n)
+        for a, r in rec.role_map.items():
+            buf += PAIR.pack(a.agent_idx, RTOC[r])
+        return bytes((TAG_GAME,)) + buf
+    if isinstance(rec, NamesRecord):
+        buf = bytearray(NAMES_HEAD.pack(len(rec.names)))
+        for a, name in rec.names.items():
+            encoded = name.encode("utf-8")[:255]
+            buf += PAIR.pack(a.agent_idx, len(encoded)) + encoded
+        return bytes((TAG_NAMES,)) + buf
+    roles = [RTOC[r] for _, r in sorted(rec.role_map.items(), key=lambda item: item[0].agent_idx)]
+    return bytes((TAG_RESULT,)) + RESULT_HEAD.pack(0 if rec.villager_win else 1, len(roles)) + bytes(roles)
+
+
+# ログファイルのレコードを先頭から順に返す
+# 長いログを丸ごと読み込まないように、ファイルを mmap して読む
+def read_records(path: str) -> Iterator[Record]:
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空のファイルは mmap できない
+            Util.error_print("read_records: invalid game log", path)
+            return
+        with data:
+            yield from parse_records(data, path)
+
+
+# バイト列 (bytes または mmap) のレコードを先頭から順に返す
+def parse_records(data, path: str) -> Iterator[Record]:
+    if data[:len(MAGIC)] != MAGIC:
+        Util.error_print("read_records: invalid game log", path)
+        return
+    pos = len(MAGIC)
+    end = len(data)
+    talk_unpack = TALK.unpack_from
+    vote_unpack = VOTE.unpack_from
+    while pos < end:
+        tag = data[pos]
+        pos += 1
+        if tag == TAG_TALK or tag == TAG_WHISPER:
+            day, turn, talker, topic, target, role, result = talk_unpack(data, pos)
+            pos += TALK.size
+            yield TalkRecord(day, turn, _agent(talker), TOPICS[topic], _agent(target), ROLES[role], SPECIES[result],
+                             tag == TAG_WHISPER)
+        elif tag == TAG_VOTE:
+            day, voter, target = vote_unpack(data, pos)
+            pos += VOTE.size
+            yield VoteRecord(day, _agent(voter), _agent(target))
+        elif tag == TAG_DAY:
+            day, executed, attacked, guarded, dt, dr, mt, mr, alive_mask, n_dead = DAY_HEAD.unpack_from(data, pos)
+            pos += DAY_HEAD.size
+            dead = [_agent(i) for i in data[pos:pos + n_dead]]
+            pos += n_dead
+            alive = [Agent(i + 1) for i in range(alive_mask.bit_length()) if alive_mask >> i & 1]
+            yield DayRecord(day, _agent(executed), _agent(attacked), _agent(guarded),
+                            Judge(AGENT_NONE, day, Agent(dt), SPECIES[dr]) if dt != 0 else None,
+                            Judge(AGENT_NONE, day, Agent(mt), SPECIES[mr]) if mt != 0 else None,
+                            alive, dead)
+        elif tag == TAG_GAME:
+            player_num, me, my_role, n_role, n_known = GAME_HEAD.unpack_from(data, pos)
+            pos += GAME_HEAD.size
+            role_num_map: Dict[Role, int] = {}
+            for _ in range(n_role):
+                r, n = PAIR.unpack_from(data, pos)
+                pos += PAIR.size
+                role_num_map[ROLES[r]] = n
+            role_map: Dict[Agent, Role] = {}
+            for _ in range(n_known):
+                a, r = PAIR.unpack_from(data, pos)
+                pos += PAIR.size
+                role_map[Agent(a)] = ROLES[r]
+            yield GameRecord(player_num, Agent(me), ROLES[my_role], role_num_map, role_map)
+        elif tag == TAG_NAMES:
+            n, = NAMES_HEAD.unpack_from(data, pos)
+            pos += NAMES_HEAD.size
+            names: Dict[Agent, str] = {}
+            for _ in range(n):
+                a, length = PAIR.unpack_from(data, pos)
+                pos += PAIR.size
+                names[Agent(a)] = data[pos:pos + length].decode("utf-8", errors="replace")
+                pos += length
+            yield NamesRecord(names)
+        elif tag == TAG_RESULT:
+            winner, n = RESULT_HEAD.unpack_from(data, pos)
+            pos += RESULT_HEAD.size
+            roles = data[pos:pos + n]
+            pos += n
+            yield ResultRecord(winner == 0, {Agent(i + 1): ROLES[r] for i, r in enumerate(roles)})
+        else:
+            Util.error_print("read_records: unknown tag", tag, "at", pos - 1, "in", path)
+            return
+
+
+# --------------- 対戦中の GameInfo からレコードを作る ---------------
+class GameInfoReader:
+    """Turns the GameInfo of a running game into records, the same ones GameLogWriter writes.
+
+    Each call returns only the records that are new since the previous call, so the records
+    can be dispatched to a ReplayHandler (e.g. ScoreMatrixHandler) during the game.
+    Votes come from vote_list and, for the rounds before a revote, latest_vote_list.
+    GameInfo does not number the rounds, so a round is told apart by its day and votes
+    (a revote with exactly the same votes as an earlier round of the day is not recorded again).
+    """
+
+    def __init__(self) -> None:
+        self.day = -1
+        self.talk_head = 0
+        self.whisper_head = 0
+        # 記録した投票のラウンド (日, 投票の組)
+        self.vote_rounds: Set[tuple] = set()
+
+    def start_game(self, game_info: GameInfo, game_setting: GameSetting) -> List[Record]:
+        self.day = -1
+        self.talk_head = 0
+        self.whisper_head = 0
+        self.vote_rounds.clear()
+        role_num_map = {r: n for r, n in game_setting.role_num_map.items() if n > 0}
+        # エージェントの名前 (Protocol.decode がサーバから受け取った場合だけある)
+        names: Dict[Agent, str] = getattr(game_info, "agent_name_map", None) or {}
+        return ([NamesRecord(dict(names))] if names else []) + [GameRecord(game_setting.player_num, game_info.me, game_info.my_role, role_num_map, dict(game_info.role_map))] \
+            + self.update(game_info)
+
+    # 前回の update からの差分のレコード
+    def update(self, game_info: GameInfo) -> List[Record]:
+        records: List[Record] = []
+        if game_info.day != self.day:
+            self.day = game_info.day
+            self.talk_head = 0
+            self.whisper_head = 0
+            records.append(GameInfoReader.day_record(game_info))
+        for vote_list in (getattr(game_info, "latest_vote_list", None), game_info.vote_list):
+            if not vote_list:
+                continue
+            key = (vote_list[0].day, tuple((v.agent.agent_idx, v.target.agent_idx) for v in vote_list))
+            if key not in self.vote_rounds:
+                self.vote_rounds.add(key)
+                records += [VoteRecord(v.day, v.agent, v.target) for v in vote_list]
+        for i in range(self.talk_head, len(game_info.talk_list)):
+            records.append(GameInfoReader.talk_record(game_info.talk_list[i], False))
+        self.talk_head = len(game_info.talk_list)
+        for i in range(self.whisper_head, len(game_info.whisper_list)):
+            records.append(GameInfoReader.talk_record(game_info.whisper_list[i], True))
+        self.whisper_head = len(game_info.whisper_list)
+        return records
+
+    @staticmethod
+    def day_record(game_info: GameInfo) -> DayRecord:
+        none = lambda a: a if a is not None else AGENT_NONE
+        return DayRecord(game_info.day, none(game_info.executed_agent), none(game_info.attacked_agent),
+                         none(game_info.guarded_agent), game_info.divine_result, game_info.medium_result,
+                         list(game_info.alive_agent_list), list(game_info.last_dead_agent_list))
+
+    @staticmethod
+    def talk_record(talk, whisper: bool) -> TalkRecord:
+        TALKS.inc()
+        content: Content = Content.compile(talk.text)
+        target = getattr(content, "target", None)
+        role = getattr(content, "role", None)
+        result = getattr(content, "result", None)
+        return TalkRecord(talk.day, talk.turn, talk.agent, content.topic, target if target is not None else AGENT_NONE,
+                          role if role in RTOC else Role.UNC, result if result in STOC else Species.UNC, whisper)
+
+
+# --------------- リプレイ用の GameInfo, GameSetting, プレイヤーの代用品 ---------------
+# ScoreMatrix が参照する属性だけを持つ
+class ReplayGameSetting:
+
+    def __init__(self, player_num: int, role_num_map: Dict[Role, int]) -> None:
+        self.player_num = player_num
+        self.role_num_map = role_num_map
+
+
+class ReplayGameInfo:
+
+    def __init__(self, rec: GameRecord) -> None:
+        self.me = rec.me
+        self.my_role = rec.my_role
+        self.day = 0
+        self.agent_list = [Agent(i + 1) for i in range(rec.player_num)]
+        self.role_map = dict(rec.role_map)
+        self.status_map = {a: Status.ALIVE for a in self.agent_list}
+        self.alive_agent_list = list(self.agent_list)
+        self.existing_role_list = [r for r in ROLES if rec.role_num_map.get(r, 0) > 0]
+        self.last_dead_agent_list: List[Agent] = []
+        self.executed_agent: Optional[Agent] = None
+        self.attacked_agent: Optional[Agent] = None
+        self.guarded_agent: Optional[Agent] = None
+        self.divine_result: Optional[Judge] = None
+        self.medium_result: Optional[Judge] = None
+
+    def apply_day(self, rec: DayRecord) -> None:
+        self.day = rec.day
+        self.alive_agent_list = rec.alive
+        alive = set(rec.alive)
+        for a in self.agent_list:
+            self.status_map[a] = Status.ALIVE if a in alive else Status.DEAD
+        self.last_dead_agent_list = rec.last_dead
+        self.executed_agent = rec.executed if rec.executed != AGENT_NONE else None
+        self.attacked_agent = rec.attacked if rec.attacked != AGENT_NONE else None
+        self.guarded_agent = rec.guarded if rec.guarded != AGENT_NONE else None
+        self.divine_result = rec.divine_result
+        self.medium_result = rec.medium_result
+
+
+class ReplayPlayer:
+
+    def __init__(self, me: Agent) -> None:
+        self.me = me
+        self.comingout_map: DefaultDict[Agent, Role] = defaultdict(lambda: Role.UNC)
+        self.alive_comingout_map: Dict[Agent, Role] = {}
+        self.divination_reports: List[Judge] = []
+        self.identification_reports: List[Judge] = []
+        self.will_vote_reports: DefaultDict[Agent, Agent] = defaultdict(lambda: AGENT_NONE)
+
+    def apply_talk(self, rec: TalkRecord) -> None:
+        if rec.topic == Topic.COMINGOUT:
+            self.comingout_map[rec.agent] = rec.role
+        elif rec.topic == Topic.DIVINED:
+            self.divination_reports.append(Judge(rec.agent, rec.day, rec.target, rec.result))
+        elif rec.topic == Topic.IDENTIFIED:
+            self.identification_reports.append(Judge(rec.agent, rec.day, rec.target, rec.result))
+        elif rec.topic == Topic.VOTE:
+            self.will_vote_reports[rec.agent] = rec.target
+
+    def apply_day(self, game_info: ReplayGameInfo) -> None:
+        self.alive_comingout_map = {a: r for a, r in self.comingout_map.items()
+                                    if game_info.status_map[a] == Status.ALIVE}
+
+
+# --------------- リプレイ ---------------
+class ReplayHandler:
+    """Base handler of replayed records. Subclasses override the events they need."""
+
+    # サーバが名前を送ってきたゲームだけ、game の直前に呼ばれる
+    def names(self, rec: NamesRecord) -> None:
+        pass
+
+    def game(self, rec: GameRecord) -> None:
+        pass
+
+    def day(self, rec: DayRecord) -> None:
+        pass
+
+    def talk(self, rec: TalkRecord) -> None:
+        pass
+
+    def vote(self, rec: VoteRecord) -> None:
+        pass
+
+    def result(self, rec: ResultRecord) -> None:
+        pass
+
+    # dispatch の終わりに呼ばれる (まとめて処理するために溜めたレコードを反映する)
+    def flush(self) -> None:
+        pass
+
+
+# ScoreMatrix と公開情報 (ReplayPlayer) を変える発言の話題 (それ以外の発言と囁きは何も変えない)
+SCORED_TOPICS = frozenset((Topic.COMINGOUT, Topic.DIVINED, Topic.IDENTIFIED, Topic.VOTE, Topic.ESTIMATE, Topic.GUARDED))
+
+
+# records を ScoreMatrixHandler に渡すと ScoreMatrix か公開情報が変わるか
+def changes_scores(records: Iterable[Record]) -> bool:
+    return any(not isinstance(rec, TalkRecord) or (not rec.whisper and rec.topic in SCORED_TOPICS) for rec in records)
+
+
+class ScoreMatrixHandler(ReplayHandler):
+    """Replay handler that feeds the records to a ScoreMatrix, as the agent does during a game."""
+
+    def __init__(self, sparse: bool = False, dtype: str = "float64", stats=None) -> None:
+        self.game_info: Optional[ReplayGameInfo] = None
+        self.game_setting: Optional[ReplayGameSetting] = None
+        self.player: Optional[ReplayPlayer] = None
+        self.score_matrix = None
+        self.game_count = 0
+        # ScoreMatrix の保持方法: sparse なら SparseScoreMatrix を使う
+        self.sparse = sparse
+        self.dtype = dtype
+        # 過去のゲームの行動 (StatsStore) があれば、事前スコア (Profile) を ScoreMatrix に加える
+        self.stats = stats
+        # 次のゲームのエージェントの名前 (NamesRecord)
+        self.agent_names: Dict[Agent, str] = {}
+        # その日の投票 (日ごとにまとめて ScoreMatrix.votes に渡す)
+        self.pending_votes: List[VoteRecord] = []
+        # 投票したエージェント (日, エージェント): 再投票は最初の投票だけを ScoreMatrix に反映する
+        self.voted: Set[tuple] = set()
+        # 投票宣言と投票先の一致を数える
+        from VoteTracker import VoteTracker
+        self.vote_tracker = VoteTracker()
+        # 霊媒師・狩人のいる村では、投票を VoteGraph の特徴量として日ごとに反映する
+        from VoteGraph import VoteGraph
+        self.vote_graph = VoteGraph()
+
+    def new_score_matrix(self):
+        if self.sparse:
+            from SparseScoreMatrix import SparseScoreMatrix
+            return SparseScoreMatrix(self.game_info, self.game_setting, self.player, dtype=self.dtype)
+        from ScoreMatrix import ScoreMatrix
+        return ScoreMatrix(self.game_info, self.game_setting, self.player, dtype=self.dtype)
+
+    def names(self, rec: NamesRecord) -> None:
+        self.agent_names = rec.names
+
+    def game(self, rec: GameRecord) -> None:
+        self.flush()
+        self.voted.clear()
+        self.vote_tracker.store = self.stats
+        self.vote_tracker.game(rec)
+        self.vote_graph.game(rec)
+        self.game_info = ReplayGameInfo(rec)
+        self.game_setting = ReplayGameSetting(rec.player_num, rec.role_num_map)
+        self.player = ReplayPlayer(rec.me)
+        self.score_matrix = self.new_score_matrix()
+        names, self.agent_names = self.agent_names, {}
+        if self.stats is not None:
+            from Profile import priors
+            # 名前の分からないエージェントの事前スコアは 0
+            self.stats.start(names)
+            sm = self.score_matrix
+            sm.set_profile(priors(self.stats, self.game_info.agent_list, sm.regulation, sm.params))
+
+    def day(self, rec: DayRecord) -> None:
+        self.flush()
+        game_info, game_setting, sm = self.game_info, self.game_setting, self.score_matrix
+        game_info.apply_day(rec)
+        self.player.apply_day(game_info)
+        self.vote_graph.day(rec)
+        # 前夜の死亡者は襲撃されたエージェント
+        for agent in rec.last_dead:
+            sm.killed(game_info, game_setting, agent)
+        if rec.divine_result is not None and game_info.my_role == Role.SEER:
+            sm.my_divined(game_info, game_setting, rec.divine_result.target, rec.divine_result.result)
+        if rec.medium_result is not None and game_info.my_role == Role.MEDIUM:
+            sm.my_identified(game_info, game_setting, rec.medium_result.target, rec.medium_result.result)
+        # 誰も死ななかった場合は護衛が成功している
+        if rec.guarded != AGENT_NONE and not rec.last_dead and game_info.my_role == Role.BODYGUARD:
+            sm.my_guarded(game_info, game_setting, rec.guarded)
+        sm.Nth_day_start(game_info, game_setting)
+
+    def talk(self, rec: TalkRecord) -> None:
+        if rec.whisper:
+            return
+        self.flush()
+        self.vote_tracker.talk(rec)
+        self.vote_graph.talk(rec)
+        game_info, game_setting, sm = self.game_info, self.game_setting, self.score_matrix
+        if rec.topic == Topic.COMINGOUT:
+            sm.talk_co(game_info, game_setting, rec.agent, rec.role, rec.day, rec.turn)
+        elif rec.topic == Topic.DIVINED:
+            sm.talk_divined(game_info, game_setting, rec.agent, rec.target, rec.result, rec.day, rec.turn)
+        elif rec.topic == Topic.IDENTIFIED:
+            sm.talk_identified(game_info, game_setting, rec.agent, rec.target, rec.result, rec.day, rec.turn)
+        elif rec.topic == Topic.VOTE:
+            sm.talk_will_vote(game_info, game_setting, rec.agent, rec.target, rec.day, rec.turn)
+        elif rec.topic == Topic.ESTIMATE:
+            sm.talk_estimate(game_info, game_setting, rec.agent, rec.target, rec.role, rec.day, rec.turn)
+        elif rec.topic == Topic.GUARDED:
+            sm.talk_guarded(game_info, game_setting, rec.agent, rec.target, rec.day, rec.turn)
+        elif rec.topic == Topic.VOTED:
+            sm.talk_voted(game_info, game_setting, rec.agent, rec.target, rec.day, rec.turn)
+        self.player.apply_talk(rec)
+
+    def vote(self, rec: VoteRecord) -> None:
+        if self.pending_votes and self.pending_votes[0].day != rec.day:
+            self.flush()
+        if (rec.day, rec.agent) not in self.voted:
+            self.voted.add((rec.day, rec.agent))
+            self.pending_votes.append(rec)
+        self.vote_tracker.vote(rec)
+        self.vote_graph.vote(rec)
+
+    def result(self, rec: ResultRecord) -> None:
+        self.flush()
+        self.game_count += 1
+
+    def flush(self) -> None:
+        if self.pending_votes:
+            votes = self.pending_votes
+            self.pending_votes = []
+            if self.score_matrix.regulation.basic:
+                self.score_matrix.votes(self.game_info, self.game_setting, [(v.agent, v.target) for v in votes], votes[0].day)
+            else:
+                self.score_matrix.vote_graph(self.game_info, self.game_setting, self.vote_graph, votes[0].day)
+
+
+# レコードを順にハンドラに渡す
+def dispatch(records: Iterable[Record], handler: ReplayHandler) -> ReplayHandler:
+    # 属性参照を減らすために、ハンドラのメソッドを先に取り出しておく
+    methods = {
+        NamesRecord: handler.names,
+        GameRecord: handler.game,
+        DayRecord: handler.day,
+        TalkRecord: handler.talk,
+        VoteRecord: handler.vote,
+        ResultRecord: handler.result,
+    }
+    for rec in records:
+        methods[type(rec)](rec)
+    handler.flush()
+    return handler
+
+
+def replay(paths: Iterable[str], handler: ReplayHandler) -> ReplayHandler:
+    for path in paths:
+        dispatch(read_records(path), handler)
+    return handler
+
+
+if __name__ == "__main__":
+    # python GameLog.py [--sparse] [--float32] log1.bin log2.bin ... : 全ゲームを ScoreMatrix に流して所要時間を表示する
+    Util.debug_mode = False
+    args = sys.argv[1:]
+    sparse = "--sparse" in args
+    dtype = "float32" if "--float32" in args else "float64"
+    paths = [a for a in args if a not in ("--sparse", "--float32")]
+    time_start = time.time()
+    handler = replay(paths, ScoreMatrixHandler(sparse, dtype))
+    time_exec = time.time() - time_start
+    print("games:\t", handler.game_count, "\ttime:\t", round(time_exec, 3), "s")
@@ -0,0 +1,107 @@
+from typing import Dict, List
+
+from Belief import Belief
+
+from aiwolf import Agent, GameInfo, Role, Species
+from aiwolf.constant import AGENT_NONE
+
+# 護衛して守れる価値 (役職ごとの重み、人狼陣営は守っても得がない)
+ROLE_VALUE: Dict[Role, float] = {
+    Role.SEER: 3.0,
+    Role.MEDIUM: 1.5,
+    Role.VILLAGER: 1.0,
+}
+# 襲撃されやすさの初期値 (公開情報の種類ごと)
+# "co_SEER" などは CO した役職、"white" は占いCOした人に白を出された人
+THREAT_PRIOR: Dict[str, float] = {
+    "co_SEER": 4.0,
+    "co_MEDIUM": 2.5,
+    "co_BODYGUARD": 2.0,
+    "white": 1.5,
+    "none": 1.0,
+}
+# 襲撃された (または護衛で防いだ) エージェントの種類の襲撃されやすさを何倍にするか
+THREAT_LEARNING_RATE = 1.5
+
+
+class GuardPlanner:
+    """Chooses the guard target of the bodyguard by the expected value saved.
+
+    The threat model gives each living agent a weight by its public information (CO, white result from a seer claimer).
+    The weights of the kinds are learned across nights from the agents the werewolves actually attacked,
+    and the public information is read incrementally from the Belief.
+    The attack probability is the weight times the probability of not being a werewolf (marginals of the ScoreMatrix),
+    and the guard goes to the agent with the largest attack probability times its value to the village.
+    """
+
+    def __init__(self, belief: Belief) -> None:
+        self.belief = belief
+        self.me: Agent = AGENT_NONE
+        self.threat: Dict[str, float] = dict(THREAT_PRIOR)
+        # 占いCOした人に白を出された人
+        self.whites: Dict[Agent, int] = {}
+        self.report_head = 0
+        self.day = -1
+        # 前夜に護衛したエージェント
+        self.last_guarded: Agent = AGENT_NONE
+
+    def start(self, game_info: GameInfo) -> None:
+        self.me = game_info.me
+        self.threat = dict(THREAT_PRIOR)
+        self.whites.clear()
+        self.report_head = 0
+        self.day = -1
+        self.last_guarded = AGENT_NONE
+
+    # エージェントの公開情報の種類
+    def kind(self, agent: Agent) -> str:
+        role = self.belief.public.comingout_map.get(agent, Role.UNC)
+        if "co_" + role.value in self.threat:
+            return "co_" + role.value
+        return "white" if agent in self.whites else "none"
+
+    # 前回からの差分だけを脅威モデルに反映する
+    def update(self, game_info: GameInfo) -> None:
+        reports = self.belief.public.divination_reports
+        for i in range(self.report_head, len(reports)):
+            report = reports[i]
+            if report.result == Species.HUMAN:
+                self.whites[report.target] = self.whites.get(report.target, 0) + 1
+            elif report.target in self.whites:
+                # 黒も出されている場合は白として扱わない
+                del self.whites[report.target]
+        self.report_head = len(reports)
+        if game_info.day == self.day:
+            return
+        self.day = game_info.day
+        # 前夜に襲撃されたエージェント (誰も死ななかった場合は護衛したエージェント) の種類を襲撃されやすくする
+        attacked = game_info.last_dead_agent_list[0] if game_info.last_dead_agent_list else self.last_guarded
+        if game_info.day >= 2 and attacked != AGENT_NONE:
+            self.threat[self.kind(attacked)] *= THREAT_LEARNING_RATE
+
+    def candidates(self, game_info: GameInfo) -> List[Agent]:
+        return [a for a in game_info.alive_agent_list if a != self.me]
+
+    # 今夜の襲撃先の確率分布 (自分も襲撃されうるが、自分は護衛できないので含めない)
+    def attack_probability(self, game_info: GameInfo) -> Dict[Agent, float]:
+        def compute() -> Dict[Agent, float]:
+            marginals = self.belief.marginals()
+            weight = {a: self.threat[self.kind(a)] * (1 - self.belief.probability(a, Role.WEREWOLF, marginals))
+                      for a in self.candidates(game_info)}
+            total = sum(weight.values()) + self.threat["none"]  # 自分の分
+            return {a: w / total for a, w in weight.items()}
+        return self.belief.cached("attack_probability", compute)
+
+    # 各候補を護衛して守れる価値の期待値
+    def values(self, game_info: GameInfo) -> Dict[Agent, float]:
+        def compute() -> Dict[Agent, float]:
+            marginals = self.belief.marginals()
+            attack = self.attack_probability(game_info)
+            return {a: p * sum(self.belief.probability(a, r, marginals) * v for r, v in ROLE_VALUE.items())
+                    for a, p in attack.items()}
+        return self.belief.cached("guard_values", compute)
+
+    # 護衛先 (状態を変えないので先読みに使える)
+    def choose(self, game_info: GameInfo) -> Agent:
+        values = self.values(game_info)
+        return max(values, key=lambda a: (values[a], -a.agent_idx)) if values else AGENT_NONE
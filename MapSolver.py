@@ -0,0 +1,241 @@
+import heapq
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from Assignment import Assignment
+from ScoreMatrix import START_BELIEF, ScoreMatrix
+
+# -inf の代わりに割り当て問題で使う値
+INFEASIBLE = -1e9
+
+
+# 割り当て問題 (最大化): value (n, n) で、行 i に列 col[i] を割り当てる合計が最大になるものを求める
+# 戻り値: (合計, col, 列の双対変数 dual (n,))
+# dual は value[i, j] <= a[i] + dual[j] となる a と組で上界を与えるので、行や列を変えた問題の上界にも使える
+def hungarian(value: np.ndarray) -> Tuple[float, np.ndarray, np.ndarray]:
+    n = value.shape[0]
+    # n は高々人数なので、numpy の小さな配列の演算よりリストのループの方が速い
+    cost = (-value).tolist()
+    # ポテンシャル法 (行・列は 1 始まり、0 は番兵)
+    u = [0.0] * (n + 1)
+    v = [0.0] * (n + 1)
+    p = [0] * (n + 1)  # p[列] = その列に割り当てた行
+    way = [0] * (n + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [np.inf] * (n + 1)
+        used = [False] * (n + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            ui = u[i0]
+            delta = np.inf
+            j1 = 0
+            for j in range(1, n + 1):
+                if not used[j]:
+                    cur = row[j - 1] - ui - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(n + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+    col = np.empty(n, dtype=np.intp)
+    col[np.array(p[1:], dtype=np.intp) - 1] = np.arange(n)
+    return float(value[np.arange(n), col].sum()), col, -np.array(v[1:])
+
+
+class Node(NamedTuple):
+    """Partial assignment of the branch and bound, with the terms of its bound kept incrementally."""
+    # 役職番号 (未定は -1)
+    assignment: np.ndarray
+    # 割り当て済みのエージェントの単項とペアの項の合計
+    fixed: float
+    # linear[u, r]: u が r のとき、割り当て済みのエージェントとのペアの項の合計 (N, M)
+    linear: np.ndarray
+    # rest[u, r]: u が r のとき、未定のエージェントとのペアの項を半分ずつ抑えた値の合計 (N, M)
+    rest: np.ndarray
+
+
+class MapSolver:
+    """Finds the most likely role assignments of a score matrix.
+
+    The unary terms score[i, r, i, r] are solved exactly as an assignment of agents to role slots (Hungarian method).
+    Pairwise terms that differ from the initial belief are added by a branch and bound over agents,
+    using the assignment of the remaining agents with optimistic pairwise terms as the upper bound.
+    The pairwise terms are stacked into one (N, M, N, M) array, so a child node updates the terms of its parent's bound
+    with one slice (child) instead of visiting every pair, and children that the duals of the parent's assignment
+    problem already rule out are pruned without solving their own (relaxed).
+    """
+
+    def __init__(self, score_matrix: np.ndarray, role_list: List[int], baseline: Optional[float] = None) -> None:
+        self.score_matrix = score_matrix
+        self.N = score_matrix.shape[0]
+        self.M = score_matrix.shape[1]
+        self.role_list = role_list
+        self.counts = np.bincount(role_list, minlength=self.M)
+        i = np.arange(self.N)[:, None]
+        r = np.arange(self.M)[None, :]
+        self.unary = np.where(np.isneginf(score_matrix[i, r, i, r]), INFEASIBLE, score_matrix[i, r, i, r])
+        # ペアの項: 初期値 (baseline) から変わっているブロックだけを (i < j) の組にまとめる
+        # pairs[(i, j)][ri, rj] = score[i, ri, j, rj] + score[j, rj, i, ri]
+        baseline = baseline if baseline is not None else float(np.median(score_matrix))
+        self.pairs: Dict[Tuple[int, int], np.ndarray] = {}
+        for a in range(self.N):
+            for b in range(a + 1, self.N):
+                block = score_matrix[a, :, b, :] + score_matrix[b, :, a, :].T - 2 * baseline
+                if np.any(block != 0):
+                    self.pairs[(a, b)] = np.where(np.isneginf(block), INFEASIBLE, block)
+        # pair[a, ra, b, rb]: 両方向に並べたペアの項 (変わっていない組と a == b は 0)
+        self.pair = np.zeros((self.N, self.M, self.N, self.M))
+        for (a, b), block in self.pairs.items():
+            self.pair[a, :, b, :] = block
+            self.pair[b, :, a, :] = block.T
+        # half[a, b, ra]: 未定の組の項を半分ずつ、それぞれの役職ごとの最大値で抑えた値
+        self.half = 0.5 * self.pair.max(axis=3).transpose(0, 2, 1)
+        self.nodes = 0
+
+    # ScoreMatrix (SparseScoreMatrix も可) から作る
+    @staticmethod
+    def of(score_matrix: ScoreMatrix) -> "MapSolver":
+        return MapSolver(score_matrix.to_dense(), score_matrix.role_list(), START_BELIEF)
+
+    # 何も割り当てていない節点
+    def root(self) -> Node:
+        return Node(np.full(self.N, -1, dtype=np.intp), 0.0, np.zeros((self.N, self.M)), self.half.sum(axis=1))
+
+    # node からエージェント i に役職 r を割り当てた節点 (上界の項は親から差分で更新する)
+    def child(self, node: Node, i: int, r: int) -> Node:
+        assignment = node.assignment.copy()
+        assignment[i] = r
+        return Node(assignment, node.fixed + self.unary[i, r] + node.linear[i, r],
+                    node.linear + self.pair[:, :, i, r], node.rest - self.half[:, i, :])
+
+    # 未定のエージェントと、その価値のうちペアの項 (割り当て済みとの項 + 未定の組の項の上界)
+    @staticmethod
+    def rest_value(node: Node) -> Tuple[np.ndarray, np.ndarray]:
+        rest = np.nonzero(node.assignment < 0)[0]
+        return rest, node.linear[rest] + node.rest[rest]
+
+    # 部分的な割り当ての上界
+    # 戻り値: (上界, 残りのエージェントの割り当てを含めた完全な割り当て, 残りの役職の枠の双対変数)
+    def bound(self, node: Node) -> Tuple[float, np.ndarray, np.ndarray]:
+        self.nodes += 1
+        assignment = node.assignment
+        rest, value = self.rest_value(node)
+        full = assignment.copy()
+        if len(rest) == 0:
+            return node.fixed, full, np.zeros(0)
+        value += self.unary[rest]
+        remaining = self.counts - np.bincount(assignment[assignment >= 0], minlength=self.M)
+        slots = np.repeat(np.arange(self.M), remaining)
+        total, col, dual = hungarian(value[:, slots])
+        full[rest] = slots[col]
+        return node.fixed + total, full, dual
+
+    # 親の割り当て問題の双対変数 dual (枠 slots ごと) から求める、子 child の緩い上界 (bound 以上)
+    # 割り当て問題を解かずに済むので、これで枝刈りできる子は bound を計算しない
+    def relaxed(self, child: Node, r: int, slots: np.ndarray, dual: np.ndarray) -> float:
+        rest, value = self.rest_value(child)
+        if len(rest) == 0:
+            return child.fixed
+        value += self.unary[rest]
+        # 子で埋まる r の枠は、双対変数が最大のものとみなす
+        drop = np.nonzero(slots == r)[0]
+        keep = np.ones(len(slots), dtype=bool)
+        keep[drop[np.argmax(dual[drop])]] = False
+        low = np.full(self.M, np.inf)
+        np.minimum.at(low, slots[keep], dual[keep])
+        return child.fixed + float((value - low).max(axis=1).sum() + dual[keep].sum())
+
+    # 上位 k 個の割り当てを返す
+    # alive (N,) と werewolf を指定すると、既に負けている割り当て (人狼が生存者の半数以上) を除く
+    # max_nodes: 上界を計算する回数の上限 (超えた場合はそれまでに見つかったものを返す)
+    # 戻り値: [(評価値, 役職番号の配列)] (評価値の降順、評価値は Assignment.evaluate_table と同じ)
+    def solve(self, k: int = 1, alive: Optional[np.ndarray] = None, werewolf: int = -1,
+              max_nodes: int = 5000) -> List[Tuple[float, np.ndarray]]:
+        self.nodes = 0
+        alive = alive.astype(bool) if alive is not None and werewolf >= 0 else None
+        # 上位 k 個 (評価値の小さい順のヒープ)
+        best: List[Tuple[float, Tuple[int, ...]]] = []
+
+        def threshold() -> float:
+            return best[0][0] if len(best) >= k else -np.inf
+
+        def accept(value: float, full: np.ndarray) -> None:
+            if value <= INFEASIBLE / 2:
+                return
+            if alive is not None and (full[alive] == werewolf).sum() >= alive.sum() / 2:
+                return
+            item = (value, tuple(full.tolist()))
+            if item[1] in (b[1] for b in best):
+                return
+            if len(best) < k:
+                heapq.heappush(best, item)
+            elif value > best[0][0]:
+                heapq.heapreplace(best, item)
+
+        # 候補の多いエージェント (単項の差が小さい) ほど後で決める
+        spread = np.sort(self.unary, axis=1)
+        order = np.argsort(-(spread[:, -1] - spread[:, -2])) if self.M > 1 else np.arange(self.N)
+
+        def search(node: Node, depth: int, full: np.ndarray, dual: np.ndarray) -> None:
+            # 上界の計算で得た完全な割り当ては、それ自体が候補になる
+            accept(self.evaluate(full), full)
+            if depth == self.N or self.nodes >= max_nodes:
+                return
+            i = order[depth]
+            assignment = node.assignment
+            remaining = self.counts - np.bincount(assignment[assignment >= 0], minlength=self.M)
+            slots = np.repeat(np.arange(self.M), remaining)
+            children = []
+            for r in range(self.M):
+                if remaining[r] == 0:
+                    continue
+                child = self.child(node, i, r)
+                if self.relaxed(child, r, slots, dual) <= max(threshold(), INFEASIBLE / 2):
+                    continue
+                child_value, child_full, child_dual = self.bound(child)
+                if child_value > max(threshold(), INFEASIBLE / 2):
+                    children.append((child_value, r, child, child_full, child_dual))
+            children.sort(key=lambda c: -c[0])
+            for child_value, _, child, child_full, child_dual in children:
+                if child_value <= threshold():
+                    break
+                search(child, depth + 1, child_full, child_dual)
+
+        root = self.root()
+        _, root_full, root_dual = self.bound(root)
+        search(root, 0, root_full, root_dual)
+
+        if not best:
+            return []
+        table = np.array([b[1] for b in best], dtype=np.intp)
+        scores = Assignment.evaluate_table(self.score_matrix, table)
+        result = [(float(s), a) for s, a in zip(scores, table)]
+        result.sort(key=lambda x: -x[0])
+        return result
+
+    # 完全な割り当ての (単項 + 変化したペアの項) の値
+    def evaluate(self, full: np.ndarray) -> float:
+        agents = np.arange(self.N)
+        # pair は両方向に並べてあるので半分にする
+        pairwise = self.pair[agents[:, None], full[:, None], agents[None, :], full[None, :]].sum()
+        return float(self.unary[agents, full].sum() + 0.5 * pairwise)
@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple, Union
+
+# ヒストグラムのバケットの上限 (ms)
+LATENCY_BUCKETS: Tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Counter:
+    """Monotonic counter. Modules keep the handle (a module constant), so an increment is one attribute update."""
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, n: int = 1) -> None:
+        self.value += n
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+
+class Histogram:
+    """Histogram with fixed buckets. counts[k] is the number of observations in (buckets[k-1], buckets[k]]."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class HistogramFamily:
+    """Histograms of one metric, one per tuple of label values.
+
+    labels() creates the child on first use; callers bind it once (per role, per phase) and observe on the handle.
+    """
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...], buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self.children: Dict[Tuple[str, ...], Histogram] = {}
+
+    def labels(self, *values: str) -> Histogram:
+        child = self.children.get(values)
+        if child is None:
+            child = Histogram(self.buckets)
+            self.children[values] = child
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, child in sorted(self.children.items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in zip(self.label_names, values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {child.sum:.3f}")
+            lines.append(f"{self.name}_count{{{labels}}} {child.count}")
+        return lines
+
+
+class Metrics:
+    """In-process registry of counters and histograms, exported in the Prometheus text format.
+
+    The metrics are created once at import (the constants below), and the hot paths increment the handles directly.
+    The text is served on a local HTTP port (serve) or written to a file periodically (dump), both from daemon threads;
+    reading a value while the agent updates it may be one increment behind, which is fine for monitoring.
+    """
+
+    registry: List[Union[Counter, HistogramFamily]] = []
+
+    @staticmethod
+    def counter(name: str, help: str) -> Counter:
+        metric = Counter(name, help)
+        Metrics.registry.append(metric)
+        return metric
+
+    @staticmethod
+    def histogram(name: str, help: str, label_names: Tuple[str, ...], buckets: Sequence[float] = LATENCY_BUCKETS) -> HistogramFamily:
+        metric = HistogramFamily(name, help, label_names, buckets)
+        Metrics.registry.append(metric)
+        return metric
+
+    @staticmethod
+    def render() -> str:
+        return "\n".join(line for metric in Metrics.registry for line in metric.render()) + "\n"
+
+    # http://127.0.0.1:port/metrics で公開する
+    # http.server は import に時間がかかるので、起動時ではなく公開するときに読み込む
+    @staticmethod
+    def serve(port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self) -> None:
+                body = Metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            # アクセスごとに標準エラー出力に書かない
+            def log_message(self, format, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        threading.Thread(target=server.serve_forever, name="MetricsServer", daemon=True).start()
+        return server
+
+    # interval 秒ごとに path に書き出す (書き出し途中のファイルを読まれないように置き換える)
+    @staticmethod
+    def dump(path: str, interval: float = 10.0) -> threading.Thread:
+        def run() -> None:
+            while True:
+                Metrics.write(path)
+                time.sleep(interval)
+        thread = threading.Thread(target=run, name="MetricsDumper", daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def write(path: str) -> None:
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(Metrics.render())
+        os.replace(path + ".tmp", path)
+
+
+# エージェント全体で使うメトリクス
+GAMES = Metrics.counter("aiwolf_games_total", "Games started.")
+TALKS = Metrics.counter("aiwolf_talks_parsed_total", "Talks and whispers parsed into records.")
+SCORE_UPDATES = Metrics.counter("aiwolf_score_updates_total", "Updates of the ScoreMatrix (rule steps, pair steps, batched deltas).")
+ASSIGNMENTS = Metrics.counter("aiwolf_assignments_evaluated_total", "Role assignments evaluated.")
+TIMEOUTS = Metrics.counter("aiwolf_budget_overruns_total", "Entry points that finished after the deadline of the request.")
+FALLBACKS = Metrics.counter("aiwolf_budget_fallbacks_total", "Actions answered by the heuristic fallback for lack of time.")
+PLAYOUTS = Metrics.counter("aiwolf_search_playouts_total", "Playouts of the tree search over all trees.")
+LATENCY = Metrics.histogram("aiwolf_latency_ms", "Latency of the entry points of the agent (ms).", ("phase", "role"))
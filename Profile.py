@@ -0,0 +1,139 @@
+import sys
+from typing import Dict, Iterable, List, Mapping, NamedTuple
+
+import numpy as np
+from GameLog import (GameRecord, NamesRecord, ReplayHandler, ResultRecord,
+                     TalkRecord, VoteRecord, replay)
+from Regulation import Regulation
+from ScoreParams import ScoreParams
+from StatsStore import StatsStore
+from VoteTracker import VOTE_DECLARED, VOTE_KEPT, VOTE_ROLE, VoteTracker
+
+from aiwolf import Agent, Judge, Role, Species, Topic
+
+# 能力者の役職 (騙りとして数える CO)
+ABILITY_ROLES = (Role.SEER, Role.MEDIUM, Role.BODYGUARD)
+
+
+# 投票宣言の重み: 宣言どおりに投票する割合の2倍 (宣言が少ないうちは 1 に寄せる)
+def vote_weight(kept, declared, prior: float = 1.0):
+    return 2 * (np.asarray(kept) + prior * 0.5) / (np.asarray(declared) + prior)
+
+
+# 行動の回数から作る対数尤度比: 回数が無ければ 0、全てのゲームで行動していれば log 2 に近づく
+def log_ratio(count, games):
+    return np.log(2 * (np.asarray(count) + 1) / (np.asarray(games) + 2))
+
+
+class Profile(NamedTuple):
+    """Prior score vectors (N, M) of the agents of a game, computed from their behavior in past games.
+
+    prior is added to the diagonal of the ScoreMatrix when the game starts,
+    co when the agent comes out as a seer, medium or bodyguard for the first time,
+    and black for each black divination result the agent reports.
+    vote (N,) scales the scores of the vote declarations of each agent by how often it voted as declared.
+    """
+    prior: np.ndarray
+    co: np.ndarray
+    black: np.ndarray
+    vote: np.ndarray
+
+
+# ゲームの結果から、エージェントごとの行動を数える (書き込みは store.flush で行う)
+# comingout_map, divination_reports: ゲーム中に他のエージェントがしたCOと占い結果
+def record(store: StatsStore, role_map: Mapping[Agent, Role], comingout_map: Mapping[Agent, Role],
+           divination_reports: Iterable[Judge]) -> None:
+    for agent, role in role_map.items():
+        co = comingout_map.get(agent, Role.UNC)
+        # 潜伏した占い師
+        if role == Role.SEER and co != Role.SEER:
+            store.count(agent, role, "hidden_seer")
+        # 人狼陣営の能力者の騙り (騙らない狂人は「真狂人」)
+        if role in (Role.WEREWOLF, Role.POSSESSED) and co in ABILITY_ROLES:
+            store.count(agent, role, "fake_co")
+    for judge in divination_reports:
+        role = role_map.get(judge.agent)
+        if role is None:
+            continue
+        store.count(judge.agent, role, "divined")
+        if judge.result == Species.WEREWOLF:
+            store.count(judge.agent, role, "divined_black")
+
+
+# 過去のゲームの行動から、agents の事前スコアを作る
+def priors(store: StatsStore, agents: List[Agent], regulation: Regulation, p: ScoreParams) -> Profile:
+    N, rtoi = len(agents), regulation.rtoi
+    prior, co, black = np.zeros((N, regulation.M)), np.zeros((N, regulation.M)), np.zeros((N, regulation.M))
+
+    def counts(role: Role, event: str) -> np.ndarray:
+        return np.array([store.event_count(a, role, event) for a in agents])
+
+    def games(role: Role) -> np.ndarray:
+        return np.array([store.role_count(a, role) for a in agents])
+
+    seer, possessed, werewolf = rtoi[Role.SEER], rtoi[Role.POSSESSED], rtoi[Role.WEREWOLF]
+    # 潜伏しがちな占い師は、COしていなくても占い師の可能性を残す
+    prior[:, seer] = p["profile.hidden_seer.seer"] * log_ratio(counts(Role.SEER, "hidden_seer"), games(Role.SEER))
+    # 騙らない狂人 (真狂人) は、村人らしく振る舞っていても狂人の可能性を残す
+    fake_possessed = counts(Role.POSSESSED, "fake_co")
+    prior[:, possessed] = p["profile.real_possessed.possessed"] * log_ratio(games(Role.POSSESSED) - fake_possessed, games(Role.POSSESSED))
+    # 人狼陣営で騙りをしがちなエージェントの CO
+    co[:, werewolf] = p["profile.fake_co.werewolf"] * log_ratio(counts(Role.WEREWOLF, "fake_co"), games(Role.WEREWOLF))
+    co[:, possessed] = p["profile.fake_co.possessed"] * log_ratio(fake_possessed, games(Role.POSSESSED))
+    # 黒結果を出す割合を、偽 (人狼陣営) の時と真 (占い師) の時で比べる
+    fake_black = sum(counts(r, "divined_black") for r in (Role.WEREWOLF, Role.POSSESSED))
+    fake_divined = sum(counts(r, "divined") for r in (Role.WEREWOLF, Role.POSSESSED))
+    ratio = log_ratio(fake_black, fake_divined) - log_ratio(counts(Role.SEER, "divined_black"), counts(Role.SEER, "divined"))
+    black[:, werewolf] = p["profile.black.werewolves"] * ratio
+    black[:, possessed] = p["profile.black.werewolves"] * ratio
+    # 宣言どおりに投票するエージェントの投票宣言は重く、しないエージェントの宣言は軽く扱う
+    vote = vote_weight(counts(VOTE_ROLE, VOTE_KEPT), counts(VOTE_ROLE, VOTE_DECLARED))
+    return Profile(prior, co, black, vote)
+
+
+class ProfileTracker(ReplayHandler):
+    """Replay handler that counts the results and the behavior of the agents of recorded games into a StatsStore.
+
+    Only the games recorded with the names of the agents (NamesRecord) are counted.
+    """
+
+    def __init__(self, store: StatsStore) -> None:
+        self.store = store
+        self.agent_names: Dict[Agent, str] = {}
+        self.vote_tracker = VoteTracker(store)
+        self.comingout_map: Dict[Agent, Role] = {}
+        self.divination_reports: List[Judge] = []
+
+    def names(self, rec: NamesRecord) -> None:
+        self.agent_names = rec.names
+
+    def game(self, rec: GameRecord) -> None:
+        self.store.start(self.agent_names)
+        self.agent_names = {}
+        self.vote_tracker.game(rec)
+        self.comingout_map.clear()
+        self.divination_reports.clear()
+
+    def talk(self, rec: TalkRecord) -> None:
+        self.vote_tracker.talk(rec)
+        if rec.whisper:
+            return
+        if rec.topic == Topic.COMINGOUT:
+            self.comingout_map[rec.agent] = rec.role
+        elif rec.topic == Topic.DIVINED:
+            self.divination_reports.append(Judge(rec.agent, rec.day, rec.target, rec.result))
+
+    def vote(self, rec: VoteRecord) -> None:
+        self.vote_tracker.vote(rec)
+
+    def result(self, rec: ResultRecord) -> None:
+        self.store.record(rec.role_map, rec.villager_win)
+        record(self.store, rec.role_map, self.comingout_map, self.divination_reports)
+
+
+if __name__ == "__main__":
+    # python Profile.py stats.db log1.bin log2.bin ... : 記録したゲームの勝敗と行動を stats.db に数える
+    store = StatsStore(sys.argv[1])
+    store.load()
+    replay(sys.argv[2:], ProfileTracker(store))
+    store.flush()
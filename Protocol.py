@@ -0,0 +1,103 @@
+import json
+import time
+from typing import List, NamedTuple, Optional
+
+from Budget import Budget
+
+from aiwolf import AbstractPlayer, Agent, GameInfo, GameSetting, Talk
+from aiwolf.constant import AGENT_NONE
+
+# AIWolf サーバのリクエスト (JSON) をプレイヤーのメソッドに振り分ける
+# aiwolf.TcpipClient と同じ手順で GameInfo を作り、update してから行動を返す
+# ソケットを扱わないので、ベンチマーク (bench_agent.py) や非同期クライアント (AsyncClient.py) から使う
+
+# 行動の対象 (エージェント) を返すリクエスト
+AGENT_REQUESTS = {"VOTE": "vote", "ATTACK": "attack", "DIVINE": "divine", "GUARD": "guard"}
+# 発話を返すリクエスト
+CONTENT_REQUESTS = {"TALK": "talk", "WHISPER": "whisper"}
+
+
+class DecodedPacket(NamedTuple):
+    request: str
+    game_info: Optional[GameInfo]
+    game_setting: Optional[GameSetting]
+    talks: List[Talk]
+    whispers: List[Talk]
+    # パケットが届いた時刻 (time.perf_counter)
+    arrival: float
+
+
+# パケット (JSON を読み込んだ dict) から GameInfo などを作る
+# 状態を持たないので、前のリクエストの処理中に別のスレッドやイベントループで実行できる
+def decode(packet: dict, arrival: Optional[float] = None) -> DecodedPacket:
+    game_info: Optional[GameInfo] = None
+    if packet.get("gameInfo"):
+        game_info = GameInfo(packet["gameInfo"])
+        # エージェントの名前 (送ってくるサーバだけ)。対戦相手ごとの集計 (StatsStore) に使う
+        name_map = packet["gameInfo"].get("agentNameMap")
+        if name_map:
+            game_info.agent_name_map = {Agent(int(idx)): name for idx, name in name_map.items()}
+    return DecodedPacket(
+        packet["request"],
+        game_info,
+        GameSetting(packet["gameSetting"]) if packet.get("gameSetting") else None,
+        [Talk.compile(t) for t in packet.get("talkHistory") or []],
+        [Talk.compile(t) for t in packet.get("whisperHistory") or []],
+        arrival if arrival is not None else time.perf_counter(),
+    )
+
+
+class PacketHandler:
+    """Turns server packets into calls of the player and returns the response line, if any."""
+
+    def __init__(self, player: AbstractPlayer, name: str, request_role: str = "none") -> None:
+        self.player = player
+        self.name = name
+        self.request_role = request_role
+        self.game_info: Optional[GameInfo] = None
+        self.game_setting: Optional[GameSetting] = None
+
+    # パケットを解釈して GameInfo を更新する (プレイヤーは呼ばない)
+    def prepare(self, packet: dict) -> None:
+        self.apply(decode(packet))
+
+    # decode 済みのパケットを反映する
+    # gameInfo があれば置き換え、talkHistory / whisperHistory は今の GameInfo に追加する
+    def apply(self, decoded: DecodedPacket) -> None:
+        if decoded.game_info is not None:
+            self.game_info = decoded.game_info
+        if decoded.game_setting is not None:
+            self.game_setting = decoded.game_setting
+        if self.game_info is None:
+            return
+        if decoded.talks:
+            self.game_info.talk_list.extend(decoded.talks)
+        if decoded.whispers:
+            self.game_info.whisper_list.extend(decoded.whispers)
+
+    # prepare 済みのリクエストに対してプレイヤーを呼び、返答を返す (返答がないリクエストは None)
+    def respond(self, request: str) -> Optional[str]:
+        if request == "NAME":
+            return self.name
+        if request == "ROLE":
+            return self.request_role
+        if request == "INITIALIZE":
+            self.player.initialize(self.game_info, self.game_setting)
+            return None
+        self.player.update(self.game_info)
+        if request == "DAILY_INITIALIZE":
+            self.player.day_start()
+        elif request == "FINISH":
+            self.player.finish()
+        elif request in AGENT_REQUESTS:
+            agent: Agent = getattr(self.player, AGENT_REQUESTS[request])()
+            return json.dumps({"agentIdx": (agent if agent is not None else AGENT_NONE).agent_idx}, separators=(",", ":"))
+        elif request in CONTENT_REQUESTS:
+            return getattr(self.player, CONTENT_REQUESTS[request])().text
+        return None
+
+    def handle(self, packet: dict) -> Optional[str]:
+        # 制限時間はパケットを受け取った時点から数える (Budget)
+        Budget.arrive(packet["request"])
+        self.prepare(packet)
+        return self.respond(packet["request"])
@@ -0,0 +1,54 @@
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+
+from aiwolf import Role
+
+# 役職番号の順序: 存在する役職だけをこの順に並べて 0, 1, ... と番号を付ける
+# (5人村なら村人, 占い師, 狂人, 人狼 で、15人村ならその後に霊媒師, 狩人が続く)
+# 妖狐と共有者は推論の規則を持たないが、全員に役職を割り当てられるように番号を付ける
+ROLE_ORDER: Tuple[Role, ...] = (Role.VILLAGER, Role.SEER, Role.POSSESSED, Role.WEREWOLF, Role.MEDIUM, Role.BODYGUARD,
+                                Role.FOX, Role.FREEMASON)
+# 陣営ごとの役職 (妖狐はどちらの陣営でもない)
+VILLAGER_ROLES: Tuple[Role, ...] = (Role.VILLAGER, Role.SEER, Role.MEDIUM, Role.BODYGUARD, Role.FREEMASON)
+WEREWOLF_ROLES: Tuple[Role, ...] = (Role.WEREWOLF, Role.POSSESSED)
+
+
+class Regulation:
+    """Role setting of a village and the tables derived from it.
+
+    Role indices, side role lists and the role list of the assignments depend only on game_setting.role_num_map,
+    so they are computed once per setting (Regulation.of) and shared by all ScoreMatrix of the setting.
+    A village is basic if it has no role other than villager, seer, possessed and werewolf (the 5-player village).
+    """
+
+    cache: Dict[tuple, "Regulation"] = {}
+
+    def __init__(self, role_num: Tuple[Tuple[Role, int], ...]) -> None:
+        self.key = role_num
+        self.role_num_map: Mapping[Role, int] = MappingProxyType(dict(role_num))
+        self.N = sum(n for _, n in role_num)
+        # 存在する役職 (役職番号の順)
+        self.roles: Tuple[Role, ...] = tuple(r for r, _ in role_num)
+        self.M = len(self.roles)
+        self.rtoi: Mapping[Role, int] = MappingProxyType({r: i for i, r in enumerate(self.roles)})
+        # 役職の割り当てに使う役職番号のリスト (5人村なら (0, 0, 1, 2, 3))
+        self.role_list: Tuple[int, ...] = tuple(sorted(self.rtoi[r] for r, n in role_num for _ in range(n)))
+        self.villagers: Tuple[Role, ...] = tuple(r for r in VILLAGER_ROLES if r in self.rtoi)
+        self.werewolves: Tuple[Role, ...] = tuple(r for r in WEREWOLF_ROLES if r in self.rtoi)
+        self.basic = all(r in (Role.VILLAGER, Role.SEER, Role.POSSESSED, Role.WEREWOLF) for r in self.roles)
+
+    def __repr__(self) -> str:
+        return "Regulation(" + ", ".join(r.name + "=" + str(n) for r, n in self.key) + ")"
+
+    def has(self, role: Role) -> bool:
+        return role in self.rtoi
+
+    # 役職構成から Regulation を作る (同じ役職構成なら同じオブジェクトを返す)
+    @staticmethod
+    def of(role_num_map: Mapping[Role, int]) -> "Regulation":
+        key = tuple((r, int(role_num_map[r])) for r in ROLE_ORDER if role_num_map.get(r, 0) > 0)
+        regulation = Regulation.cache.get(key)
+        if regulation is None:
+            regulation = Regulation(key)
+            Regulation.cache[key] = regulation
+        return regulation
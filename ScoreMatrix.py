@@ -1,56 +1,90 @@
-import inspect
-from typing import Dict, List, Set
+import sys
+from collections import defaultdict
+from typing import DefaultDict, Dict, List, Optional, Set, Tuple
 
 import numpy as np
-from o0villager import *
-from o0possessed import *
-from o0werewolf import *
-from o0seer import *
+from EventLog import DEBUG, INFO, EventLog
+from Metrics import SCORE_UPDATES
+from Profile import Profile
+from Regulation import Regulation
+from ScoreParams import ScoreParams
+from ScoreRules import (RuleTables, Steps, co_key, compile_vote_steps,
+                        divined_key, identified_key, rule_tables)
 from Side import Side
 from Util import Util
+from VoteGraph import VoteGraph
 
 from aiwolf import Agent, GameInfo, GameSetting, Role, Species
 from aiwolf.constant import AGENT_NONE
 
-# プレイヤー数と役職数
-NUM_PLAYERS = 5
-NUM_ROLES = 4  # 人狼, 村人, 狂人, 占い師
 START_BELIEF =0.5
+# 5人村の役職構成 (ルール表を import 時に作っておく)
+ROLE_NUM_MAP_5 = {Role.VILLAGER: 2, Role.SEER: 1, Role.POSSESSED: 1, Role.WEREWOLF: 1}
 
 
 class ScoreMatrix:
-    def __init__(self, game_info: GameInfo, game_setting: GameSetting, _player) -> None:
+    rtoi: DefaultDict[Role, int]
+
+    def __init__(self, game_info: GameInfo, game_setting: GameSetting, _player, params: Optional[ScoreParams] = None,
+                 dtype=np.float64) -> None:
         self.game_info = game_info
         self.game_setting = game_setting
+        # 役職構成から決まる役職番号・陣営の役職・行列の形
+        self.regulation = Regulation.of(game_setting.role_num_map)
         self.N = game_setting.player_num
-        self.M = len(game_info.existing_role_list)
-        # score_matrix[エージェント1, 役職1, エージェント2, 役職2]: エージェント1が役職1、エージェント2が役職2である相対確率の対数
-        # -infで相対確率は0になる
-        self.score_matrix: np.ndarray = np.full((NUM_PLAYERS, NUM_PLAYERS, NUM_ROLES), 0.5)
-        self.villager = SampleVillager()
-        self.seer = SampleSeer()
-        self.possessed = SamplePossessed()
-        self.werewolf = SampleWerewolf()
-        self.player = self.villager
+        self.M = self.regulation.M
+        # スコアの型 (メモリを節約する場合は np.float32)
+        self.dtype = np.dtype(dtype)
+        self.init_scores()
+        self.player = _player
+        self.me = _player.me # 自身のエージェント
         self.my_role = game_info.my_role # 自身の役職
-        for r, i in {Role.VILLAGER: 0, Role.SEER: 1, Role.POSSESSED: 2, Role.WEREWOLF: 3}.items():
-            self.rtoi[r] = i
-        self.seer_co_count = 0
-        self.medium_co_count = 0
-        self.bodyguard_co_count = 0
+        # スコアの加減算量 (Tuner で調整できる)
+        self.params: ScoreParams = params if params is not None else ScoreParams.default
+        self.rtoi = defaultdict(lambda: -1, self.regulation.rtoi)
+        # 発言からの推論に使うルール表 (同じパラメータと役職構成の ScoreMatrix で共有する)
+        self.rules: RuleTables = rule_tables(self.params, self.regulation, ScoreMatrix.resolve_roles)
+        # 日ごとの投票行動の加算の列
+        self.vote_steps: Dict[int, Steps] = {}
         self.seer_co = []
         self.medium_co = []
         self.bodyguard_co = []
+        # CO数を数える役職ごとの CO したエージェントのリスト
+        self.co_lists: Dict[Role, List[Agent]] = {Role.SEER: self.seer_co, Role.MEDIUM: self.medium_co, Role.BODYGUARD: self.bodyguard_co}
+        # 過去のゲームの行動から作った事前スコア (ScoreMatrixHandler が StatsStore から作って渡す)
+        self.profile: Optional[Profile] = None
         
         for a, r in game_info.role_map.items():
             if r != Role.ANY and r != Role.UNC:
                 self.set_score(a, r, a, r, float('inf'))
 
 
+    # スコアの保持方法を変える場合はサブクラスで上書きする (SparseScoreMatrix)
+    def init_scores(self) -> None:
+        # score_matrix[エージェント1, 役職1, エージェント2, 役職2]: エージェント1が役職1、エージェント2が役職2である相対確率の対数
+        # -infで相対確率は0になる
+        self.score_matrix: np.ndarray = np.full((self.N, self.M, self.N, self.M), START_BELIEF, dtype=self.dtype)
+
+
     def update(self, game_info: GameInfo) -> None:
         self.game_info = game_info
 
 
+    # (N, M, N, M) の配列としてのスコア (コピー)
+    def to_dense(self) -> np.ndarray:
+        return self.score_matrix.copy()
+
+
+    # スコアの保持に使っているメモリ量 (バイト)
+    def nbytes(self) -> int:
+        return self.score_matrix.nbytes
+
+
+    # 役職の割り当てに使う役職番号のリスト (5人村なら [0, 0, 1, 2, 3])
+    def role_list(self) -> List[int]:
+        return list(self.regulation.role_list)
+
+
     # スコアは相対確率の対数を表す
     # スコア = log(相対確率)
     # スコアの付け方
@@ -59,6 +93,22 @@ class ScoreMatrix:
     # 書くときは100を最大として、相対確率に直すときに1/10倍する
 
 
+    # 役職の割り当ての評価値 (Assignment.evaluate の負け判定以外の部分)
+    # assignment: 各エージェントの役職番号
+    def evaluate_assignment(self, assignment) -> float:
+        a = np.asarray(assignment, dtype=np.intp)
+        if a.min() < 0 or a.max() >= self.M: # 存在しない役職を含む場合は-inf
+            return -float('inf')
+        i = np.arange(self.N)
+        return float(self.score_matrix[i[:, None], a[:, None], i[None, :], a[None, :]].sum())
+
+
+    # 割り当ての表 (K, N) の各行の評価値 (K,)
+    def evaluate_table(self, table: np.ndarray) -> np.ndarray:
+        from Assignment import Assignment  # Assignment が ScoreMatrix を import するので、ここで import する
+        return Assignment.evaluate_table(self.score_matrix, table)
+
+
     # スコアの取得
     # agent1, agent2: Agent or int
     # role1, role2: Role or int
@@ -98,38 +148,38 @@ class ScoreMatrix:
                 self.score_matrix[i, ri, j, rj] = score
 
 
+    # 役職の指定を役職のリストに変換する
+    # role: Role, int, Species, Side or List
+    @staticmethod
+    def resolve_roles(role, regulation: Regulation) -> list:
+        if type(role) is Side:
+            role = role.get_role_list(regulation)
+        if type(role) is Species:
+            if role == Species.HUMAN:
+                role = Side.VILLAGERS.get_role_list(regulation) + [Role.POSSESSED] + ([Role.FOX] if regulation.has(Role.FOX) else [])
+            elif role == Species.WEREWOLF:
+                role = Role.WEREWOLF
+            else:
+                Util.error_print('role is not Species.HUMAN or Species.WEREWOLF')
+        if type(role) is not list:
+            role = [role]
+        return role
+
+
     # スコアの加算
     # agent1, agent2: Agent or int
     # role1, rold2: Role, int, Species, Side or List
     def add_score(self, agent1: Agent, role1: Role, agent2: Agent, role2: Role, score: float) -> None:
-        # 加算するスコアが大きい場合はどの関数から呼ばれたかを表示
-        if abs(score) >= 5:
-            caller = inspect.stack()[1]
-            if caller.function != "add_scores":
-                Util.debug_print("add_score:\t", caller.function, caller.lineno, "\t", score)
+        # 加算するスコアが大きい場合はどの関数から呼ばれたかを記録する
+        # 呼び出し元を調べるのは、score カテゴリのログが有効なときだけ
+        if abs(score) >= 5 and EventLog.enabled("score"):
+            caller = sys._getframe(1)
+            if caller.f_code.co_name != "add_scores":
+                EventLog.log("score", DEBUG, "add_score", caller=caller.f_code.co_name, line=caller.f_lineno, score=score)
+        SCORE_UPDATES.inc()
         
-        if type(role1) is Side:
-            role1 = role1.get_role_list(self.N)
-        if type(role2) is Side:
-            role2 = role2.get_role_list(self.N)
-        if type(role1) is Species:
-            if role1 == Species.HUMAN:
-                role1 = Side.VILLAGERS.get_role_list(self.N) + [Role.POSSESSED]
-            elif role1 == Species.WEREWOLF:
-                role1 = Role.WEREWOLF
-            else:
-                Util.error_print('role1 is not Species.HUMAN or Species.WEREWOLF')
-        if type(role2) is Species:
-            if role2 == Species.HUMAN:
-                role2 = Side.VILLAGERS.get_role_list(self.N) + [Role.POSSESSED]
-            elif role2 == Species.WEREWOLF:
-                role2 = Role.WEREWOLF
-            else:
-                Util.error_print('role2 is not Species.HUMAN or Species.WEREWOLF')
-        if type(role1) is not list:
-            role1 = [role1]
-        if type(role2) is not list:
-            role2 = [role2]
+        role1 = ScoreMatrix.resolve_roles(role1, self.regulation)
+        role2 = ScoreMatrix.resolve_roles(role2, self.regulation)
         for r1 in role1:
             for r2 in role2:
                 modified_score = self.get_score(agent1, r1, agent2, r2) + score
@@ -138,15 +188,85 @@ class ScoreMatrix:
 
     # スコアの加算をまとめて行う
     def add_scores(self, agent: Agent, score_dict: Dict[Role, float]) -> None:
-        # 加算するスコアが大きい場合はどの関数から呼ばれたかを表示
-        if min(score_dict.values()) <= -5 or max(score_dict.values()) >= 5:
-            caller = inspect.stack()[1]
-            Util.debug_print("add_scores:\t", caller.function, caller.lineno, "\t", {str(r)[5]: s for r, s in score_dict.items()})
+        # 加算するスコアが大きい場合はどの関数から呼ばれたかを記録する
+        if EventLog.enabled("score") and (min(score_dict.values()) <= -5 or max(score_dict.values()) >= 5):
+            caller = sys._getframe(1)
+            EventLog.log("score", DEBUG, "add_scores", caller=caller.f_code.co_name, line=caller.f_lineno,
+                         agent=agent, scores={r.name: s for r, s in score_dict.items()})
         
         for key, value in score_dict.items():
             self.add_score(agent, key, agent, key, value)
 
 
+    # ルール表の加算の列を適用する
+    # 加算ごとに add_score と同じく ±100 に切り詰める
+    def apply_steps(self, steps: Steps, talker: Agent, target: Agent, key=None) -> None:
+        if steps and EventLog.enabled("score"):
+            EventLog.log("score", DEBUG, "apply_steps", key=key, talker=talker, target=target, deltas=[step.delta for step in steps])
+        SCORE_UPDATES.inc()
+        i = talker.agent_idx-1
+        j = target.agent_idx-1
+        for step in steps:
+            cells = (i, step.ri, j if step.pair else i, step.rj)
+            self.score_matrix[cells] = np.clip(self.score_matrix[cells] + step.delta, -100, 100)
+
+
+    # 同じ加算の列を (talker, target) の組ごとに適用する
+    # pairs: (talker, target) のエージェント番号 (0始まり) の組のリスト
+    def apply_pair_steps(self, steps: Steps, pairs: List[Tuple[int, int]], key=None) -> None:
+        if steps and EventLog.enabled("score"):
+            EventLog.log("score", DEBUG, "apply_pair_steps", key=key, pairs=pairs, deltas=[step.delta for step in steps])
+        SCORE_UPDATES.inc(len(pairs))
+        # 同じ組が2回ある場合 (再投票) は、加算ごとの切り詰めが1組ずつ適用した場合と同じになるように分けて適用する
+        start = 0
+        seen: Set[Tuple[int, int]] = set()
+        for k, pair in enumerate(pairs):
+            if pair in seen:
+                self.add_pair_steps(steps, pairs[start:k])
+                start = k
+                seen.clear()
+            seen.add(pair)
+        self.add_pair_steps(steps, pairs[start:])
+
+
+    # 重複のない組に加算の列をまとめて適用する
+    def add_pair_steps(self, steps: Steps, pairs: List[Tuple[int, int]]) -> None:
+        idx = np.array(pairs, dtype=np.intp)
+        i, j = idx[:, :1], idx[:, 1:]
+        for step in steps:
+            cells = (i, step.ri[None, :], j if step.pair else i, step.rj[None, :])
+            self.score_matrix[cells] = np.clip(self.score_matrix[cells] + step.delta, -100, 100)
+
+
+    # (N, M, N, M) の加算量をまとめて加算する (0 の要素は変更しない)
+    def add_pairwise(self, delta: np.ndarray, key=None) -> None:
+        SCORE_UPDATES.inc()
+        mask = delta != 0
+        if EventLog.enabled("score"):
+            EventLog.log("score", DEBUG, "add_pairwise", key=key, cells=int(mask.sum()), total=float(delta.sum()))
+        self.score_matrix[mask] = np.clip(self.score_matrix[mask] + delta[mask], -100, 100)
+
+
+    # (N, M) の加算量を対角要素 score[i, r, i, r] にまとめて加算する
+    # agent を指定した場合はそのエージェントの行だけを加算する
+    # 確定した役職 (±inf) の要素と自分の行は変更しない
+    def add_unary(self, delta: np.ndarray, agent: Optional[Agent] = None) -> None:
+        SCORE_UPDATES.inc()
+        i = np.arange(self.N)[:, None] if agent is None else np.array([[agent.agent_idx-1]])
+        r = np.arange(self.M)[None, :]
+        cells = (i, r, i, r)
+        current = self.score_matrix[cells]
+        d = delta[i[:, 0]]
+        mask = (d != 0) & np.isfinite(current) & (i != self.me.agent_idx-1)
+        self.score_matrix[cells] = np.where(mask, np.clip(current + d, -100, 100), current)
+
+
+    # 過去のゲームの行動から作った事前スコアを対角要素に加算する
+    def set_profile(self, profile: Profile) -> None:
+        self.profile = profile
+        self.add_unary(profile.prior)
+
+
 # --------------- 公開情報から推測する ---------------
     # 襲撃結果を反映
     def killed(self, game_info: GameInfo, game_setting: GameSetting, agent: Agent) -> None:
@@ -157,17 +277,29 @@ class ScoreMatrix:
 
     # 投票行動を反映
     def vote(self, game_info: GameInfo, game_setting: GameSetting, voter: Agent, target: Agent, day: int) -> None:
+        self.votes(game_info, game_setting, [(voter, target)], day)
+
+
+    # その日の投票行動をまとめて反映する
+    # votes: (投票者, 投票先) のリスト
+    def votes(self, game_info: GameInfo, game_setting: GameSetting, votes: List[Tuple[Agent, Agent]], day: int) -> None:
         self.update(game_info)
-        N = self.N
         # 自分の投票行動は無視
-        if voter == self.me:
+        pairs = [(voter.agent_idx-1, target.agent_idx-1) for voter, target in votes if voter != self.me]
+        if not pairs:
             return
-        # ---------- 5人村 ----------
-        # 2日目でゲームの勝敗が決定しているので、1日目の投票行動の反映はほとんど意味ない
-        if N == 5:
-            # 投票者が村陣営で、投票対象が人狼である確率を上げる
-            self.add_score(voter, Role.VILLAGER, target, Role.WEREWOLF, +0.1)
-            self.add_score(voter, Role.SEER, target, Role.WEREWOLF, +0.3)
+        # スコアの変更は ScoreRules.vote_rules を展開した加算の列 (日ごとに作って使い回す)
+        steps = self.vote_steps.get(day)
+        if steps is None:
+            steps = compile_vote_steps(self.params, self.regulation, ScoreMatrix.resolve_roles, day)
+            self.vote_steps[day] = steps
+        self.apply_pair_steps(steps, pairs, "vote")
+
+
+    # その日の投票グラフの特徴量 (VoteGraph) を1回の加算で反映する
+    def vote_graph(self, game_info: GameInfo, game_setting: GameSetting, graph: VoteGraph, day: int) -> None:
+        self.update(game_info)
+        self.add_pairwise(graph.delta(day, self.regulation, self.params, self.me), "vote_graph")
 
 
 # --------------- 自身の能力の結果から推測する：確定情報なのでスコアを +inf or -inf にする ---------------
@@ -187,99 +319,65 @@ class ScoreMatrix:
             Util.error_print('my_divined: species is not Species.WEREWOLF or Species.HUMAN')
 
 
+    # 自分の霊媒結果を反映（結果騙りは考慮しない）
+    def my_identified(self, game_info: GameInfo, game_setting: GameSetting, target: Agent, species: Species) -> None:
+        self.update(game_info)
+        # 黒結果
+        if species == Species.WEREWOLF:
+            self.set_score(target, Role.WEREWOLF, target, Role.WEREWOLF, +float('inf'))
+        # 白結果
+        elif species == Species.HUMAN:
+            self.set_score(target, Role.WEREWOLF, target, Role.WEREWOLF, -float('inf'))
+        else:
+            Util.error_print('my_identified: species is not Species.WEREWOLF or Species.HUMAN')
+
+
+    # 自分の護衛結果を反映
+    # 人狼の自噛みはルール上なし
+    def my_guarded(self, game_info: GameInfo, game_setting: GameSetting, target: Agent) -> None:
+        self.update(game_info)
+        # 護衛が成功したエージェントは人狼ではない
+        self.set_score(target, Role.WEREWOLF, target, Role.WEREWOLF, -float('inf'))
+
+
 
 # --------------- 他の人の発言から推測する：確定情報ではないので有限の値を加減算する ---------------
     # 他者のCOを反映
     def talk_co(self, game_info: GameInfo, game_setting: GameSetting, talker: Agent, role: Role, day: int, turn: int) -> None:
         self.update(game_info)
-        N = self.N
         my_role = self.my_role
         role_map = self.game_info.role_map
         # 自分と仲間の人狼のCOは無視
         if talker == self.me or (talker in role_map and role_map[talker] == Role.WEREWOLF):
             return
-        # ---------- 5人村 ----------
-        if N == 5:
-            # ----- 占いCO -----
-            # 基本、初日の早いターンでCOなので、COでのスコア変更は少なめにして、結果でスコアを変更する
-            if role == Role.SEER:
-                # --- 占い ---
-                if my_role == Role.SEER:
-                    # 人狼と狂人の確率を上げる（対抗にしか黒結果が出ない）のではなく、村人と占いの確率を下げる
-                    # +5, +3を上回る行動学習結果なら、行動学習を優先する
-                    self.add_scores(talker, {Role.VILLAGER: -100, Role.SEER: -100, Role.POSSESSED: +5, Role.WEREWOLF: +3})
-                # --- それ以外 ---
-                else:
-                    # 既にCOしている場合：複数回COすることでscoreを稼ぐのを防ぐ
-                    if talker in self.seer_co:
-                        return
-                    # 複数占いCOがあった場合、誰か一人が真で残りは偽である確率はほぼ100%
-                    # (両方とも偽という割り当ての確率を0%にする)
-                    # for seer in set(self.seer_co) | self.hidden_seers:
-                    #     self.add_score(seer, Role.SEER, talker, Side.WEREWOLVES, +100)
-                    #     self.add_score(talker, Role.SEER, seer, Side.WEREWOLVES, +100)
-                    # 村人である確率を下げる（村人の役職騙りを考慮しない）
-                    self.add_scores(talker, {Role.VILLAGER: -100})
-                    # 初COの場合
-                    self.seer_co_count += 1
-                    self.seer_co.append(talker)
-                    # --- 人狼 ---
-                    if my_role == Role.WEREWOLF:
-                        # 占いと狂人どちらもありうるので、CO段階では何もしない→結果でスコアを変更する
-                        return
-                    # --- 狂人 ---
-                    elif my_role == Role.POSSESSED:
-                        # 占いと人狼どちらもありうるので、CO段階では少しの変更にする
-                        # 気持ち、1CO目は占いっぽい
-                        if self.seer_co_count == 1:
-                            self.add_scores(talker, {Role.SEER: +1})
-                        # 2CO目以降は無視
-                        else:
-                            return
-                    # --- 村人 ---
-                    else:
-                        # 村人視点では、COを重視する：結果では正確に判断できないから
-                        # 気持ち、1,2CO目は占いor狂人、3CO目は占いor人狼っぽい
-                        if self.seer_co_count == 1:
-                            self.add_scores(talker, {Role.SEER: +2, Role.POSSESSED: +2, Role.WEREWOLF: +1})
-                        elif self.seer_co_count == 2:
-                            self.add_scores(talker, {Role.SEER: +2, Role.POSSESSED: +2, Role.WEREWOLF: +2})
-                        else:
-                            self.add_scores(talker, {Role.SEER: +1, Role.POSSESSED: +1, Role.WEREWOLF: +2})
-            # ----- 狂人CO -----
-            # 村人の狂人COはないと仮定する→PP阻止のために村人が狂人COすることがある→少しの変更にする
-            elif role == Role.POSSESSED:
-                # --- 人狼 ---
-                if my_role == Role.WEREWOLF:
-                    self.add_scores(talker, {Role.POSSESSED: +5})
-                # --- 狂人 ---
-                elif my_role == Role.POSSESSED:
-                    # 人狼で狂人COするエージェントはいないので不要→今までの推論を優先するべき
-                    # self.add_scores(talker, {Role.WEREWOLF: +5})
-                    pass
-                # --- 村人 or 占い ---
-                else:
-                    self.add_scores(talker, {Role.POSSESSED: +5, Role.WEREWOLF: +1})
-            # ----- 人狼CO -----
-            elif role == Role.WEREWOLF:
-                # --- 狂人 ---
-                if my_role == Role.POSSESSED:
-                    # 村陣営がPP阻止のために、人狼COする場合があるので、少しの変更にする
-                    self.add_scores(talker, {Role.WEREWOLF: +5})
-                # --- 人狼 ---
-                elif my_role == Role.WEREWOLF:
-                    # 村陣営がPP阻止のために、人狼COする場合があるので、少しの変更にする
-                    self.add_scores(talker, {Role.POSSESSED: +5})
-                # --- 村人 or 占い ---
-                else:
-                    # 狂人と人狼どちらもありうるので、少しの変更にする：狂人と人狼で優劣をつけない→あくまで今までの結果を重視する
-                    self.add_scores(talker, {Role.POSSESSED: +5, Role.WEREWOLF: +5})
+        # 占い・霊媒・狩人のCO数を数える
+        co_list = self.co_lists.get(role)
+        if co_list is not None and my_role != role:
+            # 既にCOしている場合：複数回COすることでscoreを稼ぐのを防ぐ
+            if talker in co_list:
+                return
+            # 複数占いCOがあった場合、誰か一人が真で残りは偽である確率はほぼ100%
+            # (両方とも偽という割り当ての確率を0%にする)
+            # for seer in set(self.seer_co) | self.hidden_seers:
+            #     self.add_score(seer, Role.SEER, talker, Side.WEREWOLVES, +100)
+            #     self.add_score(talker, Role.SEER, seer, Side.WEREWOLVES, +100)
+            # 初COの場合
+            co_list.append(talker)
+            # 過去のゲームで人狼陣営の時に騙りをしがちなエージェント
+            if self.profile is not None:
+                self.add_unary(self.profile.co, talker)
+            # 霊媒2COとなった時に、1CO目を真とした分のスコアを取り消す
+            if role == Role.MEDIUM and len(co_list) == 2 and not self.regulation.basic:
+                self.add_scores(co_list[0], {Role.MEDIUM: -self.params["co_medium.large.1st.medium"]})
+        # スコアの変更は ScoreRules.co_rules を展開したルール表を引く
+        key = co_key(my_role, role, len(co_list) if co_list is not None else 0)
+        self.apply_steps(self.rules.co.get(key, ()), talker, talker, key)
 
     # 投票意思を反映
     # それほど重要ではないため、スコアの更新は少しにする
     def talk_will_vote(self, game_info: GameInfo, game_setting: GameSetting, talker: Agent, target: Agent, day: int, turn: int) -> None:
         self.update(game_info)
-        N = self.N
+        p = self.params
         will_vote = self.player.will_vote_reports
         # 自分の投票意思は無視
         if talker == self.me:
@@ -290,14 +388,20 @@ class ScoreMatrix:
         # 初日初ターンは無視
         if day == 1 and turn <= 1:
             return
-        # ---------- 5人村 ----------
-        if N == 5:
+        # 過去のゲームで宣言どおりに投票したエージェントの宣言ほど重く扱う (Profile.vote、記録がなければ 1)
+        w = self.profile.vote[talker.agent_idx - 1] if self.profile is not None else 1.0
+        # ---------- 占い師以外の能力者がいない村 (5人村) ----------
+        if self.regulation.basic:
             # 発言者が村人・占い師で、対象が人狼である確率を上げる
-            self.add_score(talker, Role.VILLAGER, target, Role.WEREWOLF, +0.1)
-            self.add_score(talker, Role.SEER, target, Role.WEREWOLF, +0.3)
+            self.add_score(talker, Role.VILLAGER, target, Role.WEREWOLF, w * p["will_vote.villager"])
+            self.add_score(talker, Role.SEER, target, Role.WEREWOLF, w * p["will_vote.seer"])
             # 人狼は投票意思を示しがちだから、人狼である確率を上げる
             # 違う対象に投票意思を示している
-            self.add_scores(talker, {Role.WEREWOLF: +1})
+            self.add_scores(talker, {Role.WEREWOLF: p["will_vote.werewolf"]})
+        # ---------- 霊媒師・狩人のいる村 (15人村など) ----------
+        else:
+            # 発言者が村陣営で、対象が人狼である確率を日にちで重み付けして上げる
+            self.add_score(talker, Side.VILLAGERS, target, Role.WEREWOLF, w * day * p["will_vote.large.villagers_per_day"])
 
 
     # Basketにないため、後で実装する→実装しない
@@ -306,17 +410,16 @@ class ScoreMatrix:
 
 
     # 他者の占い結果を反映
-    # 条件分岐は、N人村→myrole→白黒結果→targetが自分かどうか
+    # 条件分岐は、役職構成→myrole→白黒結果→targetが自分かどうか
     def talk_divined(self, game_info: GameInfo, game_setting: GameSetting, talker: Agent, target: Agent, species: Species, day: int, turn: int) -> None:
         self.update(game_info)
-        N = self.N
         my_role = self.my_role
         role_map = self.game_info.role_map
         # 自分と仲間の人狼の結果は無視
         if talker == self.me or (talker in role_map and role_map[talker] == Role.WEREWOLF):
             return
         # CO の時点で占い師以外の村人陣営の可能性を0にしているが、COせずに占い結果を出した場合のためにここでも同じ処理を行う
-        self.add_scores(talker, {Role.VILLAGER: -100, Role.MEDIUM: -100, Role.BODYGUARD: -100})
+        self.apply_steps(self.rules.divined_claim, talker, talker, "divined_claim")
         # すでに同じ相手に対する占い結果がある場合は無視
         # ただし、結果が異なる場合は、人狼・狂人の確率を上げる
         for report in self.player.divination_reports:
@@ -324,118 +427,69 @@ class ScoreMatrix:
                 if report.result == species:
                     return
                 else:
-                    Util.debug_print('同じ相手に対して異なる占い結果を出した時')
-                    self.add_scores(talker, {Role.POSSESSED: +100, Role.WEREWOLF: +100})
+                    # 同じ相手に対して異なる占い結果を出した時
+                    EventLog.log("inference", INFO, "divined_conflict", talker=talker, target=target)
+                    self.apply_steps(self.rules.divined_conflict, talker, talker, "divined_conflict")
                     return
-        # ---------- 5人村 ----------
-        if N == 5:
-            # ----- 占い -----
-            if my_role == Role.SEER:
-                # self.add_scores(talker, {Role.POSSESSED: +100, Role.WEREWOLF: +100})
-                self.add_scores(talker, {Role.VILLAGER: -100, Role.SEER: -100, Role.POSSESSED: +5, Role.WEREWOLF: +3})
-                # 黒結果
-                if species == Species.WEREWOLF:
-                    # 対象：自分
-                    if target == self.me:
-                        self.add_scores(talker, {Role.POSSESSED: +100, Role.WEREWOLF: +100})
-                    # 対象：自分以外
-                    else:
-                        self.add_score(talker, Side.WEREWOLVES, target, Species.HUMAN, +5)
-                        self.add_score(talker, Side.WEREWOLVES, target, Role.WEREWOLF, -5)
-                # 白結果
-                elif species == Species.HUMAN:
-                    # 対象：自分
-                    if target == self.me:
-                        self.add_scores(talker, {Role.POSSESSED: +100, Role.WEREWOLF: +100})
-                    # 対象：自分以外
-                    else:
-                        self.add_score(talker, Side.WEREWOLVES, target, Species.HUMAN, -5)
-                        self.add_score(talker, Side.WEREWOLVES, target, Role.WEREWOLF, +5)
-            # ----- 人狼 -----
-            elif my_role == Role.WEREWOLF:
-                # 黒結果
-                if species == Species.WEREWOLF:
-                    # 対象：自分
-                    if target == self.me:
-                        # talkerの占い師である確率を上げる (誤爆を考慮しなければ100%)
-                        self.add_scores(talker, {Role.SEER: +100, Role.POSSESSED: +0})
-                    # 対象：自分以外
-                    else:
-                        # talkerの狂人である確率を上げる (ほぼ100%と仮定)
-                        if self.player.comingout_map[target] == Role.SEER:
-                            self.add_scores(talker, {Role.POSSESSED: +10})
-                            Util.debug_print('狂人:\t', talker)
-                # 白結果
-                elif species == Species.HUMAN:
-                    # 対象：自分
-                    if target == self.me:
-                        # talkerの占い師である確率を下げる、狂人である確率を上げる（結果の矛盾が起こっているから、値を大きくしている）
-                        self.add_scores(talker, {Role.SEER: -100, Role.POSSESSED: +100})
-                        Util.debug_print('狂人:\t', talker)
-                    # 対象：自分以外
-                    else:
-                        # 狂人は基本的に黒結果を出すことが多いので、talkerの占い師である確率を上げる
-                        # 確定ではないので、値は控えめにする
-                        self.add_scores(talker, {Role.SEER: +10, Role.POSSESSED: +5})
-            # ----- 狂人 -----
-            elif my_role == Role.POSSESSED:
-                # 黒結果
-                if species == Species.WEREWOLF:
-                    # 対象：自分
-                    if target == self.me:
-                        # talkerの占い師である確率を下げる
-                        # 本来は占い師である確率を0%にしたいが、占い師の結果騙りがあるため、-100にはしない
-                        self.add_scores(talker, {Role.SEER: -5, Role.WEREWOLF: +5})
-                    # 対象：自分以外
-                    else:
-                        # talkerが占い師で、targetが人狼である確率を上げる
-                        # かなりの確率で人狼であると仮定する
-                        self.add_score(talker, Role.SEER, target, Role.WEREWOLF, +10)
-                        # 占い師は確率的に白結果を出すことが多いので、talkerの人狼である確率を少し上げる
-                        self.add_scores(talker, {Role.WEREWOLF: +3})
-                # 白結果
-                elif species == Species.HUMAN:
-                    # 対象：自分
-                    if target == self.me:
-                        # talkerの占い師である確率を上げる
-                        # 自分への白結果はほぼ占い師確定
-                        self.add_scores(talker, {Role.SEER: +10})
-                    # 対象：自分以外
-                    else:
-                        # talkerが占い師で、targetが人狼である確率を下げる
-                        self.add_score(talker, Role.SEER, target, Role.WEREWOLF, -5)
-                        # 人狼は基本的に黒結果を出すことが多いので、talkerの占い師である確率を上げる
-                        # 確定ではないので、値は控えめにする
-                        self.add_scores(talker, {Role.SEER: +3, Role.WEREWOLF: +1})
-            # ----- 村人 -----
+        # 過去のゲームで偽の時に黒結果を出しがちなエージェント
+        if species == Species.WEREWOLF and self.profile is not None:
+            self.add_unary(self.profile.black, talker)
+        # スコアの変更は ScoreRules.divined_rules を展開したルール表を引く
+        key = divined_key(my_role, species, target == self.me, self.player.comingout_map.get(target) == Role.SEER,
+                          role_map.get(target) == Role.WEREWOLF, day == 1)
+        self.apply_steps(self.rules.divined.get(key, ()), talker, target, key)
+
+    # 他者の霊媒結果を反映
+    def talk_identified(self, game_info: GameInfo, game_setting: GameSetting, talker: Agent, target: Agent, species: Species, day: int, turn: int) -> None:
+        self.update(game_info)
+        role_map = self.game_info.role_map
+        # 霊媒師のいない村と、自分と仲間の人狼の結果は無視
+        if not self.regulation.has(Role.MEDIUM) or talker == self.me or (talker in role_map and role_map[talker] == Role.WEREWOLF):
+            return
+        # すでに同じ相手に対する霊媒結果がある場合は無視
+        # ただし、結果が異なる場合は、人狼・狂人の確率を上げる
+        for report in self.player.identification_reports:
+            if report.agent == talker and report.target == target:
+                if report.result != species:
+                    self.apply_steps(self.rules.divined_conflict, talker, talker, "identified_conflict")
+                return
+        # スコアの変更は ScoreRules.identified_rules を展開したルール表を引く
+        key = identified_key(self.my_role, species, role_map.get(target) == Role.WEREWOLF)
+        self.apply_steps(self.rules.identified.get(key, ()), talker, target, key)
+
+    # 護衛成功発言を反映
+    def talk_guarded(self, game_info: GameInfo, game_setting: GameSetting, talker: Agent, target: Agent, day: int, turn: int) -> None:
+        self.update(game_info)
+        my_role = self.my_role
+        p = self.params
+        # 狩人のいない村 (5人村) と、自分の発言と、護衛失敗していたら無視
+        if not self.regulation.has(Role.BODYGUARD) or talker == self.me or len(self.game_info.last_dead_agent_list) != 0:
+            return
+        # ----- 狩人 -----
+        if my_role == Role.BODYGUARD:
+            # 狩人は自分だけなので、護衛成功を騙るのは人狼陣営
+            self.add_scores(talker, {Role.POSSESSED: +100, Role.WEREWOLF: +100})
+        # ----- 人狼 -----
+        elif my_role == Role.WEREWOLF:
+            if self.game_info.attacked_agent == target:
+                # 襲撃先と護衛成功発言先が一致していたら狩人の可能性を増やす
+                self.add_scores(talker, {Role.BODYGUARD: p["talk_guarded.werewolf.attacked.bodyguard"],
+                                         Role.POSSESSED: p["talk_guarded.werewolf.attacked.possessed"]})
             else:
-                # 黒結果
-                if species == Species.WEREWOLF:
-                    # 対象：自分
-                    if target == self.me:
-                        # talkerの占い師である確率を下げる（結果の矛盾が起こっているから、値を大きくしている）
-                        self.add_scores(talker, {Role.SEER: -100, Role.POSSESSED: +10, Role.WEREWOLF: +10})
-                    # 対象：自分以外
-                    else:
-                        # talkerが占い師で、targetが人狼である確率を上げる
-                        self.add_score(talker, Role.SEER, target, Role.WEREWOLF, +3)
-                        # talkerが狂人と人狼である確率を少し上げる
-                        self.add_scores(talker, {Role.POSSESSED: +3, Role.WEREWOLF: +1})
-                # 白結果
-                elif species == Species.HUMAN:
-                    # 対象：自分
-                    if target == self.me:
-                        # talkerの占い師である確率を上げる
-                        # 自分への白結果はほぼ占い師確定
-                        self.add_scores(talker, {Role.SEER: +10})
-                    # 対象：自分以外
-                    else:
-                        # talkerが占い師で、targetが人狼である確率を下げる
-                        self.add_score(talker, Role.SEER, target, Role.WEREWOLF, -5)
-                        # 人狼は基本的に黒結果を出すことが多いので、talkerの占い師である確率を上げる
-                        # 確定ではないので、値は控えめにする
-                        self.add_scores(talker, {Role.SEER: +3, Role.POSSESSED: +1, Role.WEREWOLF: +1})
-        
+                # 襲撃先と護衛成功発言先が一致していなかったら狂人確定
+                self.add_scores(talker, {Role.BODYGUARD: -100, Role.POSSESSED: +100})
+        # ----- 狂人 or 村人 or 占い or 霊媒 -----
+        else:
+            # 護衛が成功していたら護衛対象は人狼ではない
+            self.add_score(talker, Role.BODYGUARD, target, Role.WEREWOLF, p["talk_guarded.village.bodyguard.werewolf"])
+            self.add_score(talker, Role.BODYGUARD, target, Species.HUMAN, p["talk_guarded.village.bodyguard.human"])
+            self.add_score(talker, Side.WEREWOLVES, target, Side.VILLAGERS, p["talk_guarded.village.werewolves.villagers"])
+            self.add_score(talker, Side.WEREWOLVES, target, Side.WEREWOLVES, p["talk_guarded.village.werewolves.werewolves"])
+
+    # 投票した発言を反映→実装しない (投票結果は公開されていて vote で反映する)
+    def talk_voted(self, game_info: GameInfo, game_setting: GameSetting, talker: Agent, target: Agent, day: int, turn: int) -> None:
+        self.update(game_info)
+
 # --------------- 他の人の発言から推測する ---------------
 
     # N日目の始めに推測する
@@ -443,6 +497,7 @@ class ScoreMatrix:
     def Nth_day_start(self, game_info: GameInfo, game_setting: GameSetting) -> None:
         self.update(game_info)
         day: int = self.game_info.day
+        p = self.params
         my_role = self.my_role
 
         # if day <= 2 or len(game_info.last_dead_agent_list) == 0:
@@ -450,15 +505,26 @@ class ScoreMatrix:
         if day <= 2:
             return
 
-        # 生存者数の推移(GJなし)：15→13→11→9→7→5
-        # 3日目0GJ(11人)、4日目1GJ以下(14-day人以下)なら、採用
+        # 生存者数の推移(GJなし)：N→N-2→N-4→... (15人村なら 15→13→11→9→7→5)
+        # 3日目0GJ(N-4人)、4日目以降1GJ以下(N-1-day人以下)なら、採用
+        # 狩人のいない村では毎晩襲撃が成功するので、常に採用
         alive_cnt: int = len(self.game_info.alive_agent_list)
-        Util.debug_print('(day, alive_cnt) = ', day, alive_cnt)
-        if (day == 3 and alive_cnt <= 11) or (day >= 4 and alive_cnt <= 14-day):
-            Util.debug_print('Nth_day_start: 採用')
+        N = self.N
+        adopted = not self.regulation.has(Role.BODYGUARD) or (day == 3 and alive_cnt <= N-4) or (day >= 4 and alive_cnt <= N-1-day)
+        EventLog.log("inference", DEBUG, "day_start", alive=alive_cnt, adopted=adopted)
+        if adopted:
             if my_role != Role.WEREWOLF:
                 for agent, role in self.player.alive_comingout_map.items():
                     if role in [Role.SEER, Role.MEDIUM, Role.BODYGUARD]:
-                        self.add_scores(agent, {Role.POSSESSED: +1, Role.WEREWOLF: +3})
+                        self.add_scores(agent, {Role.POSSESSED: p["day_start.possessed"], Role.WEREWOLF: p["day_start.werewolf"]})
+
+# --------------- 行動学習 ---------------
+
+    # 発言者の行動から学習した役職ごとのスコアを反映する
+    def apply_action_learning(self, talker: Agent, score: DefaultDict[Role, float]) -> None:
+        for r, s in score.items():
+            self.add_score(talker, r, talker, r, s)
 
 
+# 5人村のルール表は import 時に作っておく
+rule_tables(ScoreParams.default, Regulation.of(ROLE_NUM_MAP_5), ScoreMatrix.resolve_roles)
@@ -0,0 +1,209 @@
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# ScoreMatrix の推論で使う定数 (スコアの加減算量) の一覧
+# 名前は "イベント.自分の役職.状況.対象の役職" の形式
+# "large" は霊媒師・狩人のいる村 (15人村など) のルールで、付いていないものは5人村のルール
+# 確定情報を表す ±100 は調整の対象外なので、ここには含めない
+PARAMS: List[Tuple[str, float]] = [
+    # 投票行動
+    ("vote.villager", 0.1),
+    ("vote.seer", 0.3),
+    ("vote.large.villagers_per_day", 0.2),
+    ("vote.large.werewolves.werewolf", -1),
+    ("vote.large.bandwagon.werewolves.human", 0.3),
+    ("vote.large.split.werewolf.werewolf", 0.5),
+    # 占いCO
+    ("co_seer.seer.possessed", 5),
+    ("co_seer.seer.werewolf", 3),
+    ("co_seer.possessed.1st.seer", 1),
+    ("co_seer.village.1st.seer", 2),
+    ("co_seer.village.1st.possessed", 2),
+    ("co_seer.village.1st.werewolf", 1),
+    ("co_seer.village.2nd.seer", 2),
+    ("co_seer.village.2nd.possessed", 2),
+    ("co_seer.village.2nd.werewolf", 2),
+    ("co_seer.village.3rd.seer", 1),
+    ("co_seer.village.3rd.possessed", 1),
+    ("co_seer.village.3rd.werewolf", 2),
+    ("co_seer.large.possessed.1st.seer", 1),
+    ("co_seer.large.possessed.1st.werewolf", 0.5),
+    ("co_seer.large.possessed.2nd.seer", 1),
+    ("co_seer.large.possessed.2nd.werewolf", 1),
+    ("co_seer.large.possessed.3rd.werewolf", 2),
+    ("co_seer.large.village.1st.seer", 2),
+    ("co_seer.large.village.1st.possessed", 2),
+    ("co_seer.large.village.1st.werewolf", 1),
+    ("co_seer.large.village.2nd.seer", 2),
+    ("co_seer.large.village.2nd.possessed", 2),
+    ("co_seer.large.village.2nd.werewolf", 2),
+    ("co_seer.large.village.3rd.seer", 2),
+    ("co_seer.large.village.3rd.possessed", 1),
+    ("co_seer.large.village.3rd.werewolf", 2),
+    ("co_seer.large.village.4th.seer", 0),
+    ("co_seer.large.village.4th.possessed", 3),
+    ("co_seer.large.village.4th.werewolf", 5),
+    # 霊媒CO
+    ("co_medium.large.1st.medium", 10),
+    ("co_medium.large.werewolf.medium", 1),
+    ("co_medium.large.possessed.1st.medium", 2),
+    ("co_medium.large.possessed.1st.werewolf", 1),
+    ("co_medium.large.possessed.2nd.medium", 1),
+    ("co_medium.large.possessed.2nd.werewolf", 2),
+    ("co_medium.large.possessed.3rd.werewolf", 2),
+    ("co_medium.large.village.medium", 1),
+    ("co_medium.large.village.3rd.werewolf", 2),
+    # 狩人CO
+    ("co_bodyguard.large.possessed.1st.bodyguard", 2),
+    ("co_bodyguard.large.possessed.2nd.werewolf", 2),
+    ("co_bodyguard.large.village.1st.bodyguard", 2),
+    ("co_bodyguard.large.village.1st.werewolf", 1),
+    ("co_bodyguard.large.village.2nd.bodyguard", 1),
+    ("co_bodyguard.large.village.2nd.werewolf", 2),
+    ("co_bodyguard.large.village.3rd.werewolf", 2),
+    # 狂人CO
+    ("co_possessed.werewolf.possessed", 5),
+    ("co_possessed.village.possessed", 5),
+    ("co_possessed.village.werewolf", 1),
+    ("co_possessed.large.possessed.werewolf", 10),
+    ("co_possessed.large.werewolf.possessed", 10),
+    # 人狼CO
+    ("co_werewolf.possessed.werewolf", 5),
+    ("co_werewolf.werewolf.possessed", 5),
+    ("co_werewolf.village.possessed", 5),
+    ("co_werewolf.village.werewolf", 5),
+    ("co_werewolf.large.werewolf.possessed", 10),
+    ("co_werewolf.large.possessed.werewolf", 10),
+    ("co_werewolf.large.village.possessed", 10),
+    ("co_werewolf.large.village.werewolf", 10),
+    # 村人CO
+    ("co_villager.large.werewolf.villager", 10),
+    # 投票意思
+    ("will_vote.villager", 0.1),
+    ("will_vote.seer", 0.3),
+    ("will_vote.werewolf", 1),
+    ("will_vote.large.villagers_per_day", 0.1),
+    # 占い結果
+    ("divined.seer.possessed", 5),
+    ("divined.seer.werewolf", 3),
+    ("divined.seer.black.human", 5),
+    ("divined.seer.black.werewolf", -5),
+    ("divined.seer.white.human", -5),
+    ("divined.seer.white.werewolf", 5),
+    ("divined.werewolf.black_seer.possessed", 10),
+    ("divined.werewolf.white.seer", 10),
+    ("divined.werewolf.white.possessed", 5),
+    ("divined.possessed.black_me.seer", -5),
+    ("divined.possessed.black_me.werewolf", 5),
+    ("divined.possessed.black.pair", 10),
+    ("divined.possessed.black.werewolf", 3),
+    ("divined.possessed.white_me.seer", 10),
+    ("divined.possessed.white.pair", -5),
+    ("divined.possessed.white.seer", 3),
+    ("divined.possessed.white.werewolf", 1),
+    ("divined.village.black_me.possessed", 10),
+    ("divined.village.black_me.werewolf", 10),
+    ("divined.village.black.pair", 3),
+    ("divined.village.black.possessed", 3),
+    ("divined.village.black.werewolf", 1),
+    ("divined.village.white_me.seer", 10),
+    ("divined.village.white.pair", -5),
+    ("divined.village.white.seer", 3),
+    ("divined.village.white.possessed", 1),
+    ("divined.village.white.werewolf", 1),
+    ("divined.large.seer.black.human", 5),
+    ("divined.large.seer.black.werewolf", -5),
+    ("divined.large.seer.white.human", -5),
+    ("divined.large.seer.white.werewolf", 5),
+    ("divined.large.werewolf.black_ally.seer", 10),
+    ("divined.large.werewolf.black_ally.possessed", 1),
+    ("divined.large.werewolf.white.seer", 5),
+    ("divined.large.werewolf.white.possessed", 1),
+    ("divined.large.village.black_first.seer", -5),
+    ("divined.large.village.black_first.possessed", 5),
+    ("divined.large.village.black_first.werewolf", 5),
+    ("divined.large.village.black.pair", 5),
+    ("divined.large.village.black.pair_human", -5),
+    ("divined.large.village.black.werewolves.human", 5),
+    ("divined.large.village.black.werewolves.werewolf", -5),
+    ("divined.large.village.white_me.seer", 5),
+    ("divined.large.village.white_me.possessed", 1),
+    ("divined.large.village.white.pair", -5),
+    ("divined.large.village.white.pair_human", 5),
+    ("divined.large.village.white.werewolves.werewolf", 5),
+    # 霊媒結果
+    ("identified.werewolf.black_ally.medium", 10),
+    ("identified.werewolf.black_ally.possessed", 1),
+    ("identified.werewolf.white.medium", 5),
+    ("identified.werewolf.white.possessed", 1),
+    ("identified.village.black.pair", 5),
+    ("identified.village.black.pair_human", -5),
+    ("identified.village.black.werewolves.human", 3),
+    ("identified.village.black.werewolves.werewolf", -5),
+    ("identified.village.white.pair", -5),
+    ("identified.village.white.pair_human", 5),
+    ("identified.village.white.werewolves.werewolf", 5),
+    # N日目の始めの推測
+    ("day_start.possessed", 1),
+    ("day_start.werewolf", 3),
+    # 護衛成功発言
+    ("talk_guarded.werewolf.attacked.bodyguard", 10),
+    ("talk_guarded.werewolf.attacked.possessed", -10),
+    ("talk_guarded.village.bodyguard.werewolf", -2),
+    ("talk_guarded.village.bodyguard.human", 2),
+    ("talk_guarded.village.werewolves.villagers", -1),
+    ("talk_guarded.village.werewolves.werewolves", 2),
+    # 過去のゲームの行動 (Profile) の重み
+    ("profile.hidden_seer.seer", 1),
+    ("profile.real_possessed.possessed", 1),
+    ("profile.fake_co.werewolf", 1),
+    ("profile.fake_co.possessed", 1),
+    ("profile.black.werewolves", 1),
+]
+
+
+class ScoreParams:
+    """Named vector of the score deltas used by ScoreMatrix."""
+
+    names: List[str] = [name for name, _ in PARAMS]
+    index: Dict[str, int] = {name: i for i, name in enumerate(names)}
+    default: "ScoreParams"
+
+    def __init__(self, values: Optional[np.ndarray] = None) -> None:
+        if values is None:
+            values = np.array([value for _, value in PARAMS], dtype=float)
+        self.values: np.ndarray = np.asarray(values, dtype=float)
+        # 推論中の参照を速くするために、Python の float の辞書にしておく
+        self.table: Dict[str, float] = {name: float(v) for name, v in zip(self.names, self.values)}
+
+    def __getitem__(self, name: str) -> float:
+        return self.table[name]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def replace(self, values: np.ndarray) -> "ScoreParams":
+        return ScoreParams(values)
+
+    def to_dict(self) -> Dict[str, float]:
+        return dict(self.table)
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    # 保存されていない定数はデフォルト値のままにする
+    @staticmethod
+    def load(path: str) -> "ScoreParams":
+        with open(path) as f:
+            table: Dict[str, float] = json.load(f)
+        values = ScoreParams.default.values.copy()
+        for name, value in table.items():
+            if name in ScoreParams.index:
+                values[ScoreParams.index[name]] = value
+        return ScoreParams(values)
+
+
+ScoreParams.default = ScoreParams()
@@ -0,0 +1,603 @@
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Tuple
+
+import numpy as np
+from Regulation import Regulation
+from ScoreParams import ScoreParams
+from Side import Side
+
+from aiwolf import Role, Species
+
+# ScoreMatrix.talk_co / talk_divined / talk_identified の条件分岐を、状況ごとのスコア加算の列 (ルール表) に展開する
+# 条件分岐は発言ごとに辿り直さず、表を1回引いて配列の加算をするだけにする
+# 加算の順番と、加算ごとの ±100 への切り詰めは元の条件分岐と同じなので、結果は完全に一致する
+# 役職番号や陣営の役職は Regulation から引くので、どの役職構成の村でも同じ表の作り方になる
+
+# CO数を数える役職 (4CO目以上は区別しない)
+CO_COUNTED_ROLES = (Role.SEER, Role.MEDIUM, Role.BODYGUARD)
+CO_COUNT_MAX = 4
+
+
+# 1回分のスコア加算 (元の add_score / add_scores の1回の呼び出しに対応する)
+# pair: True なら (talker, 役職ri, target, 役職rj)、False なら (talker, 役職ri, talker, 役職rj) に加算する
+class Step(NamedTuple):
+    pair: bool
+    ri: np.ndarray
+    rj: np.ndarray
+    delta: np.ndarray
+
+
+Steps = Tuple[Step, ...]
+
+
+class RuleTables(NamedTuple):
+    # キー: co_key(自分の役職, COした役職, その役職のCO数)
+    co: Mapping[tuple, Steps]
+    # キー: divined_key(自分の役職, 結果, targetが自分か, targetが占いCOしているか, targetが仲間の人狼か, 1日目か)
+    divined: Mapping[tuple, Steps]
+    # キー: identified_key(自分の役職, 結果, targetが仲間の人狼か)
+    identified: Mapping[tuple, Steps]
+    # 占い結果を出した人は占い師以外の村人陣営ではない
+    divined_claim: Steps
+    # 同じ相手に異なる占い結果・霊媒結果を出した
+    divined_conflict: Steps
+
+
+def co_key(my_role: Role, role: Role, co_count: int) -> tuple:
+    return (my_role, role, min(co_count, CO_COUNT_MAX) if role in CO_COUNTED_ROLES else 0)
+
+
+def divined_key(my_role: Role, species: Species, target_is_me: bool, target_is_seer_co: bool,
+                target_is_ally: bool, first_day: bool) -> tuple:
+    return (my_role, species, target_is_me, target_is_seer_co, target_is_ally, first_day)
+
+
+def identified_key(my_role: Role, species: Species, target_is_ally: bool) -> tuple:
+    return (my_role, species, target_is_ally)
+
+
+# 条件分岐が呼ぶ add_score / add_scores を記録して Step の列にする
+class StepRecorder:
+
+    def __init__(self, regulation: Regulation, resolve: Callable[[object, Regulation], list]) -> None:
+        self.regulation = regulation
+        self.rtoi = regulation.rtoi
+        self.resolve = resolve
+        self.steps: List[Step] = []
+
+    def role_index(self, role) -> int:
+        # 存在しない役職は加算しない (5人村の霊媒師・狩人など)
+        return self.rtoi.get(role, -1) if type(role) is Role else role
+
+    def emit(self, pair: bool, cells: List[Tuple[int, int, float]]) -> None:
+        ri = np.array([c[0] for c in cells], dtype=np.intp)
+        rj = np.array([c[1] for c in cells], dtype=np.intp)
+        delta = np.array([c[2] for c in cells], dtype=float)
+        for a in (ri, rj, delta):
+            a.setflags(write=False)
+        self.steps.append(Step(pair, ri, rj, delta))
+
+    # (talker, role1, target, role2) への加算
+    def add_score(self, role1, role2, score: float) -> None:
+        cells = []
+        for r1 in self.resolve(role1, self.regulation):
+            for r2 in self.resolve(role2, self.regulation):
+                ri, rj = self.role_index(r1), self.role_index(r2)
+                if ri >= 0 and rj >= 0:
+                    cells.append((ri, rj, score))
+        self.emit(True, cells)
+
+    # (talker, role, talker, role) への加算
+    def add_scores(self, score_dict: Dict[Role, float]) -> None:
+        cells = []
+        for role, score in score_dict.items():
+            for r in self.resolve(role, self.regulation):
+                ri = self.role_index(r)
+                if ri >= 0:
+                    cells.append((ri, ri, score))
+        self.emit(False, cells)
+
+
+# ---------- 条件分岐 (ScoreMatrix から移したもの) ----------
+
+# 投票行動を反映 (投票者を talker、投票先を target とする)
+def vote_rules(emit: StepRecorder, p: ScoreParams, reg: Regulation, day: int) -> None:
+    # ---------- 占い師以外の能力者がいない村 (5人村) ----------
+    # 2日目でゲームの勝敗が決定しているので、1日目の投票行動の反映はほとんど意味ない
+    if reg.basic:
+        # 投票者が村陣営で、投票対象が人狼である確率を上げる
+        emit.add_score(Role.VILLAGER, Role.WEREWOLF, p["vote.villager"])
+        emit.add_score(Role.SEER, Role.WEREWOLF, p["vote.seer"])
+    # ---------- 霊媒師・狩人のいる村 (15人村など) ----------
+    else:
+        # 日が進むほど判断材料が多くなるので、日にちで重み付けする
+        # 投票者が村陣営で、投票対象が人狼である確率を上げる
+        emit.add_score(Side.VILLAGERS, Role.WEREWOLF, day * p["vote.large.villagers_per_day"])
+        # 人狼が仲間の人狼に投票する確率は低い
+        emit.add_score(Side.WEREWOLVES, Role.WEREWOLF, p["vote.large.werewolves.werewolf"])
+
+
+# 他者のCOを反映
+# co_count: このCOを含めたその役職のCO数
+def co_rules(emit: StepRecorder, p: ScoreParams, reg: Regulation, my_role: Role, role: Role, co_count: int) -> None:
+    # ---------- 占い師以外の能力者がいない村 (5人村) ----------
+    if reg.basic:
+        # ----- 占いCO -----
+        # 基本、初日の早いターンでCOなので、COでのスコア変更は少なめにして、結果でスコアを変更する
+        if role == Role.SEER:
+            # --- 占い ---
+            if my_role == Role.SEER:
+                # 人狼と狂人の確率を上げる（対抗にしか黒結果が出ない）のではなく、村人と占いの確率を下げる
+                # +5, +3を上回る行動学習結果なら、行動学習を優先する
+                emit.add_scores({Role.VILLAGER: -100, Role.SEER: -100, Role.POSSESSED: p["co_seer.seer.possessed"], Role.WEREWOLF: p["co_seer.seer.werewolf"]})
+            # --- それ以外 ---
+            else:
+                # 村人である確率を下げる（村人の役職騙りを考慮しない）
+                emit.add_scores({Role.VILLAGER: -100})
+                # --- 人狼 ---
+                if my_role == Role.WEREWOLF:
+                    # 占いと狂人どちらもありうるので、CO段階では何もしない→結果でスコアを変更する
+                    return
+                # --- 狂人 ---
+                elif my_role == Role.POSSESSED:
+                    # 占いと人狼どちらもありうるので、CO段階では少しの変更にする
+                    # 気持ち、1CO目は占いっぽい
+                    if co_count == 1:
+                        emit.add_scores({Role.SEER: p["co_seer.possessed.1st.seer"]})
+                    # 2CO目以降は無視
+                    else:
+                        return
+                # --- 村人 ---
+                else:
+                    # 村人視点では、COを重視する：結果では正確に判断できないから
+                    # 気持ち、1,2CO目は占いor狂人、3CO目は占いor人狼っぽい
+                    if co_count == 1:
+                        emit.add_scores({Role.SEER: p["co_seer.village.1st.seer"], Role.POSSESSED: p["co_seer.village.1st.possessed"], Role.WEREWOLF: p["co_seer.village.1st.werewolf"]})
+                    elif co_count == 2:
+                        emit.add_scores({Role.SEER: p["co_seer.village.2nd.seer"], Role.POSSESSED: p["co_seer.village.2nd.possessed"], Role.WEREWOLF: p["co_seer.village.2nd.werewolf"]})
+                    else:
+                        emit.add_scores({Role.SEER: p["co_seer.village.3rd.seer"], Role.POSSESSED: p["co_seer.village.3rd.possessed"], Role.WEREWOLF: p["co_seer.village.3rd.werewolf"]})
+        # ----- 狂人CO -----
+        # 村人の狂人COはないと仮定する→PP阻止のために村人が狂人COすることがある→少しの変更にする
+        elif role == Role.POSSESSED:
+            # --- 人狼 ---
+            if my_role == Role.WEREWOLF:
+                emit.add_scores({Role.POSSESSED: p["co_possessed.werewolf.possessed"]})
+            # --- 狂人 ---
+            elif my_role == Role.POSSESSED:
+                # 人狼で狂人COするエージェントはいないので不要→今までの推論を優先するべき
+                # emit.add_scores({Role.WEREWOLF: +5})
+                pass
+            # --- 村人 or 占い ---
+            else:
+                emit.add_scores({Role.POSSESSED: p["co_possessed.village.possessed"], Role.WEREWOLF: p["co_possessed.village.werewolf"]})
+        # ----- 人狼CO -----
+        elif role == Role.WEREWOLF:
+            # --- 狂人 ---
+            if my_role == Role.POSSESSED:
+                # 村陣営がPP阻止のために、人狼COする場合があるので、少しの変更にする
+                emit.add_scores({Role.WEREWOLF: p["co_werewolf.possessed.werewolf"]})
+            # --- 人狼 ---
+            elif my_role == Role.WEREWOLF:
+                # 村陣営がPP阻止のために、人狼COする場合があるので、少しの変更にする
+                emit.add_scores({Role.POSSESSED: p["co_werewolf.werewolf.possessed"]})
+            # --- 村人 or 占い ---
+            else:
+                # 狂人と人狼どちらもありうるので、少しの変更にする：狂人と人狼で優劣をつけない→あくまで今までの結果を重視する
+                emit.add_scores({Role.POSSESSED: p["co_werewolf.village.possessed"], Role.WEREWOLF: p["co_werewolf.village.werewolf"]})
+
+    # ---------- 霊媒師・狩人のいる村 (15人村など) ----------
+    else:
+        # ----- 占いCO -----
+        if role == Role.SEER:
+            # --- 占い ---
+            if my_role == Role.SEER:
+                # talkerが占いの確率はありえないので、人狼陣営の確率を上げる
+                emit.add_scores({Role.POSSESSED: +100, Role.WEREWOLF: +100})
+            else:
+                # 村人である確率を下げる（村人の役職騙りを考慮しない）
+                emit.add_scores({Role.VILLAGER: -100, Role.MEDIUM: -100, Role.BODYGUARD: -100})
+                # --- 人狼 ---
+                if my_role == Role.WEREWOLF:
+                    # 占いと狂人どちらもありうるので、CO段階では何もしない→結果でスコアを変更する
+                    return
+                # --- 狂人 ---
+                elif my_role == Role.POSSESSED:
+                    # 1,2CO目は、占いと人狼どちらもありうるので、CO段階では少しの変更にする
+                    if co_count == 1:
+                        emit.add_scores({Role.SEER: p["co_seer.large.possessed.1st.seer"], Role.WEREWOLF: p["co_seer.large.possessed.1st.werewolf"]})
+                    elif co_count == 2:
+                        emit.add_scores({Role.SEER: p["co_seer.large.possessed.2nd.seer"], Role.WEREWOLF: p["co_seer.large.possessed.2nd.werewolf"]})
+                    # 3CO目以降は、人狼っぽい
+                    else:
+                        emit.add_scores({Role.WEREWOLF: p["co_seer.large.possessed.3rd.werewolf"]})
+                # --- 村陣営 ---
+                else:
+                    # 気持ち、1,2CO目は占いor狂人、3CO目は占いor人狼、4CO目以降は狂人or人狼っぽい
+                    if co_count == 1:
+                        emit.add_scores({Role.SEER: p["co_seer.large.village.1st.seer"], Role.POSSESSED: p["co_seer.large.village.1st.possessed"], Role.WEREWOLF: p["co_seer.large.village.1st.werewolf"]})
+                    elif co_count == 2:
+                        emit.add_scores({Role.SEER: p["co_seer.large.village.2nd.seer"], Role.POSSESSED: p["co_seer.large.village.2nd.possessed"], Role.WEREWOLF: p["co_seer.large.village.2nd.werewolf"]})
+                    elif co_count == 3:
+                        emit.add_scores({Role.SEER: p["co_seer.large.village.3rd.seer"], Role.POSSESSED: p["co_seer.large.village.3rd.possessed"], Role.WEREWOLF: p["co_seer.large.village.3rd.werewolf"]})
+                    else:
+                        emit.add_scores({Role.SEER: p["co_seer.large.village.4th.seer"], Role.POSSESSED: p["co_seer.large.village.4th.possessed"], Role.WEREWOLF: p["co_seer.large.village.4th.werewolf"]})
+        # ----- 霊媒CO -----
+        elif role == Role.MEDIUM:
+            # --- 霊媒 ---
+            if my_role == Role.MEDIUM:
+                emit.add_scores({Role.POSSESSED: +100, Role.WEREWOLF: +100})
+            else:
+                # 村人である確率を下げる（村人の役職騙りを考慮しない）
+                emit.add_scores({Role.VILLAGER: -100, Role.SEER: -100, Role.BODYGUARD: -100})
+                # 霊媒1COの場合、とりあえず真とする
+                # 霊媒2COとなった時に、1CO目のスコアを取り消す (ScoreMatrix.talk_co で行う)
+                if co_count == 1:
+                    emit.add_scores({Role.MEDIUM: p["co_medium.large.1st.medium"]})
+                # --- 人狼 ---
+                if my_role == Role.WEREWOLF:
+                    # 霊媒と狂人どちらもありうるので、主には結果でスコアを変更する
+                    # 気持ち、霊媒っぽい
+                    emit.add_scores({Role.MEDIUM: p["co_medium.large.werewolf.medium"]})
+                # --- 狂人 ---
+                elif my_role == Role.POSSESSED:
+                    # 1CO目は、霊媒と人狼どちらもありうるが、霊媒っぽい
+                    if co_count == 1:
+                        emit.add_scores({Role.MEDIUM: p["co_medium.large.possessed.1st.medium"], Role.WEREWOLF: p["co_medium.large.possessed.1st.werewolf"]})
+                    # 2CO目は、霊媒と人狼どちらもありうるが、人狼っぽい
+                    elif co_count == 2:
+                        emit.add_scores({Role.MEDIUM: p["co_medium.large.possessed.2nd.medium"], Role.WEREWOLF: p["co_medium.large.possessed.2nd.werewolf"]})
+                    # 3CO目以降は、人狼っぽい
+                    else:
+                        emit.add_scores({Role.WEREWOLF: p["co_medium.large.possessed.3rd.werewolf"]})
+                # --- 村陣営 ---
+                else:
+                    # 気持ち、1,2CO目は霊媒、3CO目以降は人狼っぽい
+                    if co_count <= 2:
+                        emit.add_scores({Role.MEDIUM: p["co_medium.large.village.medium"]})
+                    else:
+                        emit.add_scores({Role.WEREWOLF: p["co_medium.large.village.3rd.werewolf"]})
+        # ----- 狩人CO -----
+        elif role == Role.BODYGUARD:
+            # --- 狩人 ---
+            if my_role == Role.BODYGUARD:
+                emit.add_scores({Role.POSSESSED: +100, Role.WEREWOLF: +100})
+            # --- 人狼 ---
+            elif my_role == Role.WEREWOLF:
+                # 狩人と狂人どちらもありうるので、CO段階では何もしない
+                return
+            # --- 狂人 ---
+            elif my_role == Role.POSSESSED:
+                # 1CO目は、ほぼ狩人っぽい
+                if co_count == 1:
+                    emit.add_scores({Role.BODYGUARD: p["co_bodyguard.large.possessed.1st.bodyguard"]})
+                # 2CO目以降は、人狼っぽい
+                else:
+                    emit.add_scores({Role.WEREWOLF: p["co_bodyguard.large.possessed.2nd.werewolf"]})
+            # --- 村陣営 ---
+            else:
+                # 1CO目は狩人っぽく、2CO目以降は人狼っぽい
+                if co_count == 1:
+                    emit.add_scores({Role.BODYGUARD: p["co_bodyguard.large.village.1st.bodyguard"], Role.WEREWOLF: p["co_bodyguard.large.village.1st.werewolf"]})
+                elif co_count == 2:
+                    emit.add_scores({Role.BODYGUARD: p["co_bodyguard.large.village.2nd.bodyguard"], Role.WEREWOLF: p["co_bodyguard.large.village.2nd.werewolf"]})
+                else:
+                    emit.add_scores({Role.WEREWOLF: p["co_bodyguard.large.village.3rd.werewolf"]})
+        # ----- 狂人CO -----
+        elif role == Role.POSSESSED:
+            # --- 狂人 ---
+            if my_role == Role.POSSESSED:
+                emit.add_scores({Role.WEREWOLF: p["co_possessed.large.possessed.werewolf"]})
+            # --- 人狼 ---
+            elif my_role == Role.WEREWOLF:
+                emit.add_scores({Role.POSSESSED: p["co_possessed.large.werewolf.possessed"]})
+            # --- 村陣営 ---
+            # 無視する
+        # ----- 人狼CO -----
+        elif role == Role.WEREWOLF:
+            # --- 人狼 ---
+            if my_role == Role.WEREWOLF:
+                emit.add_scores({Role.POSSESSED: p["co_werewolf.large.werewolf.possessed"]})
+            # --- 狂人 ---
+            elif my_role == Role.POSSESSED:
+                # 自分が狂人なので、人狼COは信用できる
+                emit.add_scores({Role.WEREWOLF: p["co_werewolf.large.possessed.werewolf"]})
+            # --- 村陣営 ---
+            else:
+                emit.add_scores({Role.POSSESSED: p["co_werewolf.large.village.possessed"], Role.WEREWOLF: p["co_werewolf.large.village.werewolf"]})
+        # ----- 村人CO -----
+        elif role == Role.VILLAGER:
+            # --- 人狼：役職を噛みたいから、村人COも認知する ---
+            if my_role == Role.WEREWOLF:
+                emit.add_scores({Role.VILLAGER: p["co_villager.large.werewolf.villager"]})
+
+# 他者の占い結果を反映
+# 条件分岐は、役職構成→myrole→白黒結果→targetが自分かどうか
+def divined_rules(emit: StepRecorder, p: ScoreParams, reg: Regulation, my_role: Role, species: Species, target_is_me: bool,
+                  target_is_seer_co: bool, target_is_ally: bool, first_day: bool) -> None:
+    # ---------- 占い師以外の能力者がいない村 (5人村) ----------
+    if reg.basic:
+        # ----- 占い -----
+        if my_role == Role.SEER:
+            # emit.add_scores({Role.POSSESSED: +100, Role.WEREWOLF: +100})
+            emit.add_scores({Role.VILLAGER: -100, Role.SEER: -100, Role.POSSESSED: p["divined.seer.possessed"], Role.WEREWOLF: p["divined.seer.werewolf"]})
+            # 黒結果
+            if species == Species.WEREWOLF:
+                # 対象：自分
+                if target_is_me:
+                    emit.add_scores({Role.POSSESSED: +100, Role.WEREWOLF: +100})
+                # 対象：自分以外
+                else:
+                    emit.add_score(Side.WEREWOLVES, Species.HUMAN, p["divined.seer.black.human"])
+                    emit.add_score(Side.WEREWOLVES, Role.WEREWOLF, p["divined.seer.black.werewolf"])
+            # 白結果
+            elif species == Species.HUMAN:
+                # 対象：自分
+                if target_is_me:
+                    emit.add_scores({Role.POSSESSED: +100, Role.WEREWOLF: +100})
+                # 対象：自分以外
+                else:
+                    emit.add_score(Side.WEREWOLVES, Species.HUMAN, p["divined.seer.white.human"])
+                    emit.add_score(Side.WEREWOLVES, Role.WEREWOLF, p["divined.seer.white.werewolf"])
+        # ----- 人狼 -----
+        elif my_role == Role.WEREWOLF:
+            # 黒結果
+            if species == Species.WEREWOLF:
+                # 対象：自分
+                if target_is_me:
+                    # talkerの占い師である確率を上げる (誤爆を考慮しなければ100%)
+                    emit.add_scores({Role.SEER: +100, Role.POSSESSED: +0})
+                # 対象：自分以外
+                else:
+                    # talkerの狂人である確率を上げる (ほぼ100%と仮定)
+                    if target_is_seer_co:
+                        emit.add_scores({Role.POSSESSED: p["divined.werewolf.black_seer.possessed"]})
+            # 白結果
+            elif species == Species.HUMAN:
+                # 対象：自分
+                if target_is_me:
+                    # talkerの占い師である確率を下げる、狂人である確率を上げる（結果の矛盾が起こっているから、値を大きくしている）
+                    emit.add_scores({Role.SEER: -100, Role.POSSESSED: +100})
+                # 対象：自分以外
+                else:
+                    # 狂人は基本的に黒結果を出すことが多いので、talkerの占い師である確率を上げる
+                    # 確定ではないので、値は控えめにする
+                    emit.add_scores({Role.SEER: p["divined.werewolf.white.seer"], Role.POSSESSED: p["divined.werewolf.white.possessed"]})
+        # ----- 狂人 -----
+        elif my_role == Role.POSSESSED:
+            # 黒結果
+            if species == Species.WEREWOLF:
+                # 対象：自分
+                if target_is_me:
+                    # talkerの占い師である確率を下げる
+                    # 本来は占い師である確率を0%にしたいが、占い師の結果騙りがあるため、-100にはしない
+                    emit.add_scores({Role.SEER: p["divined.possessed.black_me.seer"], Role.WEREWOLF: p["divined.possessed.black_me.werewolf"]})
+                # 対象：自分以外
+                else:
+                    # talkerが占い師で、targetが人狼である確率を上げる
+                    # かなりの確率で人狼であると仮定する
+                    emit.add_score(Role.SEER, Role.WEREWOLF, p["divined.possessed.black.pair"])
+                    # 占い師は確率的に白結果を出すことが多いので、talkerの人狼である確率を少し上げる
+                    emit.add_scores({Role.WEREWOLF: p["divined.possessed.black.werewolf"]})
+            # 白結果
+            elif species == Species.HUMAN:
+                # 対象：自分
+                if target_is_me:
+                    # talkerの占い師である確率を上げる
+                    # 自分への白結果はほぼ占い師確定
+                    emit.add_scores({Role.SEER: p["divined.possessed.white_me.seer"]})
+                # 対象：自分以外
+                else:
+                    # talkerが占い師で、targetが人狼である確率を下げる
+                    emit.add_score(Role.SEER, Role.WEREWOLF, p["divined.possessed.white.pair"])
+                    # 人狼は基本的に黒結果を出すことが多いので、talkerの占い師である確率を上げる
+                    # 確定ではないので、値は控えめにする
+                    emit.add_scores({Role.SEER: p["divined.possessed.white.seer"], Role.WEREWOLF: p["divined.possessed.white.werewolf"]})
+        # ----- 村人 -----
+        else:
+            # 黒結果
+            if species == Species.WEREWOLF:
+                # 対象：自分
+                if target_is_me:
+                    # talkerの占い師である確率を下げる（結果の矛盾が起こっているから、値を大きくしている）
+                    emit.add_scores({Role.SEER: -100, Role.POSSESSED: p["divined.village.black_me.possessed"], Role.WEREWOLF: p["divined.village.black_me.werewolf"]})
+                # 対象：自分以外
+                else:
+                    # talkerが占い師で、targetが人狼である確率を上げる
+                    emit.add_score(Role.SEER, Role.WEREWOLF, p["divined.village.black.pair"])
+                    # talkerが狂人と人狼である確率を少し上げる
+                    emit.add_scores({Role.POSSESSED: p["divined.village.black.possessed"], Role.WEREWOLF: p["divined.village.black.werewolf"]})
+            # 白結果
+            elif species == Species.HUMAN:
+                # 対象：自分
+                if target_is_me:
+                    # talkerの占い師である確率を上げる
+                    # 自分への白結果はほぼ占い師確定
+                    emit.add_scores({Role.SEER: p["divined.village.white_me.seer"]})
+                # 対象：自分以外
+                else:
+                    # talkerが占い師で、targetが人狼である確率を下げる
+                    emit.add_score(Role.SEER, Role.WEREWOLF, p["divined.village.white.pair"])
+                    # 人狼は基本的に黒結果を出すことが多いので、talkerの占い師である確率を上げる
+                    # 確定ではないので、値は控えめにする
+                    emit.add_scores({Role.SEER: p["divined.village.white.seer"], Role.POSSESSED: p["divined.village.white.possessed"], Role.WEREWOLF: p["divined.village.white.werewolf"]})
+
+    # ---------- 霊媒師・狩人のいる村 (15人村など) ----------
+    else:
+        # ----- 占い -----
+        if my_role == Role.SEER:
+            # 結果に関わらず、人狼と狂人の確率を上げる（村陣営の役職騙りを考慮しない）
+            emit.add_scores({Role.POSSESSED: +100, Role.WEREWOLF: +100})
+            # 対象：自分
+            if target_is_me:
+                emit.add_scores({Role.POSSESSED: +100, Role.WEREWOLF: +100})
+            # 黒結果
+            elif species == Species.WEREWOLF:
+                emit.add_score(Side.WEREWOLVES, Species.HUMAN, p["divined.large.seer.black.human"])
+                emit.add_score(Side.WEREWOLVES, Role.WEREWOLF, p["divined.large.seer.black.werewolf"])
+            # 白結果
+            elif species == Species.HUMAN:
+                emit.add_score(Side.WEREWOLVES, Species.HUMAN, p["divined.large.seer.white.human"])
+                emit.add_score(Side.WEREWOLVES, Role.WEREWOLF, p["divined.large.seer.white.werewolf"])
+        # ----- 人狼 -----
+        elif my_role == Role.WEREWOLF:
+            # 黒結果
+            if species == Species.WEREWOLF:
+                # 対象：人狼仲間 (自分を含む)
+                if target_is_ally:
+                    # 人狼に黒出ししている場合は本物の可能性が高い
+                    emit.add_scores({Role.SEER: p["divined.large.werewolf.black_ally.seer"], Role.POSSESSED: p["divined.large.werewolf.black_ally.possessed"]})
+                # 対象：それ以外
+                else:
+                    # 外れてる場合は狂人確定
+                    emit.add_scores({Role.SEER: -100, Role.POSSESSED: +100})
+            # 白結果
+            elif species == Species.HUMAN:
+                # 対象：人狼仲間 (自分を含む)
+                if target_is_ally:
+                    # 人狼に白だししている場合は狂人確定
+                    emit.add_scores({Role.SEER: -100, Role.POSSESSED: +100})
+                # 対象：それ以外
+                else:
+                    # 当たっている場合は、若干占い師である可能性を上げる
+                    emit.add_scores({Role.SEER: p["divined.large.werewolf.white.seer"], Role.POSSESSED: p["divined.large.werewolf.white.possessed"]})
+        # ----- 狂人 or 村人 or 霊媒 or 狩人 -----
+        else:
+            # 黒結果
+            if species == Species.WEREWOLF:
+                # 対象：自分
+                if target_is_me:
+                    # COの段階で占い師以外の市民の確率が下がっているが、COをせずに占い結果を報告する場合も考慮して人狼陣営の可能性も上げる
+                    emit.add_scores({Role.SEER: -100, Role.POSSESSED: +100, Role.WEREWOLF: +100})
+                # 対象：自分以外
+                # 初日に黒結果は人外が多い
+                elif first_day:
+                    emit.add_scores({Role.SEER: p["divined.large.village.black_first.seer"], Role.POSSESSED: p["divined.large.village.black_first.possessed"], Role.WEREWOLF: p["divined.large.village.black_first.werewolf"]})
+                else:
+                    emit.add_score(Role.SEER, Role.WEREWOLF, p["divined.large.village.black.pair"])
+                    emit.add_score(Role.SEER, Species.HUMAN, p["divined.large.village.black.pair_human"])
+                    emit.add_score(Side.WEREWOLVES, Species.HUMAN, p["divined.large.village.black.werewolves.human"])
+                    emit.add_score(Side.WEREWOLVES, Role.WEREWOLF, p["divined.large.village.black.werewolves.werewolf"])
+            # 白結果
+            elif species == Species.HUMAN:
+                # 対象：自分
+                if target_is_me:
+                    emit.add_scores({Role.SEER: p["divined.large.village.white_me.seer"], Role.POSSESSED: p["divined.large.village.white_me.possessed"]})
+                # 対象：自分以外
+                else:
+                    emit.add_score(Role.SEER, Role.WEREWOLF, p["divined.large.village.white.pair"])
+                    emit.add_score(Role.SEER, Species.HUMAN, p["divined.large.village.white.pair_human"])
+                    # 人狼陣営でも本物の白出しをする場合があるので、人間である可能性は排除しない (黒出しと白出しで異なる部分)
+                    emit.add_score(Side.WEREWOLVES, Role.WEREWOLF, p["divined.large.village.white.werewolves.werewolf"])
+
+
+# 他者の霊媒結果を反映 (霊媒師のいる村だけ)
+def identified_rules(emit: StepRecorder, p: ScoreParams, reg: Regulation, my_role: Role, species: Species, target_is_ally: bool) -> None:
+    # ----- 霊媒 -----
+    if my_role == Role.MEDIUM:
+        # talk_co に任せる
+        return
+    # ----- 人狼 -----
+    elif my_role == Role.WEREWOLF:
+        # 黒結果
+        if species == Species.WEREWOLF:
+            # 対象：人狼仲間
+            if target_is_ally:
+                # 人狼に黒出ししている場合は本物の可能性が高い
+                emit.add_scores({Role.MEDIUM: p["identified.werewolf.black_ally.medium"], Role.POSSESSED: p["identified.werewolf.black_ally.possessed"]})
+            # 対象：それ以外
+            else:
+                # 外れてる場合は狂人確定
+                emit.add_scores({Role.MEDIUM: -100, Role.POSSESSED: +100})
+        # 白結果
+        elif species == Species.HUMAN:
+            # 対象：人狼仲間
+            if target_is_ally:
+                # 人狼に白だししている場合は狂人確定
+                emit.add_scores({Role.MEDIUM: -100, Role.POSSESSED: +100})
+            # 対象：それ以外
+            else:
+                # 当たっている場合は、若干霊媒師である可能性を上げる
+                emit.add_scores({Role.MEDIUM: p["identified.werewolf.white.medium"], Role.POSSESSED: p["identified.werewolf.white.possessed"]})
+    # ----- 狂人 or 村人 or 占い or 狩人 -----
+    else:
+        # 黒結果
+        if species == Species.WEREWOLF:
+            emit.add_score(Role.MEDIUM, Role.WEREWOLF, p["identified.village.black.pair"])
+            emit.add_score(Role.MEDIUM, Species.HUMAN, p["identified.village.black.pair_human"])
+            emit.add_score(Side.WEREWOLVES, Species.HUMAN, p["identified.village.black.werewolves.human"])
+            emit.add_score(Side.WEREWOLVES, Role.WEREWOLF, p["identified.village.black.werewolves.werewolf"])
+        # 白結果
+        elif species == Species.HUMAN:
+            emit.add_score(Role.MEDIUM, Role.WEREWOLF, p["identified.village.white.pair"])
+            emit.add_score(Role.MEDIUM, Species.HUMAN, p["identified.village.white.pair_human"])
+            emit.add_score(Side.WEREWOLVES, Role.WEREWOLF, p["identified.village.white.werewolves.werewolf"])
+
+# ---------- ルール表の作成 ----------
+
+rule_tables_cache: Dict[tuple, RuleTables] = {}
+
+
+def compile_rule_tables(p: ScoreParams, reg: Regulation, resolve: Callable[[object, Regulation], list]) -> RuleTables:
+    def record(rule, *args) -> Steps:
+        emit = StepRecorder(reg, resolve)
+        rule(emit, p, reg, *args)
+        return tuple(step for step in emit.steps if len(step.delta) > 0)
+
+    flags = (False, True)
+    co: Dict[tuple, Steps] = {}
+    divined: Dict[tuple, Steps] = {}
+    identified: Dict[tuple, Steps] = {}
+    for my_role in Role:
+        for role in Role:
+            counts = range(CO_COUNT_MAX + 1) if role in CO_COUNTED_ROLES else [0]
+            for co_count in counts:
+                steps = record(co_rules, my_role, role, co_count)
+                if steps:
+                    co[co_key(my_role, role, co_count)] = steps
+        for species in (Species.WEREWOLF, Species.HUMAN):
+            for target_is_me in flags:
+                for target_is_seer_co in flags:
+                    for target_is_ally in flags:
+                        for first_day in flags:
+                            key = divined_key(my_role, species, target_is_me, target_is_seer_co, target_is_ally, first_day)
+                            steps = record(divined_rules, *key)
+                            if steps:
+                                divined[key] = steps
+            # 霊媒結果は霊媒師のいる村だけ
+            if not reg.has(Role.MEDIUM):
+                continue
+            for target_is_ally in flags:
+                steps = record(identified_rules, my_role, species, target_is_ally)
+                if steps:
+                    identified[identified_key(my_role, species, target_is_ally)] = steps
+
+    def single(score_dict: Dict[Role, float]) -> Steps:
+        emit = StepRecorder(reg, resolve)
+        emit.add_scores(score_dict)
+        return tuple(emit.steps)
+
+    return RuleTables(
+        co=MappingProxyType(co),
+        divined=MappingProxyType(divined),
+        identified=MappingProxyType(identified),
+        divined_claim=single({Role.VILLAGER: -100, Role.MEDIUM: -100, Role.BODYGUARD: -100}),
+        divined_conflict=single({Role.POSSESSED: +100, Role.WEREWOLF: +100}),
+    )
+
+
+# その日の投票行動のスコア加算の列 (日にちで重みが変わるので、ルール表とは別に日ごとに作る)
+def compile_vote_steps(p: ScoreParams, reg: Regulation, resolve: Callable[[object, Regulation], list], day: int) -> Steps:
+    emit = StepRecorder(reg, resolve)
+    vote_rules(emit, p, reg, day)
+    return tuple(step for step in emit.steps if len(step.delta) > 0)
+
+
+# ルール表は (パラメータ, 役職構成) ごとに1回だけ作って、全ての ScoreMatrix で共有する
+def rule_tables(p: ScoreParams, reg: Regulation, resolve: Callable[[object, Regulation], list]) -> RuleTables:
+    key = (tuple(p.values.tolist()), reg.key)
+    tables = rule_tables_cache.get(key)
+    if tables is None:
+        tables = compile_rule_tables(p, reg, resolve)
+        rule_tables_cache[key] = tables
+    return tables
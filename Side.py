@@ -1,4 +1,6 @@
 from enum import Enum
+from typing import List
+
 from Util import Util
 from aiwolf import Role
 
@@ -14,13 +16,13 @@ class Side(Enum):
     ANY = "ANY"
     """Wildcard."""
 
-    def get_role_list(self, N):
+    # 陣営の役職のうち、村に存在するもの
+    # regulation: Regulation
+    def get_role_list(self, regulation) -> List[Role]:
         if self == Side.VILLAGERS:
-            if N == 5:
-                return [Role.VILLAGER, Role.SEER]
-            else:
-                Util.error("Invalid N: " + str(N))
+            return list(regulation.villagers)
         elif self == Side.WEREWOLVES:
-            return [Role.WEREWOLF, Role.POSSESSED]
+            return list(regulation.werewolves)
         else:
-            Util.error("Invalid side: " + str(self))
+            Util.error_print("Invalid side: " + str(self))
+            return []
@@ -0,0 +1,163 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from EventLog import DEBUG, EventLog
+from Metrics import SCORE_UPDATES
+from ScoreMatrix import START_BELIEF, ScoreMatrix
+from ScoreRules import Steps
+
+from aiwolf import Agent, Role
+
+
+class SparseScoreMatrix(ScoreMatrix):
+    """ScoreMatrix that stores only the entries that have been changed.
+
+    Unary terms score[i, r, i, r] are kept in a dense (N, M) array and pairwise terms in (M, M) blocks per pair of agents,
+    created the first time an entry of the pair is changed. Entries of untouched blocks are START_BELIEF.
+    Scores follow the same semantics as ScoreMatrix; to_dense() returns the equivalent (N, M, N, M) array.
+    """
+
+    unary: np.ndarray
+    blocks: Dict[Tuple[int, int], np.ndarray]
+
+    def init_scores(self) -> None:
+        # unary[エージェント, 役職]: score[i, r, i, r]
+        self.unary = np.full((self.N, self.M), START_BELIEF, dtype=self.dtype)
+        # blocks[(エージェント1, エージェント2)][役職1, 役職2]: それ以外の要素 (i == j のブロックの対角要素は使わない)
+        self.blocks = {}
+
+    def block(self, i: int, j: int) -> np.ndarray:
+        b = self.blocks.get((i, j))
+        if b is None:
+            b = np.full((self.M, self.M), START_BELIEF, dtype=self.dtype)
+            self.blocks[(i, j)] = b
+        return b
+
+    def to_dense(self) -> np.ndarray:
+        dense = np.full((self.N, self.M, self.N, self.M), START_BELIEF, dtype=self.dtype)
+        for (i, j), b in self.blocks.items():
+            dense[i, :, j, :] = b
+        i = np.arange(self.N)[:, None]
+        r = np.arange(self.M)[None, :]
+        dense[i, r, i, r] = self.unary
+        return dense
+
+    def nbytes(self) -> int:
+        return self.unary.nbytes + sum(b.nbytes for b in self.blocks.values())
+
+    def get_score(self, agent1: Agent, role1: Role, agent2: Agent, role2: Role) -> float:
+        i = agent1.agent_idx-1 if type(agent1) is Agent else agent1
+        ri = self.rtoi[role1] if type(role1) is Role else role1
+        j = agent2.agent_idx-1 if type(agent2) is Agent else agent2
+        rj = self.rtoi[role2] if type(role2) is Role else role2
+
+        if ri >= self.M or rj >= self.M or ri < 0 or rj < 0: # 存在しない役職の場合はスコアを-infにする (5人村の場合)
+            return -float('inf')
+
+        if i == j and ri == rj:
+            return self.unary[i, ri]
+        b = self.blocks.get((i, j))
+        return b[ri, rj] if b is not None else START_BELIEF
+
+    def set_score(self, agent1: Agent, role1: Role, agent2: Agent, role2: Role, score: float) -> None:
+        i = agent1.agent_idx-1 if type(agent1) is Agent else agent1
+        ri = self.rtoi[role1] if type(role1) is Role else role1
+        j = agent2.agent_idx-1 if type(agent2) is Agent else agent2
+        rj = self.rtoi[role2] if type(role2) is Role else role2
+
+        if ri >= self.M or rj >= self.M or ri < 0 or rj < 0: # 存在しない役職の場合はスコアを設定しない (5人村の場合)
+            return
+
+        if score == float('inf'): # スコアを+infにすると相対確率も無限に発散するので、代わりにそれ以外のスコアを0にする。
+            self.block(i, j)[:, :] = -float('inf')
+            if i == j:
+                self.unary[i, :] = -float('inf')
+                self.unary[i, ri] = 0
+            else:
+                self.blocks[(i, j)][ri, rj] = 0
+            return
+
+        score = min(max(score, -100), 100)
+        if i == j and ri == rj:
+            self.unary[i, ri] = score
+        else:
+            self.block(i, j)[ri, rj] = score
+
+    def apply_steps(self, steps: Steps, talker: Agent, target: Agent, key=None) -> None:
+        if steps and EventLog.enabled("score"):
+            EventLog.log("score", DEBUG, "apply_steps", key=key, talker=talker, target=target, deltas=[step.delta for step in steps])
+        SCORE_UPDATES.inc()
+        self.add_steps(steps, talker.agent_idx-1, target.agent_idx-1)
+
+    def add_unary(self, delta: np.ndarray, agent: Optional[Agent] = None) -> None:
+        SCORE_UPDATES.inc()
+        rows = np.arange(self.N) if agent is None else np.array([agent.agent_idx-1])
+        current = self.unary[rows]
+        d = delta[rows]
+        mask = (d != 0) & np.isfinite(current) & (rows != self.me.agent_idx-1)[:, None]
+        self.unary[rows] = np.where(mask, np.clip(current + d, -100, 100), current)
+
+    # 加算のある (i, j) の組ごとにブロックに加算する
+    def add_pairwise(self, delta: np.ndarray, key=None) -> None:
+        SCORE_UPDATES.inc()
+        touched = (delta != 0).any(axis=(1, 3))
+        if EventLog.enabled("score"):
+            EventLog.log("score", DEBUG, "add_pairwise", key=key, cells=int((delta != 0).sum()), total=float(delta.sum()))
+        for i, j in zip(*np.nonzero(touched)):
+            d = delta[i, :, j, :]
+            mask = d != 0
+            if i != j:
+                b = self.block(i, j)
+                b[mask] = np.clip(b[mask] + d[mask], -100, 100)
+                continue
+            # 自分自身との組は、対角要素を unary に、それ以外をブロックに加算する
+            diagonal = np.diag(mask)
+            self.unary[i, diagonal] = np.clip(self.unary[i, diagonal] + np.diag(d)[diagonal], -100, 100)
+            np.fill_diagonal(mask, False)
+            if mask.any():
+                b = self.block(i, i)
+                b[mask] = np.clip(b[mask] + d[mask], -100, 100)
+
+    # 変更するブロックが組ごとに異なるので、1組ずつ適用する
+    def add_pair_steps(self, steps: Steps, pairs: List[Tuple[int, int]]) -> None:
+        for i, j in pairs:
+            self.add_steps(steps, i, j)
+
+    def add_steps(self, steps: Steps, i: int, j: int) -> None:
+        for step in steps:
+            jj = j if step.pair else i
+            if jj != i:
+                b = self.block(i, jj)
+                b[step.ri, step.rj] = np.clip(b[step.ri, step.rj] + step.delta, -100, 100)
+                continue
+            # 自分自身との組は、対角要素を unary に、それ以外をブロックに加算する
+            diagonal = step.ri == step.rj
+            ri, delta = step.ri[diagonal], step.delta[diagonal]
+            self.unary[i, ri] = np.clip(self.unary[i, ri] + delta, -100, 100)
+            if not diagonal.all():
+                b = self.block(i, i)
+                ri, rj, delta = step.ri[~diagonal], step.rj[~diagonal], step.delta[~diagonal]
+                b[ri, rj] = np.clip(b[ri, rj] + delta, -100, 100)
+
+    # 変更されたブロックだけを足し、残りの (i != j) の要素は START_BELIEF の定数としてまとめる
+    def evaluate_assignment(self, assignment) -> float:
+        a = np.asarray(assignment, dtype=np.intp)
+        if a.min() < 0 or a.max() >= self.M: # 存在しない役職を含む場合は-inf
+            return -float('inf')
+        score = float(self.unary[np.arange(self.N), a].sum())
+        untouched = self.N * (self.N - 1)
+        for (i, j), b in self.blocks.items():
+            if i != j:
+                score += float(b[a[i], a[j]])
+                untouched -= 1
+        return score + START_BELIEF * untouched
+
+    def evaluate_table(self, table: np.ndarray) -> np.ndarray:
+        scores = self.unary[np.arange(self.N)[None, :], table].sum(axis=-1)
+        pairs = [(i, j) for i, j in self.blocks if i != j]
+        if pairs:
+            bi = np.array([i for i, _ in pairs], dtype=np.intp)
+            bj = np.array([j for _, j in pairs], dtype=np.intp)
+            stacked = np.stack([self.blocks[p] for p in pairs])
+            scores = scores + stacked[np.arange(len(pairs))[None, :], table[:, bi], table[:, bj]].sum(axis=-1)
+        return scores + START_BELIEF * (self.N * (self.N - 1) - len(pairs))
@@ -0,0 +1,63 @@
+from typing import Dict, Optional, Tuple
+
+from aiwolf import AbstractPlayer, Agent, GameInfo, Role
+
+# 役職ごとに、次に来る可能性がある行動のリクエスト
+ROLE_ACTIONS: Dict[Role, Tuple[str, ...]] = {
+    Role.VILLAGER: ("vote",),
+    Role.SEER: ("vote", "divine"),
+    Role.MEDIUM: ("vote",),
+    Role.BODYGUARD: ("vote", "guard"),
+    Role.POSSESSED: ("vote",),
+    Role.WEREWOLF: ("vote", "attack"),
+}
+
+
+class Speculator:
+    """Computes the next actions of an agent ahead of the requests and answers the requests from the cache.
+
+    The cache belongs to one state of the game (day, number of talks and whispers by others, alive agents).
+    The agent's own talks are not counted, because the agents skip them when they update.
+    It is cleared when the state changes or the agent does something else (talk, whisper, day start),
+    so a cached action is the same as the one the agent would choose when asked.
+    """
+
+    def __init__(self) -> None:
+        self.key: Optional[tuple] = None
+        self.cache: Dict[str, Agent] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def state_key(game_info: GameInfo) -> tuple:
+        me = game_info.me
+        return (game_info.day, sum(1 for t in game_info.talk_list if t.agent != me),
+                sum(1 for t in game_info.whisper_list if t.agent != me), len(game_info.alive_agent_list))
+
+    def invalidate(self) -> None:
+        self.key = None
+        self.cache.clear()
+
+    # 新しい GameInfo を受け取ったときに呼ぶ (状態が変わっていればキャッシュを捨てる)
+    def update(self, game_info: GameInfo) -> None:
+        key = Speculator.state_key(game_info)
+        if key != self.key:
+            self.cache.clear()
+            self.key = key
+
+    # 次の行動を計算してキャッシュする
+    # 行動そのものではなく状態を変えない choose を呼ぶ (使われなかった先読みが本番の行動を変えないように)
+    # キャッシュした行動を使うときは commit で行動の副作用を反映する
+    def speculate(self, agent: AbstractPlayer, game_info: GameInfo, role: Role) -> None:
+        self.update(game_info)
+        for action in ROLE_ACTIONS.get(role, ("vote",)):
+            if action not in self.cache:
+                self.cache[action] = agent.choose(action)
+
+    # キャッシュした行動を取り出す (無ければ None)
+    def take(self, action: str, game_info: GameInfo) -> Optional[Agent]:
+        if self.key == Speculator.state_key(game_info) and action in self.cache:
+            self.hits += 1
+            return self.cache.pop(action)
+        self.misses += 1
+        return None
@@ -0,0 +1,221 @@
+import sqlite3
+from collections import defaultdict
+from typing import DefaultDict, Dict, Iterable, Mapping, Optional, Tuple
+
+from EventLog import WARNING, EventLog
+
+from aiwolf import Agent, Role
+
+# 村陣営の役職
+VILLAGER_SIDE = (Role.VILLAGER, Role.SEER, Role.MEDIUM, Role.BODYGUARD)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS role_stats (
+    name TEXT NOT NULL,
+    role TEXT NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, role)
+);
+CREATE TABLE IF NOT EXISTS agent_stats (
+    name TEXT PRIMARY KEY,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS event_stats (
+    name TEXT NOT NULL,
+    role TEXT NOT NULL,
+    event TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, role, event)
+);
+"""
+
+
+class StatsStore:
+    """Win counts and behavior counts (Profile) per opponent and role, kept across games and processes
+    in an SQLite file (WAL mode).
+
+    The counters are loaded on first use and updated in memory after each game (only the agents of the game);
+    the increments are written in one transaction by flush, at the end of the game.
+    Increments, not totals, are written, so several agent processes can share the file.
+    If the file cannot be read or written (locked by another process, unwritable path), the error is reported
+    and the game goes on: a failed load is retried at the start of the next game, and a failed flush keeps
+    the increments for the next one.
+    Opponents are identified by their names in the current game (start); the seats change from game to game,
+    so agents without a name are neither counted nor looked up. Without a path nothing is written.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.loaded = False
+        self.load_failed = False
+        # 今のゲームのエージェントの名前 (サーバが名前を送ってこなければ空)
+        self.names: Dict[Agent, str] = {}
+        # エージェントごと、エージェントと役職ごとの集計
+        self.games: DefaultDict[str, int] = defaultdict(int)
+        self.wins: DefaultDict[str, int] = defaultdict(int)
+        self.role_games: DefaultDict[Tuple[str, str], int] = defaultdict(int)
+        self.role_wins: DefaultDict[Tuple[str, str], int] = defaultdict(int)
+        # 役職ごとの行動の回数 (name, role, event) → 回数
+        self.events: DefaultDict[Tuple[str, str, str], int] = defaultdict(int)
+        # まだ書き込んでいない増分 (name, role) → (games, wins) と (name, role, event) → 回数
+        self.pending: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self.pending_events: DefaultDict[Tuple[str, str, str], int] = defaultdict(int)
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=1.0)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+        except sqlite3.Error:
+            connection.close()
+            raise
+        return connection
+
+    # ゲームの始めに、そのゲームのエージェントの名前を設定する
+    def start(self, names: Mapping[Agent, str]) -> None:
+        self.names = dict(names)
+        if self.load_failed:
+            self.loaded = False
+
+    def key(self, agent: Agent) -> Optional[str]:
+        return self.names.get(agent)
+
+    # ファイルの読み書きの失敗を報告する (例外は外に出さない)
+    def report(self, operation: str, error: sqlite3.Error) -> None:
+        from Util import Util
+        Util.error_print("StatsStore." + operation + ":", self.path, repr(error))
+        EventLog.log("stats", WARNING, "stats_" + operation + "_failed", path=self.path, error=repr(error))
+
+    # 初めて使われた時にファイルから読み込む (読めなければ次のゲームの始めにもう一度読む)
+    def load(self) -> None:
+        if self.loaded:
+            return
+        if self.path is None:
+            self.loaded = True
+            return
+        role_games: DefaultDict[Tuple[str, str], int] = defaultdict(int)
+        role_wins: DefaultDict[Tuple[str, str], int] = defaultdict(int)
+        games: DefaultDict[str, int] = defaultdict(int)
+        wins: DefaultDict[str, int] = defaultdict(int)
+        events: DefaultDict[Tuple[str, str, str], int] = defaultdict(int)
+        try:
+            connection = self.connect()
+            try:
+                for name, role, g, w in connection.execute("SELECT name, role, games, wins FROM role_stats"):
+                    role_games[(name, role)] += g
+                    role_wins[(name, role)] += w
+                for name, g, w in connection.execute("SELECT name, games, wins FROM agent_stats"):
+                    games[name] += g
+                    wins[name] += w
+                for name, role, event, count in connection.execute("SELECT name, role, event, count FROM event_stats"):
+                    events[(name, role, event)] += count
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            # このゲームの間はもう読まない (ファイルの読み込みで毎回待たないように)
+            self.loaded = True
+            self.load_failed = True
+            self.report("load", e)
+            return
+        self.loaded = True
+        self.load_failed = False
+        # ファイルの集計に、まだ書き込んでいない増分を足す (書き込み済みの増分はファイルに含まれている)
+        for (name, role), (g, w) in self.pending.items():
+            role_games[(name, role)] += g
+            role_wins[(name, role)] += w
+            games[name] += g
+            wins[name] += w
+        for k, n in self.pending_events.items():
+            events[k] += n
+        self.role_games, self.role_wins, self.games, self.wins, self.events = role_games, role_wins, games, wins, events
+
+    # 1ゲームの結果を数える
+    def record(self, role_map: Mapping[Agent, Role], villager_win: bool) -> None:
+        self.load()
+        for agent, role in role_map.items():
+            name = self.key(agent)
+            if name is None:
+                continue
+            win = int(villager_win == (role in VILLAGER_SIDE))
+            self.games[name] += 1
+            self.wins[name] += win
+            self.role_games[(name, role.name)] += 1
+            self.role_wins[(name, role.name)] += win
+            games, wins = self.pending.get((name, role.name), (0, 0))
+            self.pending[(name, role.name)] = (games + 1, wins + win)
+
+    # role の agent が event の行動をした回数を数える
+    def count(self, agent: Agent, role: Role, event: str, n: int = 1) -> None:
+        name = self.key(agent)
+        if name is None:
+            return
+        self.load()
+        k = (name, role.name, event)
+        self.events[k] += n
+        self.pending_events[k] += n
+
+    # 増分をまとめて書き込む
+    def flush(self) -> None:
+        if (not self.pending and not self.pending_events) or self.path is None:
+            self.pending.clear()
+            self.pending_events.clear()
+            return
+        rows = [(name, role, games, wins) for (name, role), (games, wins) in self.pending.items()]
+        totals: DefaultDict[str, Tuple[int, int]] = defaultdict(lambda: (0, 0))
+        for name, _, games, wins in rows:
+            totals[name] = (totals[name][0] + games, totals[name][1] + wins)
+        try:
+            connection = self.connect()
+        except sqlite3.Error as e:
+            # 増分は残しておいて次の flush で書き込む
+            self.report("flush", e)
+            return
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO role_stats (name, role, games, wins) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (name, role) DO UPDATE SET games = games + excluded.games, wins = wins + excluded.wins",
+                    rows)
+                connection.executemany(
+                    "INSERT INTO agent_stats (name, games, wins) VALUES (?, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET games = games + excluded.games, wins = wins + excluded.wins",
+                    [(name, games, wins) for name, (games, wins) in totals.items()])
+                connection.executemany(
+                    "INSERT INTO event_stats (name, role, event, count) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (name, role, event) DO UPDATE SET count = count + excluded.count",
+                    [(name, role, event, count) for (name, role, event), count in self.pending_events.items()])
+        except sqlite3.Error as e:
+            # トランザクションは取り消されたので、増分は残しておいて次の flush で書き込む
+            self.report("flush", e)
+            return
+        finally:
+            connection.close()
+        self.pending.clear()
+        self.pending_events.clear()
+
+    def win_rate(self, agent: Agent) -> float:
+        self.load()
+        name = self.key(agent)
+        if name is None:
+            return 0.0
+        games = self.games.get(name, 0)
+        return self.wins.get(name, 0) / games if games else 0.0
+
+    def win_role_rate(self, agent: Agent, role: Role) -> float:
+        self.load()
+        k = (self.key(agent), role.name)
+        games = self.role_games.get(k, 0)
+        return self.role_wins.get(k, 0) / games if games else 0.0
+
+    def role_count(self, agent: Agent, role: Role) -> int:
+        self.load()
+        return self.role_games.get((self.key(agent), role.name), 0)
+
+    def event_count(self, agent: Agent, role: Role, event: str) -> int:
+        self.load()
+        return self.events.get((self.key(agent), role.name, event), 0)
+
+    def win_rates(self, agents: Iterable[Agent]) -> Dict[Agent, float]:
+        return {a: self.win_rate(a) for a in agents}
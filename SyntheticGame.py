@@ -0,0 +1,228 @@
+import json
+import random
+from collections import Counter
+from typing import Dict, Generator, List, Optional
+
+from aiwolf import Role
+
+# AIWolf サーバが送るパケット (JSON) を模したデータを作る
+# ベンチマークで、サーバなしでエージェントを動かすために使う
+
+# 人数ごとの役職構成
+ROLE_NUM_MAP: Dict[int, Dict[Role, int]] = {
+    5: {Role.VILLAGER: 2, Role.SEER: 1, Role.POSSESSED: 1, Role.WEREWOLF: 1},
+    6: {Role.VILLAGER: 2, Role.SEER: 1, Role.POSSESSED: 1, Role.WEREWOLF: 1, Role.FOX: 1},
+    9: {Role.VILLAGER: 3, Role.SEER: 1, Role.MEDIUM: 1, Role.BODYGUARD: 1, Role.POSSESSED: 1, Role.WEREWOLF: 2},
+    13: {Role.VILLAGER: 6, Role.SEER: 1, Role.MEDIUM: 1, Role.BODYGUARD: 1, Role.POSSESSED: 1, Role.WEREWOLF: 3},
+    15: {Role.VILLAGER: 8, Role.SEER: 1, Role.MEDIUM: 1, Role.BODYGUARD: 1, Role.POSSESSED: 1, Role.WEREWOLF: 3},
+}
+
+
+# 役職の並び (roles[i] がエージェント i+1 の役職)
+# me の役職を my_role にして、残りは役職構成の順に並べる
+def role_assignment(N: int, me: int, my_role: Role) -> List[Role]:
+    rest: List[Role] = []
+    for r, n in ROLE_NUM_MAP[N].items():
+        rest += [r] * n
+    rest.remove(my_role)
+    return rest[:me - 1] + [my_role] + rest[me - 1:]
+
+
+def game_setting_packet(N: int) -> dict:
+    role_num_map = ROLE_NUM_MAP[N]
+    return {
+        "enableNoAttack": False, "enableNoExecution": False, "enableRoleRequest": True,
+        "maxAttackRevote": 1, "maxRevote": 1, "maxSkip": 2, "maxTalk": 10, "maxTalkTurn": 20,
+        "maxWhisper": 10, "maxWhisperTurn": 20, "playerNum": N, "isTalkOnFirstDay": True,
+        "responseTimeout": 6000, "actionTimeout": 3000, "randomSeed": 0, "timeLimit": -1,
+        "roleNumMap": {r.value: role_num_map.get(r, 0) for r in
+                       [Role.BODYGUARD, Role.FOX, Role.FREEMASON, Role.MEDIUM, Role.POSSESSED, Role.SEER,
+                        Role.VILLAGER, Role.WEREWOLF]},
+        "isValidateUtterance": True, "isVotableInFirstDay": True, "voteVisible": True, "whisperBeforeRevote": False,
+    }
+
+
+# roles: 全員の役職、alive: 生存者 (agent_idx の集合)
+# reveal=True なら全員の役職を roleMap に入れる (ゲーム終了時)
+def game_info_packet(me: int, roles: List[Role], day: int, alive: Optional[set] = None,
+                     talk_list: Optional[List[dict]] = None, whisper_list: Optional[List[dict]] = None,
+                     vote_list: Optional[List[dict]] = None, last_dead: Optional[List[int]] = None,
+                     executed: int = -1, attacked: int = -1, divine_result: Optional[dict] = None,
+                     medium_result: Optional[dict] = None, reveal: bool = False) -> dict:
+    N = len(roles)
+    alive = alive if alive is not None else set(range(1, N + 1))
+    my_role = roles[me - 1]
+    if reveal:
+        role_map = {str(i + 1): r.value for i, r in enumerate(roles)}
+    elif my_role == Role.WEREWOLF:
+        role_map = {str(i + 1): r.value for i, r in enumerate(roles) if r == Role.WEREWOLF}
+    else:
+        role_map = {str(me): my_role.value}
+    return {
+        "agent": me,
+        "attackVoteList": [],
+        "attackedAgent": attacked,
+        "cursedFox": -1,
+        "day": day,
+        "divineResult": divine_result,
+        "executedAgent": executed,
+        "existingRoleList": sorted({r.value for r in roles}),
+        "guardedAgent": -1,
+        "lastDeadAgentList": last_dead if last_dead is not None else [],
+        "latestAttackVoteList": [],
+        "latestExecutedAgent": executed,
+        "latestVoteList": [],
+        "mediumResult": medium_result,
+        "remainTalkMap": {str(a): 10 for a in alive},
+        "remainWhisperMap": {str(a): 10 for a in alive if roles[a - 1] == Role.WEREWOLF} if my_role == Role.WEREWOLF else {},
+        "roleMap": role_map,
+        "statusMap": {str(i): "ALIVE" if i in alive else "DEAD" for i in range(1, N + 1)},
+        "talkList": talk_list if talk_list is not None else [],
+        "voteList": vote_list if vote_list is not None else [],
+        "whisperList": whisper_list if whisper_list is not None else [],
+    }
+
+
+def talk_packet(agent: int, day: int, idx: int, turn: int, text: str) -> dict:
+    return {"agent": agent, "day": day, "idx": idx, "turn": turn, "text": text, "skip": text == "Skip", "over": text == "Over"}
+
+
+def request_packet(request: str, game_info: Optional[dict] = None, game_setting: Optional[dict] = None,
+                   talk_history: Optional[List[dict]] = None, whisper_history: Optional[List[dict]] = None) -> dict:
+    return {"request": request, "gameInfo": game_info, "gameSetting": game_setting,
+            "talkHistory": talk_history, "whisperHistory": whisper_history}
+
+
+def agent_text(idx: int) -> str:
+    return "Agent[{:02}]".format(idx)
+
+
+class GameScript:
+    """A whole synthetic game as the sequence of requests the server sends to one agent.
+
+    Other agents talk (seer and possessed come out and report divinations, everyone declares a vote) and vote at random
+    with a fixed seed. Responses of the agent are fed back through the generator, so its talks, votes and actions
+    appear in the following packets.
+    """
+
+    def __init__(self, N: int, my_role: Role, seed: int = 0, me: int = 1, talk_turns: int = 3, max_day: int = 10) -> None:
+        self.rng = random.Random(seed)
+        self.N = N
+        self.me = me
+        self.my_role = my_role
+        self.talk_turns = talk_turns
+        self.max_day = max_day
+        roles = role_assignment(N, me, my_role)
+        del roles[me - 1]
+        self.rng.shuffle(roles)
+        roles.insert(me - 1, my_role)
+        self.roles = roles
+
+    def role(self, idx: int) -> Role:
+        return self.roles[idx - 1]
+
+    def finished(self, alive: set) -> bool:
+        wolves = sum(1 for a in alive if self.role(a) == Role.WEREWOLF)
+        return wolves == 0 or wolves >= len(alive) - wolves
+
+    # 返答 (エージェント番号) を取り出す
+    def target(self, response: Optional[str], candidates: List[int]) -> int:
+        try:
+            idx = json.loads(response)["agentIdx"] if response else -1
+        except (ValueError, KeyError, TypeError):
+            idx = -1
+        return idx if idx in candidates else self.rng.choice(candidates)
+
+    # 他のエージェントの発話
+    def utterance(self, agent: int, day: int, turn: int, alive: set, vote_target: int) -> str:
+        role = self.role(agent)
+        if turn == 0 and role in (Role.SEER, Role.POSSESSED):
+            if day == 0:
+                return "COMINGOUT " + agent_text(agent) + " SEER"
+            target = self.rng.choice(sorted(alive - {agent}))
+            species = "WEREWOLF" if self.rng.random() < 0.3 else "HUMAN"
+            return "DIVINED " + agent_text(target) + " " + species
+        if turn <= 1:
+            return "VOTE " + agent_text(vote_target)
+        return "Over"
+
+    def packets(self) -> Generator[dict, Optional[str], None]:
+        N, me, rng = self.N, self.me, self.rng
+        alive = set(range(1, N + 1))
+        setting = game_setting_packet(N)
+        info = lambda day, **kwargs: game_info_packet(me, self.roles, day, alive, **kwargs)
+        yield request_packet("INITIALIZE", info(0), setting)
+        last_dead: List[int] = []
+        executed = attacked = -1
+        divine_result: Optional[dict] = None
+        medium_result: Optional[dict] = None
+        for day in range(self.max_day + 1):
+            yield request_packet("DAILY_INITIALIZE", info(day, last_dead=last_dead, executed=executed, attacked=attacked,
+                                                          divine_result=divine_result, medium_result=medium_result), setting)
+            # 昼: 発話
+            talk_idx = 0
+            others = sorted(alive - {me})
+            vote_targets = {a: rng.choice(sorted(alive - {a})) for a in alive}
+            history: List[dict] = []
+            # その日の発話すべて (投票・夜のリクエストの gameInfo に入れる)
+            day_talks: List[dict] = []
+            for turn in range(self.talk_turns):
+                for a in others:
+                    talk = talk_packet(a, day, talk_idx, turn, self.utterance(a, day, turn, alive, vote_targets[a]))
+                    history.append(talk)
+                    day_talks.append(talk)
+                    talk_idx += 1
+                if me in alive:
+                    text = yield request_packet("TALK", talk_history=history)
+                    history = [talk_packet(me, day, talk_idx, turn, text if text else "Over")]
+                    day_talks.append(history[0])
+                    talk_idx += 1
+                else:
+                    history = []
+            if self.my_role == Role.WEREWOLF and me in alive:
+                yield request_packet("WHISPER", talk_history=history, whisper_history=[])
+            # 投票 (0日目はなし)
+            vote_list: List[dict] = []
+            if day >= 1:
+                if me in alive:
+                    response = yield request_packet("VOTE", info(day, talk_list=day_talks))
+                    vote_targets[me] = self.target(response, sorted(alive - {me}))
+                vote_list = [{"agent": a, "day": day, "target": vote_targets[a]} for a in sorted(alive)]
+                counts = Counter(vote_targets[a] for a in alive)
+                top = max(counts.values())
+                executed = rng.choice(sorted(t for t, c in counts.items() if c == top))
+                alive.discard(executed)
+                if self.my_role == Role.MEDIUM:
+                    medium_result = {"agent": me, "day": day + 1, "target": executed,
+                                     "result": "WEREWOLF" if self.role(executed) == Role.WEREWOLF else "HUMAN"}
+            else:
+                executed = -1
+            yield request_packet("DAILY_FINISH", info(day, talk_list=day_talks, vote_list=vote_list, executed=executed))
+            if self.finished(alive):
+                break
+            # 夜: 能力
+            divine_result = None
+            if self.my_role == Role.SEER and me in alive:
+                response = yield request_packet("DIVINE", info(day, talk_list=day_talks))
+                target = self.target(response, sorted(alive - {me}))
+                divine_result = {"agent": me, "day": day + 1, "target": target,
+                                 "result": "WEREWOLF" if self.role(target) == Role.WEREWOLF else "HUMAN"}
+            guarded = -1
+            if self.my_role == Role.BODYGUARD and me in alive and day >= 1:
+                response = yield request_packet("GUARD", info(day, talk_list=day_talks))
+                guarded = self.target(response, sorted(alive - {me}))
+            humans = sorted(a for a in alive if self.role(a) != Role.WEREWOLF)
+            attacked = -1
+            if day >= 1:
+                if self.my_role == Role.WEREWOLF and me in alive:
+                    response = yield request_packet("ATTACK", info(day, talk_list=day_talks))
+                    attacked = self.target(response, humans)
+                else:
+                    attacked = rng.choice(humans)
+                if attacked == guarded:
+                    attacked = -1
+            last_dead = [attacked] if attacked != -1 else []
+            alive -= set(last_dead)
+            if self.finished(alive):
+                break
+        yield request_packet("FINISH", game_info_packet(me, self.roles, day, alive, reveal=True))
@@ -0,0 +1,97 @@
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+from Belief import Belief
+
+from aiwolf import (Agent, Content, EstimateContentBuilder, GameInfo, Role,
+                    VoteContentBuilder)
+from aiwolf.constant import AGENT_NONE
+
+# 人狼確率がこれ以上変わったときだけ順位を付け直す
+REFRESH_THRESHOLD = 0.05
+# 投票宣言を変えるのは、新しい候補の価値がこれ以上高いときだけ (宣言を頻繁に変えると信用されない)
+SWITCH_MARGIN = 0.1
+# 人狼だと推定する発言の重み (投票宣言に比べて他者を動かす力は弱い)
+ESTIMATE_WEIGHT = 0.5
+# この価値以上の候補だけを人狼だと推定する発言をする
+ESTIMATE_MIN_VALUE = 0.5
+
+
+class TalkPlanner:
+    """Chooses the talk (vote declaration or werewolf estimate) from a ranking of the vote targets.
+
+    The value of a target is its werewolf probability (marginals of the Belief), or the probability of being human
+    for the werewolf side, which wants humans executed. The ranking is kept between talk turns and sorted again
+    only when the Belief changed (Skip and Over talks and whispers do not change it) and some probability moved
+    by more than REFRESH_THRESHOLD (or an agent died), so a turn with nothing new costs a comparison of the Belief version.
+    Each utterance is given an expected persuasive value and the best one is said if it is positive:
+    declaring a better vote target (by SWITCH_MARGIN at least), or estimating the top target as a werewolf once.
+    """
+
+    def __init__(self, belief: Belief) -> None:
+        self.belief = belief
+        self.me: Agent = AGENT_NONE
+        self.werewolf_side = False
+        # 順位付けした時の Belief の version, 人狼確率, 生存者
+        self.version = -1
+        self.werewolf: Optional[np.ndarray] = None
+        self.alive: Tuple[Agent, ...] = ()
+        # 価値の高い順の投票先の候補と、その価値
+        self.ranking: List[Agent] = []
+        self.value: np.ndarray = np.zeros(0)
+        # 人狼だと推定する発言をしたエージェント
+        self.estimated: Set[Agent] = set()
+
+    def start(self, game_info: GameInfo, werewolf_side: bool = False) -> None:
+        self.me = game_info.me
+        self.werewolf_side = werewolf_side
+        self.version = -1
+        self.werewolf = None
+        self.alive = ()
+        self.ranking = []
+        self.value = np.zeros(len(game_info.agent_list))
+        self.estimated.clear()
+
+    # Belief が変わっていれば、生存者が変わったか人狼確率が閾値以上変わったときだけ順位を付け直す
+    def refresh(self, game_info: GameInfo) -> None:
+        if self.belief.version == self.version:
+            return
+        self.version = self.belief.version
+        alive = tuple(a for a in game_info.alive_agent_list if a != self.me)
+        werewolf = self.belief.marginals()[:, self.belief.score_matrix.rtoi[Role.WEREWOLF]]
+        if alive == self.alive and self.werewolf is not None and np.abs(werewolf - self.werewolf).max() <= REFRESH_THRESHOLD:
+            return
+        self.werewolf = werewolf
+        self.alive = alive
+        self.value = 1 - werewolf if self.werewolf_side else werewolf
+        self.ranking = sorted(alive, key=lambda a: (-self.value[a.agent_idx - 1], a.agent_idx))
+
+    # 投票先の候補を価値の高い順に返す
+    def candidates(self, game_info: GameInfo) -> List[Agent]:
+        self.refresh(game_info)
+        return self.ranking
+
+    # 発言と、発言後の投票先を返す (発言することがなければ発言は None)
+    def talk(self, game_info: GameInfo, vote_candidate: Agent) -> Tuple[Optional[Content], Agent]:
+        ranking = self.candidates(game_info)
+        if not ranking:
+            return None, vote_candidate
+        top = ranking[0]
+        value = self.value[top.agent_idx - 1]
+        # 投票宣言: 宣言していない、宣言した相手が死んだ、より価値の高い相手がいる
+        if vote_candidate == AGENT_NONE or vote_candidate not in self.alive:
+            vote_value = value + SWITCH_MARGIN
+        elif top != vote_candidate:
+            vote_value = value - self.value[vote_candidate.agent_idx - 1] - SWITCH_MARGIN
+        else:
+            vote_value = 0.0
+        # 人狼だと推定する発言: 投票宣言した相手を1回だけ
+        estimate_value = 0.0
+        if top == vote_candidate and top not in self.estimated and value >= ESTIMATE_MIN_VALUE:
+            estimate_value = ESTIMATE_WEIGHT * value
+        if vote_value <= 0 and estimate_value <= 0:
+            return None, vote_candidate
+        if vote_value >= estimate_value:
+            return Content(VoteContentBuilder(top)), top
+        self.estimated.add(top)
+        return Content(EstimateContentBuilder(top, Role.WEREWOLF)), vote_candidate
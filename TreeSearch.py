@@ -0,0 +1,283 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from Belief import Belief
+from Budget import Budget
+from EventLog import INFO, EventLog
+from FakeJudgePlanner import (BLACK_SUSPICION, SEER_ATTACK_BIAS,
+                              WHITE_SUSPICION, suspicion)
+from Metrics import PLAYOUTS
+
+from aiwolf import Agent, GameInfo, Role
+from aiwolf.constant import AGENT_NONE
+
+# 探索する村の人数の上限 (5人村では2日目までに勝負が決まることが多いので、行動の価値の差が大きい)
+MAX_PLAYERS = 5
+# 1回の探索にかける時間の上限と、リクエストの残り時間から残しておく時間 (ms)
+SEARCH_MS = 1000.0
+SEARCH_MARGIN_MS = 300.0
+# 探索に使える時間がこれより短ければ探索しない (ms)
+MIN_SEARCH_MS = 50.0
+# 1つの木で使う決定化 (役職の割り当ての標本) の数
+SAMPLES = 2048
+# UCB1 の探索の重み
+EXPLORATION = 1.4
+# 投票先を選ぶときに疑われやすさに足す一様乱数の幅
+VOTE_NOISE = 2.0
+# 時刻を確かめるプレイアウトの間隔
+CHECK_INTERVAL = 16
+
+# プレイアウトの局面
+VOTE = 0
+NIGHT = 1
+
+
+class Rules(NamedTuple):
+    """What a playout needs to know besides the state: me and the role numbers (rtoi) of the ScoreMatrix."""
+    me: int
+    werewolf: int
+    # 占い師の役職の番号 (村にいなければ -1)
+    seer: int
+    # 自分が人狼陣営 (人狼、狂人) か
+    wolf_side: bool
+    # 自分の夜の行動 ("divine", "attack", 無ければ "")
+    night: str
+    # 占っても分からないことがない (役職が確定している) エージェント
+    known: Tuple[int, ...]
+
+
+class Node:
+    """Node of the open-loop search tree: statistics of one sequence of my actions, whatever the others did."""
+
+    __slots__ = ("visits", "wins", "children")
+
+    def __init__(self) -> None:
+        self.visits = 0
+        self.wins = 0.0
+        self.children: Dict[int, "Node"] = {}
+
+    # UCB1 で行動を選ぶ (試していない行動があればそれを先に選ぶ)
+    def select(self, legal: Sequence[int], rng: random.Random) -> int:
+        untried = [a for a in legal if a not in self.children]
+        if untried:
+            return rng.choice(untried)
+        log_visits = math.log(self.visits)
+        return max(legal, key=lambda a: self.children[a].wins / self.children[a].visits
+                   + EXPLORATION * math.sqrt(log_visits / self.children[a].visits))
+
+
+class Simulator:
+    """Plays a game out from a compact state (lists of roles, alive flags and suspicion indexed by agent).
+
+    The others follow simple policies: the village votes the most suspected agent (with noise),
+    the werewolves vote the most suspected human and attack a human (the real seer more likely),
+    and the real seer divines a random agent and the result changes the suspicion.
+    My own decisions are chosen in the tree, and by the same policies once the playout leaves it.
+    """
+
+    def __init__(self, rules: Rules, rng: random.Random) -> None:
+        self.rules = rules
+        self.rng = rng
+        self.seer_weight = math.exp(SEER_ATTACK_BIAS)
+
+    # 勝った陣営 (人狼陣営なら True、村人陣営なら False、決まっていなければ None)
+    def winner(self, roles: List[int], alive: List[bool]) -> Optional[bool]:
+        werewolves = sum(1 for r, a in zip(roles, alive) if a and r == self.rules.werewolf)
+        humans = sum(alive) - werewolves
+        if werewolves == 0:
+            return False
+        return True if werewolves >= humans else None
+
+    def vote_target(self, roles: List[int], alive: List[bool], suspicion: List[float], i: int) -> int:
+        werewolf = self.rules.werewolf
+        wolf = roles[i] == werewolf
+        best, best_value = -1, -math.inf
+        for j, a in enumerate(alive):
+            if a and j != i and not (wolf and roles[j] == werewolf):
+                value = suspicion[j] + self.rng.random() * VOTE_NOISE
+                if value > best_value:
+                    best, best_value = j, value
+        return best
+
+    # 投票で処刑されるエージェント (同票なら無作為)
+    def execute(self, roles: List[int], alive: List[bool], suspicion: List[float], my_vote: int) -> int:
+        votes = [0] * len(alive)
+        for i, a in enumerate(alive):
+            if a:
+                votes[my_vote if i == self.rules.me else self.vote_target(roles, alive, suspicion, i)] += 1
+        most = max(votes)
+        return self.rng.choice([j for j, v in enumerate(votes) if v == most])
+
+    def divine_target(self, alive: List[bool], seer: int) -> int:
+        return self.rng.choice([j for j, a in enumerate(alive) if a and j != seer])
+
+    def attack_target(self, roles: List[int], alive: List[bool]) -> int:
+        humans = [j for j, a in enumerate(alive) if a and roles[j] != self.rules.werewolf]
+        weights = [self.seer_weight if roles[j] == self.rules.seer else 1.0 for j in humans]
+        return self.rng.choices(humans, weights)[0]
+
+    # 木の中なら UCB1 で、木の外なら方策で自分の行動を選ぶ
+    # 木の中で初めて選んだ行動はノードを1つ追加して、残りは木の外で選ぶ
+    def decide(self, node: Optional[Node], path: List[Node], legal: List[int],
+               policy: Callable[[], int]) -> Tuple[int, Optional[Node]]:
+        if node is None or not legal:
+            return policy(), None
+        action = node.select(legal, self.rng)
+        child = node.children.get(action)
+        expanded = child is None
+        if expanded:
+            child = node.children[action] = Node()
+        path.append(child)
+        return action, None if expanded else child
+
+    # 1回のプレイアウトをして、通った木のノードの統計を更新する
+    def playout(self, root: Node, roles: List[int], alive: List[bool], suspicion: List[float], phase: int) -> None:
+        rules = self.rules
+        me = rules.me
+        node: Optional[Node] = root
+        path = [root]
+        winner: Optional[bool] = None
+        seer = roles.index(rules.seer) if rules.seer in roles else -1
+        while winner is None:
+            if phase == VOTE:
+                my_vote = -1
+                if alive[me]:
+                    legal = [j for j, a in enumerate(alive) if a and j != me]
+                    my_vote, node = self.decide(node, path, legal, lambda: self.vote_target(roles, alive, suspicion, me))
+                executed = self.execute(roles, alive, suspicion, my_vote)
+                alive[executed] = False
+                phase = NIGHT
+            else:
+                # 占い: 本物の占い師の結果は公開されて、疑われやすさが変わる
+                if seer >= 0 and alive[seer]:
+                    if seer == me and rules.night == "divine":
+                        legal = [j for j, a in enumerate(alive) if a and j != me and j not in rules.known]
+                        target, node = self.decide(node, path, legal, lambda: self.divine_target(alive, seer))
+                    else:
+                        target = self.divine_target(alive, seer)
+                    suspicion[target] += BLACK_SUSPICION if roles[target] == rules.werewolf else -WHITE_SUSPICION
+                # 襲撃
+                if alive[me] and rules.night == "attack":
+                    legal = [j for j, a in enumerate(alive) if a and roles[j] != rules.werewolf]
+                    target, node = self.decide(node, path, legal, lambda: self.attack_target(roles, alive))
+                else:
+                    target = self.attack_target(roles, alive)
+                alive[target] = False
+                phase = VOTE
+            winner = self.winner(roles, alive)
+        reward = 1.0 if winner == rules.wolf_side else 0.0
+        for n in path:
+            n.visits += 1
+            n.wins += reward
+
+
+# 1つの木を duration_ms の間探索して、根の行動ごとの (訪問回数, 勝ち数) を返す
+# プロセスプールのワーカーで実行するので、引数と戻り値は pickle できる値だけにする
+def search(samples: List[List[int]], alive: List[bool], suspicion: List[float], rules: Rules, phase: int,
+           duration_ms: float, seed: int) -> Dict[int, Tuple[int, float]]:
+    simulator = Simulator(rules, random.Random(seed))
+    root = Node()
+    end = time.perf_counter() + duration_ms / 1000
+    i = 0
+    while i % CHECK_INTERVAL != 0 or time.perf_counter() < end:
+        simulator.playout(root, samples[i % len(samples)], list(alive), list(suspicion), phase)
+        i += 1
+    return {a: (child.visits, child.wins) for a, child in root.children.items()}
+
+
+# ワーカーのプロセスを起動しておくための空の仕事
+def warm_up() -> None:
+    pass
+
+
+class TreeSearch:
+    """Chooses vote, divine and attack targets in small villages by Monte Carlo tree search.
+
+    Each tree is an open-loop UCT over the sequence of my own actions; every playout draws a determinization
+    (an assignment of roles) from the posterior of my ScoreMatrix (Belief.posterior) and plays the rest of the game
+    on lists (Simulator) instead of GameInfo objects. With workers, that many trees are searched in a process pool
+    in parallel with one in this process (root parallelization), each on its own samples, and their root
+    statistics are added up. The search takes the time left in the request (Budget) up to SEARCH_MS,
+    and the action is the one visited most.
+    """
+
+    def __init__(self, workers: int = 0, max_players: int = MAX_PLAYERS) -> None:
+        self.workers = workers
+        self.max_players = max_players
+        self.rng = np.random.default_rng()
+        self.pool: Optional[ProcessPoolExecutor] = None
+        if workers > 0:
+            # 最初の探索で起動を待たないように、ワーカーを先に起動しておく
+            self.pool = ProcessPoolExecutor(workers)
+            for _ in range(workers):
+                self.pool.submit(warm_up)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+
+    # 探索で選ぶ行動か
+    def applies(self, game_info: GameInfo, action: str) -> bool:
+        if len(game_info.agent_list) > self.max_players:
+            return False
+        return action == "vote" or (action, game_info.my_role) in (("divine", Role.SEER), ("attack", Role.WEREWOLF))
+
+    def rules(self, belief: Belief, game_info: GameInfo) -> Rules:
+        sm = belief.score_matrix
+        werewolf = sm.rtoi[Role.WEREWOLF]
+        seer = sm.rtoi[Role.SEER]
+        my_role = game_info.my_role
+        night = {Role.SEER: "divine", Role.WEREWOLF: "attack"}.get(my_role, "")
+        # 人狼確率が 0 か 1 のエージェントは占わない
+        p = belief.marginals()[:, werewolf]
+        known = tuple(int(j) for j in np.nonzero((p < 1e-9) | (p > 1 - 1e-9))[0])
+        return Rules(game_info.me.agent_idx - 1, werewolf, seer if 0 <= seer < sm.M else -1,
+                     my_role in (Role.WEREWOLF, Role.POSSESSED), night, known)
+
+    # 探索で選んだ行動の対象 (時間が足りなければ AGENT_NONE)
+    def choose(self, belief: Belief, game_info: GameInfo, action: str) -> Agent:
+        duration = min(SEARCH_MS, Budget.deadline().remaining() - SEARCH_MARGIN_MS)
+        if duration < MIN_SEARCH_MS:
+            return AGENT_NONE
+        Budget.enter("search")
+        try:
+            rules = self.rules(belief, game_info)
+            table, weights = belief.posterior()
+            agents = {a.agent_idx - 1: a for a in game_info.agent_list}
+            alive = [agents[j] in game_info.alive_agent_list for j in range(len(agents))]
+            phase = VOTE if action == "vote" else NIGHT
+            s = suspicion(belief).tolist()
+            trees = self.workers + 1 if self.pool is not None else 1
+            rows = self.rng.choice(len(table), size=(trees, SAMPLES), p=weights / weights.sum())
+            seeds = self.rng.integers(1 << 31, size=trees)
+            futures = [self.pool.submit(search, table[rows[t]].tolist(), alive, s, rules, phase, duration, int(seeds[t]))
+                       for t in range(1, trees)] if self.pool is not None else []
+            results = [search(table[rows[0]].tolist(), alive, s, rules, phase, duration, int(seeds[0]))]
+            for future in futures:
+                try:
+                    results.append(future.result(timeout=max(0.0, Budget.deadline().remaining() - SEARCH_MARGIN_MS / 2) / 1000))
+                except Exception:
+                    # 間に合わなかった (または失敗した) 木は使わない
+                    future.cancel()
+            visits: Dict[int, int] = {}
+            wins: Dict[int, float] = {}
+            for result in results:
+                for a, (n, w) in result.items():
+                    visits[a] = visits.get(a, 0) + n
+                    wins[a] = wins.get(a, 0.0) + w
+        finally:
+            Budget.leave("search")
+        if not visits:
+            return AGENT_NONE
+        total = sum(visits.values())
+        PLAYOUTS.inc(total)
+        best = max(visits, key=lambda a: (visits[a], -a))
+        target = agents[best]
+        EventLog.log("search", INFO, "tree_search", action=action, target=target, trees=len(results), playouts=total,
+                     visits=visits[best], win_rate=round(wins[best] / visits[best], 3))
+        return target
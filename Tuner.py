@@ -0,0 +1,129 @@
+import time
+from argparse import ArgumentParser
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+
+import numpy as np
+from Assignment import Assignment
+from GameLog import (DayRecord, Record, ResultRecord, ScoreMatrixHandler,
+                     dispatch, read_records)
+from ScoreMatrix import ScoreMatrix
+from ScoreParams import ScoreParams
+from Util import Util
+
+
+class LikelihoodHandler(ScoreMatrixHandler):
+    """Replay handler that accumulates the log-likelihood of the true role assignment.
+
+    The posterior is evaluated at the start of each day from the 2nd day on and at the end of the game.
+    """
+
+    def __init__(self, params: ScoreParams) -> None:
+        super().__init__()
+        self.params = params
+        self.snapshots: List[np.ndarray] = []
+        self.log_likelihood = 0.0
+        self.count = 0
+
+    def new_score_matrix(self) -> ScoreMatrix:
+        return ScoreMatrix(self.game_info, self.game_setting, self.player, self.params)
+
+    def game(self, rec) -> None:
+        super().game(rec)
+        self.snapshots = []
+
+    def day(self, rec: DayRecord) -> None:
+        super().day(rec)
+        if rec.day >= 2:
+            self.snapshots.append(self.score_matrix.to_dense())
+
+    def result(self, rec: ResultRecord) -> None:
+        super().result(rec)
+        sm = self.score_matrix
+        self.snapshots.append(sm.to_dense())
+        table = Assignment.role_table(sm.role_list())
+        truth = np.array([sm.rtoi[rec.role_map[a]] for a in self.game_info.agent_list], dtype=np.intp)
+        for snapshot in self.snapshots:
+            self.log_likelihood += log_likelihood(snapshot, table, truth)
+            self.count += 1
+
+
+# 真の割り当ての対数尤度 (スコアは 1/10 倍して相対確率の対数にする)
+# 真の割り当てが -inf になっている場合に目的関数が発散しないように、下限を設ける
+def log_likelihood(score_matrix: np.ndarray, table: np.ndarray, truth: np.ndarray, floor: float = -50.0) -> float:
+    scores = Assignment.evaluate_table(score_matrix, table) / 10
+    true_score = Assignment.evaluate_table(score_matrix, truth[None, :])[0] / 10
+    top = scores.max()
+    if top == -float("inf") or true_score == -float("inf"):
+        return floor
+    return max(true_score - top - np.log(np.exp(scores - top).sum()), floor)
+
+
+# --------------- 並列評価 (ワーカープロセス) ---------------
+worker_records: List[Record] = []
+
+
+def init_worker(paths: List[str]) -> None:
+    global worker_records
+    Util.debug_mode = False
+    worker_records = [rec for path in paths for rec in read_records(path)]
+
+
+def evaluate(values: np.ndarray) -> Tuple[float, int]:
+    handler = dispatch(worker_records, LikelihoodHandler(ScoreParams(values)))
+    return handler.log_likelihood, handler.count
+
+
+# --------------- 最適化 ---------------
+# 座標ごとのパターンサーチ
+# 1回の掃引で全定数を ±step だけ動かした候補を並列に評価し、最も良い候補に移る
+# 改善しなければ step を半分にする
+def tune(paths: List[str], jobs: Optional[int] = None, step: float = 0.5, min_step: float = 0.02,
+         max_sweeps: int = 50, params: Optional[ScoreParams] = None) -> ScoreParams:
+    params = params if params is not None else ScoreParams.default
+    x = params.values.copy()
+    # 0.1 のような小さい定数も動かせるように、定数の大きさに合わせて刻み幅を決める
+    scale = np.maximum(np.abs(x), 0.1)
+    with Pool(jobs, initializer=init_worker, initargs=(paths,)) as pool:
+        ll, count = pool.apply(evaluate, (x,))
+        if count == 0:
+            Util.error_print("tune: no game to evaluate")
+            return params
+        best = ll / count
+        print("initial:\t", round(best, 4))
+        for sweep in range(max_sweeps):
+            if step < min_step:
+                break
+            time_start = time.time()
+            candidates = []
+            for k in range(len(x)):
+                for sign in (+1, -1):
+                    y = x.copy()
+                    y[k] += sign * step * scale[k]
+                    candidates.append(y)
+            results = pool.map(evaluate, candidates)
+            scores = [ll / count for ll, _ in results]
+            k = int(np.argmax(scores))
+            if scores[k] > best:
+                best = scores[k]
+                x = candidates[k]
+                print("sweep", sweep, ":\t", round(best, 4), "\t", ScoreParams.names[k // 2], "->", round(x[k // 2], 3),
+                      "\t", round(time.time() - time_start, 1), "s")
+            else:
+                step /= 2
+                print("sweep", sweep, ":\t step ->", step)
+    return ScoreParams(x)
+
+
+if __name__ == "__main__":
+    # python Tuner.py -o params.json log1.bin log2.bin ...
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument("-o", type=str, action="store", dest="output", default="params.json")
+    parser.add_argument("-i", type=str, action="store", dest="initial", default=None)
+    parser.add_argument("-j", type=int, action="store", dest="jobs", default=None)
+    parser.add_argument("-s", type=int, action="store", dest="sweeps", default=50)
+    parser.add_argument("logs", nargs="+")
+    input_args = parser.parse_args()
+    initial = ScoreParams.load(input_args.initial) if input_args.initial is not None else None
+    tuned = tune(input_args.logs, input_args.jobs, max_sweeps=input_args.sweeps, params=initial)
+    tuned.save(input_args.output)
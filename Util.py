@@ -4,7 +4,10 @@ import traceback
 from collections import Counter, defaultdict
 from typing import DefaultDict, Dict, List
 
-from aiwolf import Agent, GameInfo, Role
+from EventLog import DEBUG, INFO, EventLog
+from StatsStore import StatsStore
+
+from aiwolf import Agent, GameInfo, Role, Status
 from aiwolf.constant import AGENT_NONE
 
 
@@ -14,30 +17,20 @@ class Util:
     need_traceback = True
 
     rtoi = {Role.VILLAGER: 0, Role.SEER: 1, Role.POSSESSED: 2, Role.WEREWOLF: 3, Role.MEDIUM: 4, Role.BODYGUARD: 5}
-    debug_mode = True
+    # True ならデバッグ出力を標準出力に書く (対戦中は書かない。EventLog の debug カテゴリには書ける)
+    debug_mode = False
     time_start = Dict[str, float]
 
     game_count: int = 0
-    win_count: DefaultDict[Agent, int] = {}
-    win_rate: DefaultDict[Agent, float] = {}
-    # 役職ごとの回数
-    agent_role_count: DefaultDict[Agent, DefaultDict[Role, int]] = defaultdict(lambda: defaultdict(int))
-    # 役職ごとの勝利回数
-    win_role_count: DefaultDict[Agent, DefaultDict[Role, int]] = defaultdict(lambda: defaultdict(int))
-    # 役職ごとの勝率
-    win_role_rate: DefaultDict[Agent, DefaultDict[Role, float]] = defaultdict(lambda: defaultdict(float))
+    # エージェントごと、役職ごとの勝利回数 (ゲームをまたいで保持し、パスを指定すればファイルに書き込む)
+    stats: StatsStore = StatsStore()
     sum_score: float = 0.0
-    # 投票宣言と投票先の一致回数
-    vote_count: DefaultDict[Agent, int] = defaultdict(int)
-    vote_match_count: DefaultDict[Agent, int] = defaultdict(int)
 
 
     @staticmethod
     def init():
         Util.time_start = {}
         Util.game_count = 0
-        Util.win_count = defaultdict(int)
-        Util.win_rate = defaultdict(float)
         Util.sum_score = 0
 
 
@@ -47,6 +40,8 @@ class Util:
         #     return
         if Util.debug_mode:
             print(*args, **kwargs)
+        elif EventLog.enabled("debug"):
+            EventLog.log("debug", DEBUG, "print", text=kwargs.get("sep", " ").join(map(str, args)))
 
 
     @staticmethod
@@ -69,7 +64,7 @@ class Util:
         time_exec = round((time_end - Util.time_start[func_name]) * 1000, 1)
         if time_exec >= time_threshold:
             if time_threshold == 0:
-                Util.debug_print("exec_time:\t", func_name, time_exec)
+                EventLog.log("time", DEBUG, "exec_time", func=func_name, ms=time_exec)
             else:
                 Util.error_print("exec_time:\t", func_name, time_exec)
 
@@ -81,33 +76,30 @@ class Util:
         return time_exec >= time_threshold
 
 
+    # 生存している人狼がいなければ村陣営の勝利
+    @staticmethod
+    def is_villager_win(game_info: GameInfo) -> bool:
+        return all(r != Role.WEREWOLF or game_info.status_map.get(a) != Status.ALIVE for a, r in game_info.role_map.items())
+
+
+    # 1ゲームの結果を数える (ファイルへの書き込みは finish で Util.stats.flush がまとめて行う)
     @staticmethod
     def update_win_rate(game_info: GameInfo, villager_win: bool):
-        for agent, role in game_info.role_map.items():
-            is_villager_side = role in [Role.VILLAGER, Role.SEER, Role.MEDIUM, Role.BODYGUARD]
-            win = villager_win if is_villager_side else not villager_win
-            Util.agent_role_count[agent][role] += 1
-            if win:
-                Util.win_count[agent] += 1
-                Util.win_role_count[agent][role] += 1
-            Util.win_rate[agent] = Util.win_count[agent] / Util.game_count
-            Util.win_role_rate[agent][role] = Util.win_role_count[agent][role] / Util.agent_role_count[agent][role]
-        Util.debug_print("")
-        Util.debug_print("------------------")
-        for agent in game_info.agent_list:
-            Util.debug_print("win_rate:\t", agent, Util.win_rate[agent])
-            role = game_info.role_map[agent]
-            Util.debug_print("win_role_rate:\t", agent, role, Util.win_role_rate[agent][role])
-        Util.debug_print("------------------")
+        Util.game_count += 1
+        Util.stats.record(game_info.role_map, villager_win)
+        if EventLog.enabled("stats", INFO):
+            EventLog.log("stats", INFO, "win_rate",
+                         win_rate={str(a): Util.stats.win_rate(a) for a in game_info.role_map},
+                         win_role_rate={str(a): Util.stats.win_role_rate(a, r) for a, r in game_info.role_map.items()})
 
 
     @staticmethod
     def get_strong_agent(agent_list: List[Agent], threshold: float = 0.0) -> Agent:
         rate = threshold
         strong_agent = AGENT_NONE
-        for agent in agent_list:
-            if Util.win_rate[agent] >= rate:
-                rate = Util.win_rate[agent]
+        for agent, win_rate in Util.stats.win_rates(agent_list).items():
+            if win_rate >= rate:
+                rate = win_rate
                 strong_agent = agent
         return strong_agent
 
@@ -116,9 +108,9 @@ class Util:
     def get_weak_agent(agent_list: List[Agent], threshold: float = 1.0) -> Agent:
         rate = threshold
         weak_agent = AGENT_NONE
-        for agent in agent_list:
-            if Util.win_rate[agent] <= rate:
-                rate = Util.win_rate[agent]
+        for agent, win_rate in Util.stats.win_rates(agent_list).items():
+            if win_rate <= rate:
+                rate = win_rate
                 weak_agent = agent
         return weak_agent
 
@@ -0,0 +1,115 @@
+from typing import Dict
+
+import numpy as np
+from GameLog import DayRecord, GameRecord, ReplayHandler, TalkRecord, VoteRecord
+from Regulation import Regulation
+from ScoreParams import ScoreParams
+
+from aiwolf import Agent, Role, Topic
+
+
+class VoteGraph(ReplayHandler):
+    """Replay handler that keeps the votes and the vote declarations of the game as (days, N, N) adjacency tensors.
+
+    votes[d, i, j] is 1 if agent i voted for j in the first round of day d, declared[d, i, j] if the latest
+    declaration (Topic.VOTE) of i on day d was j, and executed[d] is the index of the agent executed on day d
+    (taken from the day record of day d + 1, which arrives before the votes of day d).
+    The features of a day are N x N matrices computed from them:
+      vote:      i voted for j
+      bandwagon: i voted for the most declared target j of the day, although i had not declared j
+      split:     i voted, but not for the executed agent j
+    delta() combines each feature with its (M, M) role term into one (N, M, N, M) array,
+    so the reasoning from the votes of a day is a single update of the ScoreMatrix.
+    """
+
+    def __init__(self) -> None:
+        self.N = 0
+        self.votes = np.zeros((0, 0, 0))
+        self.declared = np.zeros((0, 0, 0))
+        self.executed = np.zeros(0, dtype=np.intp)
+
+    def game(self, rec: GameRecord) -> None:
+        self.N = rec.player_num
+        self.votes = np.zeros((self.N + 1, self.N, self.N))
+        self.declared = np.zeros((self.N + 1, self.N, self.N))
+        self.executed = np.full(self.N + 1, -1, dtype=np.intp)
+
+    # 日数が足りなければ配列を伸ばす
+    def reserve(self, day: int) -> None:
+        if day >= len(self.votes):
+            extra = day + 1 - len(self.votes)
+            self.votes = np.concatenate([self.votes, np.zeros((extra, self.N, self.N))])
+            self.declared = np.concatenate([self.declared, np.zeros((extra, self.N, self.N))])
+            self.executed = np.concatenate([self.executed, np.full(extra, -1, dtype=np.intp)])
+
+    def day(self, rec: DayRecord) -> None:
+        if rec.day >= 1 and rec.executed.agent_idx >= 1:
+            self.reserve(rec.day - 1)
+            self.executed[rec.day - 1] = rec.executed.agent_idx - 1
+
+    def talk(self, rec: TalkRecord) -> None:
+        if rec.whisper or rec.topic != Topic.VOTE or rec.target.agent_idx < 1:
+            return
+        self.reserve(rec.day)
+        row = self.declared[rec.day, rec.agent.agent_idx - 1]
+        row[:] = 0
+        row[rec.target.agent_idx - 1] = 1
+
+    def vote(self, rec: VoteRecord) -> None:
+        self.reserve(rec.day)
+        row = self.votes[rec.day, rec.agent.agent_idx - 1]
+        # 再投票は数えない
+        if not row.any():
+            row[rec.target.agent_idx - 1] = 1
+
+    # その日の特徴量 (名前 → (N, N))
+    def features(self, day: int) -> Dict[str, np.ndarray]:
+        self.reserve(day)
+        V = self.votes[day]
+        D = self.declared[day]
+        voted = V.sum(axis=1) > 0
+        # 最も投票宣言を集めた対象に、自分では宣言していないのに投票した
+        count = D.sum(axis=0)
+        top = np.zeros(self.N)
+        if count.max() > 0:
+            top[count == count.max()] = 1
+        bandwagon = V * top[None, :] * (1 - D)
+        # 追放されたエージェント以外に投票した (追放が分からない場合は最多得票のエージェント)
+        e = self.executed[day] if self.executed[day] >= 0 else int(V.sum(axis=0).argmax())
+        split = np.zeros((self.N, self.N))
+        split[:, e] = voted & (V[:, e] == 0)
+        split[e, e] = 0
+        return {"vote": V, "bandwagon": bandwagon, "split": split}
+
+    # 特徴量ごとの役職の組の重み (M, M)
+    @staticmethod
+    def role_terms(regulation: Regulation, p: ScoreParams, day: int) -> Dict[str, np.ndarray]:
+        M = regulation.M
+        rtoi = regulation.rtoi
+        villagers = [rtoi[r] for r in regulation.villagers]
+        werewolves = [rtoi[r] for r in regulation.werewolves]
+        humans = villagers + ([rtoi[Role.POSSESSED]] if regulation.has(Role.POSSESSED) else [])
+        w = rtoi[Role.WEREWOLF]
+        vote = np.zeros((M, M))
+        # 投票者が村陣営で、投票対象が人狼である確率を日にちで重み付けして上げる
+        vote[villagers, w] += day * p["vote.large.villagers_per_day"]
+        # 人狼が仲間の人狼に投票する確率は低い
+        vote[werewolves, w] += p["vote.large.werewolves.werewolf"]
+        # 人狼陣営は人間への投票に乗りやすい
+        bandwagon = np.zeros((M, M))
+        bandwagon[np.ix_(werewolves, humans)] += p["vote.large.bandwagon.werewolves.human"]
+        # 追放された人狼を避けて投票したのは仲間の人狼
+        split = np.zeros((M, M))
+        split[w, w] += p["vote.large.split.werewolf.werewolf"]
+        return {"vote": vote, "bandwagon": bandwagon, "split": split}
+
+    # その日の投票から推測するスコアの加算量 (N, M, N, M)
+    # me: 自分の投票は無視する
+    def delta(self, day: int, regulation: Regulation, p: ScoreParams, me: Agent) -> np.ndarray:
+        features = self.features(day)
+        terms = VoteGraph.role_terms(regulation, p, day)
+        # (F, N, N) と (F, M, M) をまとめて1回の einsum にする
+        A = np.stack([features[name] for name in terms])
+        A[:, me.agent_idx - 1, :] = 0
+        R = np.stack(list(terms.values()))
+        return np.einsum("fij,fab->iajb", A, R)
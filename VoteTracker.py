@@ -0,0 +1,59 @@
+from typing import Dict, Optional, Set
+
+from GameLog import GameRecord, ReplayHandler, TalkRecord, VoteRecord
+from StatsStore import StatsStore
+
+from aiwolf import Agent, Role, Topic
+
+# 投票宣言と投票の一致を数える StatsStore の行動 (役職を問わないので Role.ANY で数える)
+VOTE_ROLE = Role.ANY
+VOTE_DECLARED = "vote_declared"
+VOTE_KEPT = "vote_kept"
+
+
+class VoteTracker(ReplayHandler):
+    """Replay handler that checks whether agents vote for the target they declared (Topic.VOTE) that day.
+
+    The latest declaration of each agent is kept for the current day only and matched against the votes of the day
+    when they arrive (the vote_list of the next day). Only the first vote of a day is counted, revotes are ignored.
+    The counts are kept per opponent name in the StatsStore (events VOTE_DECLARED and VOTE_KEPT),
+    and Profile turns them into the weight of the vote declarations of the agent.
+    """
+
+    def __init__(self, store: Optional[StatsStore] = None) -> None:
+        self.store = store
+        # その日の最新の投票宣言
+        self.day = -1
+        self.declared: Dict[Agent, Agent] = {}
+        # 投票を数えた日と、その日に数えたエージェント
+        self.vote_day = -1
+        self.counted: Set[Agent] = set()
+
+    def game(self, rec: GameRecord) -> None:
+        self.day = -1
+        self.declared.clear()
+        self.vote_day = -1
+        self.counted.clear()
+
+    def talk(self, rec: TalkRecord) -> None:
+        if rec.whisper or rec.topic != Topic.VOTE:
+            return
+        if rec.day != self.day:
+            self.day = rec.day
+            self.declared.clear()
+        self.declared[rec.agent] = rec.target
+
+    def vote(self, rec: VoteRecord) -> None:
+        if rec.day != self.vote_day:
+            self.vote_day = rec.day
+            self.counted.clear()
+        if rec.agent in self.counted:
+            return
+        self.counted.add(rec.agent)
+        # 投票宣言をしていないエージェントは数えない
+        target = self.declared.get(rec.agent) if rec.day == self.day else None
+        if target is None or self.store is None:
+            return
+        self.store.count(rec.agent, VOTE_ROLE, VOTE_DECLARED)
+        if target == rec.target:
+            self.store.count(rec.agent, VOTE_ROLE, VOTE_KEPT)
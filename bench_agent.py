@@ -0,0 +1,91 @@
+import json
+import time
+from argparse import ArgumentParser
+from collections import defaultdict
+from typing import DefaultDict, Dict, Iterable, List, Optional
+
+import numpy as np
+from Protocol import PacketHandler
+from SyntheticGame import ROLE_NUM_MAP, GameScript
+from Util import Util
+
+# エージェント全体のレイテンシのベンチマーク
+# サーバのリクエスト (INITIALIZE, DAILY_INITIALIZE, TALK, VOTE, DIVINE, FINISH など) を SamplePlayer に同じプロセス内で流し、
+# 役職ごと・リクエストごとに応答時間の分布を表示する
+# 合成ゲームを使う (-w で記録) か、記録したリクエスト (-i, JSON Lines) を再生する
+# --mcts でワーカーの数を指定すると、行動を木探索で選ぶ (TreeSearch)
+# python bench_agent.py [-n 5] [-g 20] [-s 0] [-w packets.jsonl] [-i packets.jsonl] [--mcts 0]
+
+
+# パケットを順に処理して、リクエストごとの応答時間 (ms) を times に追加する
+# script を渡すと、プレイヤーの返答を合成ゲームに返す
+def drive(handler: PacketHandler, times: DefaultDict[str, List[float]], script: Optional[GameScript] = None,
+          packets: Optional[Iterable[dict]] = None, record: Optional[list] = None) -> None:
+    gen = script.packets() if script is not None else iter(packets)
+    response: Optional[str] = None
+    while True:
+        try:
+            packet = gen.send(response) if script is not None else next(gen)
+        except StopIteration:
+            return
+        if record is not None:
+            record.append(packet)
+        time_start = time.perf_counter()
+        response = handler.handle(packet)
+        times[packet["request"]].append((time.perf_counter() - time_start) * 1000)
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    a = np.array(values)
+    return {"count": len(a), "p50": float(np.percentile(a, 50)), "p90": float(np.percentile(a, 90)),
+            "p99": float(np.percentile(a, 99)), "max": float(a.max())}
+
+
+def report(role: str, times: Dict[str, List[float]], timeout: Dict[str, int]) -> None:
+    for request, values in sorted(times.items()):
+        p = percentiles(values)
+        limit = timeout["response"] if request in ("INITIALIZE", "DAILY_INITIALIZE", "DAILY_FINISH", "FINISH") else timeout["action"]
+        print(role, request, p["count"], *[round(p[k], 3) for k in ("p50", "p90", "p99", "max")],
+              round(limit - p["max"], 1), sep="\t")
+
+
+if __name__ == "__main__":
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument("-n", type=int, action="store", dest="N", default=5)
+    parser.add_argument("-g", type=int, action="store", dest="games", default=20)
+    parser.add_argument("-s", type=int, action="store", dest="seed", default=0)
+    parser.add_argument("-w", type=str, action="store", dest="write_path", default=None)
+    parser.add_argument("-i", type=str, action="store", dest="input_path", default=None)
+    parser.add_argument("--mcts", type=int, action="store", dest="mcts_workers", default=None)
+    input_args = parser.parse_args()
+
+    import sample
+    tree_search = None
+    if input_args.mcts_workers is not None:
+        from TreeSearch import TreeSearch
+        tree_search = TreeSearch(input_args.mcts_workers)
+    Util.debug_mode = False
+    timeout = {"action": 3000, "response": 6000}
+    print("role\trequest\tcount\tp50[ms]\tp90[ms]\tp99[ms]\tmax[ms]\theadroom[ms]")
+    if input_args.input_path is not None:
+        # 記録したリクエストの再生 (1行1パケット)
+        times: DefaultDict[str, List[float]] = defaultdict(list)
+        with open(input_args.input_path) as f:
+            drive(PacketHandler(sample.SamplePlayer(tree_search=tree_search), "bench"), times, packets=(json.loads(line) for line in f))
+        report("-", times, timeout)
+    else:
+        recorded: Optional[list] = [] if input_args.write_path is not None else None
+        for role in ROLE_NUM_MAP[input_args.N]:
+            times = defaultdict(list)
+            # 1つのプレイヤーで複数ゲームを続けて行う (サーバに接続したときと同じ)
+            handler = PacketHandler(sample.SamplePlayer(tree_search=tree_search), "bench")
+            for g in range(input_args.games):
+                drive(handler, times, script=GameScript(input_args.N, role, input_args.seed + g), record=recorded)
+            if handler.game_setting is not None:
+                timeout = {"action": getattr(handler.game_setting, "action_timeout", timeout["action"]),
+                           "response": getattr(handler.game_setting, "response_timeout", timeout["response"])}
+            report(role.name, times, timeout)
+        if recorded is not None:
+            with open(input_args.write_path, "w") as f:
+                for packet in recorded:
+                    f.write(json.dumps(packet, separators=(",", ":")) + "\n")
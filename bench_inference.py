@@ -0,0 +1,235 @@
+import json
+import platform
+import random
+import sys
+import time
+from argparse import ArgumentParser
+from itertools import islice
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from Assignment import Assignment
+from GameLog import (DayRecord, GameRecord, Record, ResultRecord,
+                     ScoreMatrixHandler, TalkRecord, VoteRecord, dispatch)
+from MapSolver import MapSolver
+from SyntheticGame import ROLE_NUM_MAP, role_assignment
+from Util import Util
+
+from aiwolf import Agent, Judge, Role, Species, Topic
+from aiwolf.constant import AGENT_NONE
+
+# 推論の処理 (ScoreMatrix, Assignment, Util.unique_permutations, MapSolver) のベンチマーク
+# 乱数の種を固定した合成ゲームで、関数ごとの ops/sec とレイテンシのパーセンタイルを測って JSON に保存する
+# python bench_inference.py [-n 5 15] [-r 200] [-s 0] [-o result.json] [--compare baseline.json] [-t 0.1] [-k filter]
+
+DAYS = 3
+
+
+# 合成ゲームのレコード (GameLog のリプレイと同じ形式)
+# 占い師と狂人は初日に占いCOして毎日占い結果を出し、全員が投票宣言と投票をする (最大 DAYS 日)
+# 戻り値: 日ごとのレコードのリスト (最初の要素は GameRecord を含む0日目)
+def synthetic_game(N: int, my_role: Role, seed: int) -> List[List[Record]]:
+    rng = random.Random(seed)
+    roles = role_assignment(N, 1, my_role)
+    rng.shuffle(roles)
+    # 自分はエージェント1
+    roles.remove(my_role)
+    roles.insert(0, my_role)
+    agents = [Agent(i + 1) for i in range(N)]
+    me = agents[0]
+    role_map = {me: my_role}
+    if my_role == Role.WEREWOLF:
+        role_map = {a: r for a, r in zip(agents, roles) if r == Role.WEREWOLF}
+    days: List[List[Record]] = [[GameRecord(N, me, my_role, ROLE_NUM_MAP[N], role_map)]]
+    alive = list(agents)
+    seers = [a for a, r in zip(agents, roles) if r in (Role.SEER, Role.POSSESSED)]
+    for day in range(DAYS + 1):
+        # 投票できる人がいなくなる前に終わる
+        if len(alive) < 3:
+            break
+        records: List[Record] = days[0] if day == 0 else []
+        last_dead: List[Agent] = []
+        divine_result = None
+        if day >= 1:
+            humans = [a for a in alive if roles[a.agent_idx - 1] != Role.WEREWOLF and a != me]
+            if humans:
+                attacked = rng.choice(humans)
+                alive.remove(attacked)
+                last_dead = [attacked]
+            if my_role == Role.SEER:
+                target = rng.choice([a for a in alive if a != me])
+                divine_result = Judge(me, day, target, Species.WEREWOLF if roles[target.agent_idx - 1] == Role.WEREWOLF else Species.HUMAN)
+        records.append(DayRecord(day, AGENT_NONE, last_dead[0] if last_dead else AGENT_NONE, AGENT_NONE,
+                                 divine_result, None, list(alive), last_dead))
+        turn = 0
+        for a in alive:
+            if day == 0 and a in seers:
+                records.append(TalkRecord(day, turn, a, Topic.COMINGOUT, a, Role.SEER, Species.UNC, False))
+            if day >= 1 and a in seers:
+                target = rng.choice([b for b in alive if b != a])
+                species = rng.choice([Species.HUMAN, Species.WEREWOLF])
+                records.append(TalkRecord(day, turn, a, Topic.DIVINED, target, Role.UNC, species, False))
+        turn += 1
+        votes = {a: rng.choice([b for b in alive if b != a]) for a in alive}
+        for a in alive:
+            records.append(TalkRecord(day, turn, a, Topic.VOTE, votes[a], Role.UNC, Species.UNC, False))
+        if day >= 1:
+            for a in alive:
+                records.append(VoteRecord(day, a, votes[a]))
+            executed = rng.choice(alive)
+            alive.remove(executed)
+            days.append(records)
+    days[-1].append(ResultRecord(True, dict(zip(agents, roles))))
+    return days
+
+
+# func を number 回呼ぶ時間を repeat 回測る
+# 戻り値: ops/sec と1回あたりのレイテンシ (μs) のパーセンタイル
+def measure(func: Callable[[], object], number: int, repeat: int) -> Dict[str, float]:
+    func()  # ウォームアップ
+    samples = np.empty(repeat)
+    for k in range(repeat):
+        time_start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        samples[k] = (time.perf_counter_ns() - time_start) / number / 1000
+    return {
+        "ops_per_sec": float(1e6 / samples.mean()),
+        "p50_us": float(np.percentile(samples, 50)),
+        "p90_us": float(np.percentile(samples, 90)),
+        "p99_us": float(np.percentile(samples, 99)),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+# N人村のベンチマーク項目: (名前, 関数, 1回の計測で呼ぶ回数)
+def cases(N: int, seed: int) -> List[Tuple[str, Callable[[], object], int]]:
+    rng = np.random.default_rng(seed)
+    game = synthetic_game(N, Role.VILLAGER, seed)
+    records = [rec for day in game for rec in day]
+    # 1日目までのレコード (0日目のCOと1日目の占い結果・投票を含む)
+    day1 = game[0] + game[1]
+
+    # 1日目の終わりの状態の ScoreMatrix (ゲーム終了時は既に負けている割り当てが多く、評価がすぐ終わる)
+    handlers = {}
+    for sparse in (False, True):
+        handler = ScoreMatrixHandler(sparse)
+        dispatch(day1, handler)
+        handler.player.game_info = handler.game_info
+        handlers[sparse] = handler
+    sm = handlers[False].score_matrix
+    sparse_sm = handlers[True].score_matrix
+    # 書き込みの計測用 (他の項目の入力を変えないように別の ScoreMatrix を使う)
+    scratch = dispatch(day1, ScoreMatrixHandler()).score_matrix
+    M = sm.M
+    role_list = sm.role_list()
+
+    # 毎回同じ引数にならないように、乱数の引数を順番に使う
+    cells = [tuple(int(x) for x in c) for c in
+             zip(rng.integers(N, size=1024), rng.integers(M, size=1024), rng.integers(N, size=1024), rng.integers(M, size=1024))]
+    scores = rng.normal(0, 3, size=1024).tolist()
+    role_dicts = [{Role.SEER: s, Role.POSSESSED: -s, Role.WEREWOLF: s / 2} for s in scores]
+    agents = [Agent(i + 1) for i in range(N)]
+    counter = iter(range(1 << 62))
+
+    def get_score(m):
+        return lambda: m.get_score(*cells[next(counter) & 1023])
+
+    def add_score():
+        k = next(counter) & 1023
+        i, ri, j, rj = cells[k]
+        scratch.add_score(i, ri, j, rj, scores[k])
+
+    def add_scores():
+        k = next(counter) & 1023
+        scratch.add_scores(agents[k % N], role_dicts[k])
+
+    def set_score():
+        k = next(counter) & 1023
+        i, ri, j, rj = cells[k]
+        scratch.set_score(i, ri, j, rj, scores[k])
+
+    table = Assignment.role_table(role_list)
+    assignments = [Assignment(handlers[sparse].game_info, handlers[sparse].game_setting, handlers[sparse].player,
+                              [sm.regulation.roles[r] for r in table[0]]) for sparse in (False, True)]
+    for a in assignments:
+        a.shuffle()
+
+    def replay(recs: List[Record]) -> Callable[[], object]:
+        return lambda: dispatch(recs, ScoreMatrixHandler())
+
+    return [
+        ("ScoreMatrix.get_score", get_score(sm), 1000),
+        ("SparseScoreMatrix.get_score", get_score(sparse_sm), 1000),
+        ("ScoreMatrix.set_score", set_score, 1000),
+        ("ScoreMatrix.add_score", add_score, 1000),
+        ("ScoreMatrix.add_scores", add_scores, 200),
+        ("Assignment.evaluate", lambda: assignments[0].evaluate(sm), 100),
+        ("Assignment.evaluate[sparse]", lambda: assignments[1].evaluate(sparse_sm), 100),
+        ("Assignment.evaluate_table", lambda: Assignment.evaluate_table(sm.score_matrix, table), 1),
+        ("SparseScoreMatrix.evaluate_table", lambda: sparse_sm.evaluate_table(table), 1),
+        ("Util.unique_permutations", lambda: sum(1 for _ in islice(Util.unique_permutations(role_list), 10000)), 1),
+        ("MapSolver.solve[k=1]", lambda: MapSolver.of(sm).solve(1), 1),
+        ("MapSolver.solve[k=10]", lambda: MapSolver.of(sm).solve(10), 1),
+        ("replay.day1", replay(day1), 1),
+        ("replay.game", replay(records), 1),
+    ]
+
+
+def run(players: List[int], repeat: int, seed: int, keyword: str) -> dict:
+    results: Dict[str, Dict[str, float]] = {}
+    for N in players:
+        for name, func, number in cases(N, seed):
+            key = str(N) + "/" + name
+            if keyword and keyword not in key:
+                continue
+            results[key] = measure(func, number, repeat)
+            r = results[key]
+            print(key, round(r["ops_per_sec"], 1), round(r["p50_us"], 2), round(r["p90_us"], 2), round(r["p99_us"], 2), sep="\t")
+    return {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+                 "seed": seed, "repeat": repeat},
+        "results": results,
+    }
+
+
+# 基準の結果と比べて、p50 が threshold の割合以上遅くなった項目を表示する
+# 戻り値: 遅くなった項目の数
+def compare(result: dict, baseline: dict, threshold: float) -> int:
+    slow = 0
+    print("name\tbaseline_p50[us]\tp50[us]\tratio")
+    for key, r in result["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        ratio = r["p50_us"] / base["p50_us"] if base["p50_us"] > 0 else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "\tSLOWER"
+            slow += 1
+        print(key, round(base["p50_us"], 2), round(r["p50_us"], 2), round(ratio, 2), sep="\t", end=flag + "\n")
+    return slow
+
+
+if __name__ == "__main__":
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument("-n", type=int, nargs="+", action="store", dest="players", default=[5, 15])
+    parser.add_argument("-r", type=int, action="store", dest="repeat", default=200)
+    parser.add_argument("-s", type=int, action="store", dest="seed", default=0)
+    parser.add_argument("-o", type=str, action="store", dest="output", default=None)
+    parser.add_argument("-k", type=str, action="store", dest="keyword", default="")
+    parser.add_argument("-t", type=float, action="store", dest="threshold", default=0.1)
+    parser.add_argument("--compare", type=str, action="store", dest="baseline", default=None)
+    input_args = parser.parse_args()
+
+    Util.debug_mode = False
+    print("name\tops/sec\tp50[us]\tp90[us]\tp99[us]")
+    result = run(input_args.players, input_args.repeat, input_args.seed, input_args.keyword)
+    if input_args.output is not None:
+        with open(input_args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if input_args.baseline is not None:
+        with open(input_args.baseline) as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(result, baseline, input_args.threshold) > 0 else 0)
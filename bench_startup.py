@@ -0,0 +1,60 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+
+# 起動時間のベンチマーク
+# 役職ごとに新しいプロセスで、import sample の時間と、initialize から最初の行動 (talk) までの時間を測る
+# python bench_startup.py [-n 5] [-r 10]
+
+
+def measure(N: int, role_name: str) -> dict:
+    time_start = time.perf_counter()
+    import sample
+    time_import = time.perf_counter()
+    from aiwolf import GameInfo, GameSetting, Role
+    from SyntheticGame import (game_info_packet, game_setting_packet,
+                               role_assignment)
+    from Util import Util
+    Util.debug_mode = False
+    roles = role_assignment(N, 1, Role[role_name])
+    day0 = GameInfo(game_info_packet(1, roles, 0))
+    day1 = GameInfo(game_info_packet(1, roles, 1))
+    setting = GameSetting(game_setting_packet(N))
+    time_ready = time.perf_counter()
+    player = sample.SamplePlayer()
+    player.initialize(day0, setting)
+    time_initialize = time.perf_counter()
+    player.update(day1)
+    player.day_start()
+    player.talk()
+    time_action = time.perf_counter()
+    return {
+        "import": (time_import - time_start) * 1000,
+        "initialize": (time_initialize - time_ready) * 1000,
+        "first_action": (time_action - time_initialize) * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument("-n", type=int, action="store", dest="N", default=5)
+    parser.add_argument("-r", type=int, action="store", dest="repeat", default=10)
+    parser.add_argument("--child", type=str, action="store", dest="child", default=None)
+    input_args = parser.parse_args()
+    if input_args.child is not None:
+        print(json.dumps(measure(input_args.N, input_args.child)))
+        sys.exit(0)
+
+    from SyntheticGame import ROLE_NUM_MAP
+    print("role\timport[ms]\tinitialize[ms]\tfirst_action[ms]\t(median of", input_args.repeat, "processes)")
+    for role in ROLE_NUM_MAP[input_args.N]:
+        results = []
+        for _ in range(input_args.repeat):
+            out = subprocess.run([sys.executable, __file__, "-n", str(input_args.N), "--child", role.name],
+                                 capture_output=True, text=True, check=True).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+        print(role.name, *[round(statistics.median(r[k] for r in results), 2)
+                           for k in ("import", "initialize", "first_action")], sep="\t")
@@ -1,10 +1,8 @@
-from typing import List
-
-from aiwolf import Agent, GameInfo, GameSetting, Role, Species
+from aiwolf import Agent, GameInfo, GameSetting
 from aiwolf.constant import AGENT_NONE
 
+from GuardPlanner import GuardPlanner
 from o0villager import SampleVillager
-from ScoreMatrix import ScoreMatrix
 
 
 class SampleBodyguard(SampleVillager):
@@ -12,28 +10,36 @@ class SampleBodyguard(SampleVillager):
 
     to_be_guarded: Agent
     """Target of guard."""
+    guard_planner: GuardPlanner
+    """Planner of the guard with the threat model."""
 
     def __init__(self) -> None:
         """Initialize a new instance of SampleBodyguard."""
         super().__init__()
         self.to_be_guarded = AGENT_NONE
+        self.guard_planner = GuardPlanner(self.belief)
 
     def initialize(self, game_info: GameInfo, game_setting: GameSetting) -> None:
         super().initialize(game_info, game_setting)
         self.to_be_guarded = AGENT_NONE
+        self.guard_planner.start(game_info)
+
+    def update(self, game_info: GameInfo) -> None:
+        super().update(game_info)
+        self.guard_planner.update(game_info)
+
+    def choose(self, action: str) -> Agent:
+        if action != "guard":
+            return super().choose(action)
+        # Guard the agent with the largest expected value saved (see GuardPlanner).
+        target: Agent = self.guard_planner.choose(self.game_info)
+        return target if target != AGENT_NONE else self.me
+
+    def commit(self, action: str, target: Agent) -> Agent:
+        if action == "guard":
+            self.to_be_guarded = target
+            self.guard_planner.last_guarded = target if target != self.me else AGENT_NONE
+        return super().commit(action, target)
 
     def guard(self) -> Agent:
-        # Guard one of the alive non-fake seers.
-        candidates: List[Agent] = self.get_alive([j.agent for j in self.divination_reports
-                                                  if j.result != Species.WEREWOLF or j.target != self.me])
-        # Guard one of the alive mediums if there are no candidates.
-        if not candidates:
-            candidates = [a for a in self.comingout_map if self.is_alive(a)
-                          and self.comingout_map[a] == Role.MEDIUM]
-        # Guard one of the alive sagents if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive_others(self.game_info.agent_list)
-        # Update a guard candidate if the candidate is changed.
-        if self.to_be_guarded == AGENT_NONE or self.to_be_guarded not in candidates:
-            self.to_be_guarded = self.random_select(candidates)
-        return self.to_be_guarded if self.to_be_guarded != AGENT_NONE else self.me
+        return self.commit("guard", self.choose("guard"))
@@ -1,12 +1,9 @@
 from collections import deque
-from typing import Deque, List, Optional
+from typing import Deque, Optional
 
-from aiwolf import (Agent, ComingoutContentBuilder, Content, GameInfo,
-                    GameSetting, IdentContentBuilder, Judge, Role, Species,
-                    VoteContentBuilder)
-from aiwolf.constant import AGENT_NONE
+from aiwolf import (ComingoutContentBuilder, Content, GameInfo, GameSetting,
+                    IdentContentBuilder, Judge, Role, Species)
 
-from const import CONTENT_SKIP
 from o0villager import SampleVillager
 
 
@@ -55,27 +52,5 @@ class SampleMedium(SampleVillager):
         if self.has_co and self.my_judge_queue:
             judge: Judge = self.my_judge_queue.popleft()
             return Content(IdentContentBuilder(judge.target, judge.result))
-        # Fake seers.
-        fake_seers: List[Agent] = [j.agent for j in self.divination_reports
-                                   if j.target == self.me and j.result == Species.WEREWOLF]
-        # Vote for one of the alive fake mediums.
-        candidates: List[Agent] = [a for a in self.comingout_map
-                                   if self.is_alive(a) and self.comingout_map[a] == Role.MEDIUM]
-        # Vote for one of the alive agents that were judged as werewolves by non-fake seers
-        # if there are no candidates.
-        if not candidates:
-            reported_wolves: List[Agent] = [j.target for j in self.divination_reports
-                                            if j.agent not in fake_seers and j.result == Species.WEREWOLF]
-            candidates = self.get_alive_others(reported_wolves)
-        # Vote for one of the alive fake seers if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive(fake_seers)
-        # Vote for one of the alive agents if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive_others(self.game_info.agent_list)
-        # Declare which to vote for if not declare yet or the candidate is changed.
-        if self.vote_candidate == AGENT_NONE or self.vote_candidate not in candidates:
-            self.vote_candidate = self.random_select(candidates)
-            if self.vote_candidate != AGENT_NONE:
-                return Content(VoteContentBuilder(self.vote_candidate))
-        return CONTENT_SKIP
+        # Vote for the alive agent most likely to be a werewolf (see TalkPlanner).
+        return self.plan_talk()
@@ -9,6 +9,7 @@ from aiwolf import (Agent, ComingoutContentBuilder, Content,
 from aiwolf.constant import AGENT_NONE
 
 from const import CONTENT_SKIP, JUDGE_EMPTY
+from FakeJudgePlanner import FakeJudgePlanner
 from o0villager import SampleVillager
 
 
@@ -29,6 +30,8 @@ class SamplePossessed(SampleVillager):
     """The number of werewolves."""
     werewolves: List[Agent]
     """Fake werewolves."""
+    fake_judge_planner: FakeJudgePlanner
+    """Planner of the fake divination by rollouts of the rest of the game."""
 
     def __init__(self) -> None:
         """Initialize a new instance of SamplePossessed."""
@@ -40,6 +43,7 @@ class SamplePossessed(SampleVillager):
         self.not_judged_agents = []
         self.num_wolves = 0
         self.werewolves = []
+        self.fake_judge_planner = FakeJudgePlanner(self.belief)
 
     def initialize(self, game_info: GameInfo, game_setting: GameSetting) -> None:
         super().initialize(game_info, game_setting)
@@ -50,13 +54,21 @@ class SamplePossessed(SampleVillager):
         self.not_judged_agents = self.get_others(self.game_info.agent_list)
         self.num_wolves = game_setting.role_num_map.get(Role.WEREWOLF, 0)
         self.werewolves.clear()
+        # Rank the vote targets by the probability of being human (see TalkPlanner).
+        self.talk_planner.start(game_info, werewolf_side=True)
+        self.fake_judge_planner.start(game_info)
 
     def get_fake_judge(self) -> Judge:
         """Generate a fake judgement."""
         target: Agent = AGENT_NONE
-        if self.fake_role == Role.SEER:  # Fake seer chooses a target randomly.
-            if self.game_info.day != 0:
-                target = self.random_select(self.get_alive(self.not_judged_agents))
+        if self.fake_role == Role.SEER:
+            # Fake seer chooses the target and the result that let the werewolves win most likely
+            # (see FakeJudgePlanner), judging as a werewolf only while fewer werewolves are found than exist.
+            if self.game_info.day == 0:
+                return JUDGE_EMPTY
+            candidates: List[Agent] = self.get_alive(self.not_judged_agents)
+            return self.fake_judge_planner.judge(self.game_info, candidates,
+                                                 candidates if len(self.werewolves) < self.num_wolves else [])
         elif self.fake_role == Role.MEDIUM:
             target = self.game_info.executed_agent \
                 if self.game_info.executed_agent is not None \
@@ -95,19 +107,12 @@ class SamplePossessed(SampleVillager):
                 return Content(DivinedResultContentBuilder(judge.target, judge.result))
             elif self.fake_role == Role.MEDIUM:
                 return Content(IdentContentBuilder(judge.target, judge.result))
-        # Vote for one of the alive fake werewolves.
+        # Vote for one of the alive fake werewolves to be consistent with the fake judgements.
         candidates: List[Agent] = self.get_alive(self.werewolves)
-        # Vote for one of the alive agent that declared itself the same role of Possessed
-        # if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive([a for a in self.comingout_map
-                                         if self.comingout_map[a] == self.fake_role])
-        # Vite for one of the alive agents if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive_others(self.game_info.agent_list)
-        # Declare which to vote for if not declare yet or the candidate is changed.
-        if self.vote_candidate == AGENT_NONE or self.vote_candidate not in candidates:
-            self.vote_candidate = self.random_select(candidates)
-            if self.vote_candidate != AGENT_NONE:
+        if candidates:
+            if self.vote_candidate not in candidates:
+                self.vote_candidate = self.random_select(candidates)
                 return Content(VoteContentBuilder(self.vote_candidate))
-        return CONTENT_SKIP
+            return CONTENT_SKIP
+        # Otherwise vote for the alive agent most likely to be a human.
+        return self.plan_talk()
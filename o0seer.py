@@ -3,10 +3,10 @@ from typing import Deque, List, Optional
 
 from aiwolf import (Agent, ComingoutContentBuilder, Content,
                     DivinedResultContentBuilder, GameInfo, GameSetting, Judge,
-                    Role, Species, VoteContentBuilder)
+                    Role, Species)
 from aiwolf.constant import AGENT_NONE
 
-from const import CONTENT_SKIP
+from DivinePlanner import DivinePlanner
 from o0villager import SampleVillager
 
 
@@ -23,6 +23,8 @@ class SampleSeer(SampleVillager):
     """Agents that have not been divined."""
     werewolves: List[Agent]
     """Found werewolves."""
+    divine_planner: DivinePlanner
+    """Planner of the divination by the information gain."""
 
     def __init__(self) -> None:
         """Initialize a new instance of SampleSeer."""
@@ -32,6 +34,7 @@ class SampleSeer(SampleVillager):
         self.my_judge_queue = deque()
         self.not_divined_agents = []
         self.werewolves = []
+        self.divine_planner = DivinePlanner(self.belief)
 
     def initialize(self, game_info: GameInfo, game_setting: GameSetting) -> None:
         super().initialize(game_info, game_setting)
@@ -40,6 +43,7 @@ class SampleSeer(SampleVillager):
         self.my_judge_queue.clear()
         self.not_divined_agents = self.get_others(self.game_info.agent_list)
         self.werewolves.clear()
+        self.divine_planner.start(game_info)
 
     def day_start(self) -> None:
         super().day_start()
@@ -61,23 +65,14 @@ class SampleSeer(SampleVillager):
         if self.has_co and self.my_judge_queue:
             judge: Judge = self.my_judge_queue.popleft()
             return Content(DivinedResultContentBuilder(judge.target, judge.result))
-        # Vote for one of the alive werewolves.
-        candidates: List[Agent] = self.get_alive(self.werewolves)
-        # Vote for one of the alive fake seers if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive([a for a in self.comingout_map
-                                         if self.comingout_map[a] == Role.SEER])
-        # Vote for one of the alive agents if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive_others(self.game_info.agent_list)
-        # Declare which to vote for if not declare yet or the candidate is changed.
-        if self.vote_candidate == AGENT_NONE or self.vote_candidate not in candidates:
-            self.vote_candidate = self.random_select(candidates)
-            if self.vote_candidate != AGENT_NONE:
-                return Content(VoteContentBuilder(self.vote_candidate))
-        return CONTENT_SKIP
+        # Vote for the alive agent most likely to be a werewolf (see TalkPlanner).
+        # The found werewolves are certain in my belief, so they come first.
+        return self.plan_talk()
 
     def divine(self) -> Agent:
-        # Divine a agent randomly chosen from undivined agents.
-        target: Agent = self.random_select(self.not_divined_agents)
+        # Divine the agent whose result is expected to tell the most about the roles (see DivinePlanner).
+        target: Agent = self.divine_planner.divine(self.game_info)
+        # Divine a agent randomly chosen from undivined agents if there is no candidate.
+        if target == AGENT_NONE:
+            target = self.random_select(self.not_divined_agents)
         return target if target != AGENT_NONE else self.me
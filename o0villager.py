@@ -1,12 +1,13 @@
 import random
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from aiwolf import (AbstractPlayer, Agent, Content, GameInfo, GameSetting,
-                    Judge, Role, Species, Status, Talk, Topic,
-                    VoteContentBuilder)
+                    Judge, Role, Status, Talk, Topic)
 from aiwolf.constant import AGENT_NONE
 
+from Belief import Belief
 from const import CONTENT_SKIP
+from TalkPlanner import TalkPlanner
 
 
 class SampleVillager(AbstractPlayer):
@@ -28,6 +29,10 @@ class SampleVillager(AbstractPlayer):
     """Time series of identification reports."""
     talk_list_head: int
     """Index of the talk to be analysed next."""
+    belief: Belief
+    """ScoreMatrix of the game from my point of view."""
+    talk_planner: TalkPlanner
+    """Planner of the talk with the ranking of the vote targets."""
 
     def __init__(self) -> None:
         """Initialize a new instance of SampleVillager."""
@@ -39,6 +44,8 @@ class SampleVillager(AbstractPlayer):
         self.divination_reports = []
         self.identification_reports = []
         self.talk_list_head = 0
+        self.belief = Belief()
+        self.talk_planner = TalkPlanner(self.belief)
 
     def is_alive(self, agent: Agent) -> bool:
         """Return whether the agent is alive.
@@ -105,6 +112,8 @@ class SampleVillager(AbstractPlayer):
         self.comingout_map.clear()
         self.divination_reports.clear()
         self.identification_reports.clear()
+        self.belief.start(game_info, game_setting)
+        self.talk_planner.start(game_info)
 
     def day_start(self) -> None:
         self.talk_list_head = 0
@@ -125,29 +134,47 @@ class SampleVillager(AbstractPlayer):
             elif content.topic == Topic.IDENTIFIED:
                 self.identification_reports.append(Judge(talker, game_info.day, content.target, content.result))
         self.talk_list_head = len(game_info.talk_list)  # All done.
+        self.belief.update(game_info)
 
     def talk(self) -> Content:
-        # Choose an agent to be voted for while talking.
-        #
-        # The list of fake seers that reported me as a werewolf.
-        fake_seers: List[Agent] = [j.agent for j in self.divination_reports
-                                   if j.target == self.me and j.result == Species.WEREWOLF]
-        # Vote for one of the alive agents that were judged as werewolves by non-fake seers.
-        reported_wolves: List[Agent] = [j.target for j in self.divination_reports
-                                        if j.agent not in fake_seers and j.result == Species.WEREWOLF]
-        candidates: List[Agent] = self.get_alive_others(reported_wolves)
-        # Vote for one of the alive fake seers if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive(fake_seers)
-        # Vote for one of the alive agents if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive_others(self.game_info.agent_list)
-        # Declare which to vote for if not declare yet or the candidate is changed.
-        if self.vote_candidate == AGENT_NONE or self.vote_candidate not in candidates:
-            self.vote_candidate = self.random_select(candidates)
-            if self.vote_candidate != AGENT_NONE:
-                return Content(VoteContentBuilder(self.vote_candidate))
-        return CONTENT_SKIP
+        # Declare the vote target or estimate a werewolf, whichever is expected to persuade more (see TalkPlanner).
+        return self.plan_talk()
+
+    def plan_talk(self) -> Content:
+        """Return the talk chosen by the talk planner, updating the vote candidate.
+
+        Returns:
+            The content to talk, or SKIP if there is nothing worth saying.
+        """
+        content: Optional[Content]
+        content, self.vote_candidate = self.talk_planner.talk(self.game_info, self.vote_candidate)
+        return content if content is not None else CONTENT_SKIP
+
+    def choose(self, action: str) -> Agent:
+        """Return the target of the action without changing any state.
+
+        Used to compute the action ahead of its request (see Speculator).
+
+        Args:
+            action: Name of the action ("vote", "divine", "guard" or "attack").
+
+        Returns:
+            The target the action would choose now.
+        """
+        # The actions of this agent have no side effects.
+        return getattr(self, action)()
+
+    def commit(self, action: str, target: Agent) -> Agent:
+        """Record the target of the action chosen by choose, as the action itself does.
+
+        Args:
+            action: Name of the action ("vote", "divine", "guard" or "attack").
+            target: The target of the action.
+
+        Returns:
+            The target.
+        """
+        return target
 
     def vote(self) -> Agent:
         return self.vote_candidate if self.vote_candidate != AGENT_NONE else self.me
@@ -5,6 +5,7 @@ from aiwolf import (Agent, AttackContentBuilder, ComingoutContentBuilder,
                     Content, GameInfo, GameSetting, Judge, Role, Species)
 from aiwolf.constant import AGENT_NONE
 
+from AttackPlanner import AttackPlanner
 from const import CONTENT_SKIP, JUDGE_EMPTY
 from o0possessed import SamplePossessed
 
@@ -18,6 +19,8 @@ class SampleWerewolf(SamplePossessed):
     """Humans."""
     attack_vote_candidate: Agent
     """The candidate for the attack voting."""
+    attack_planner: AttackPlanner
+    """Planner of the attack shared with the allies through whispers."""
 
     def __init__(self) -> None:
         """Initialize a new instance of SampleWerewolf."""
@@ -25,6 +28,7 @@ class SampleWerewolf(SamplePossessed):
         self.allies = []
         self.humans = []
         self.attack_vote_candidate = AGENT_NONE
+        self.attack_planner = AttackPlanner(self.belief)
 
     def initialize(self, game_info: GameInfo, game_setting: GameSetting) -> None:
         super().initialize(game_info, game_setting)
@@ -35,14 +39,22 @@ class SampleWerewolf(SamplePossessed):
         # Choose fake role randomly.
         self.fake_role = random.choice([r for r in [Role.VILLAGER, Role.SEER, Role.MEDIUM]
                                         if r in self.game_info.existing_role_list])
+        self.attack_planner.start(game_info)
 
     def get_fake_judge(self) -> Judge:
         """Generate a fake judgement."""
         # Determine the target of the fake judgement.
         target: Agent = AGENT_NONE
-        if self.fake_role == Role.SEER:  # Fake seer chooses a target randomly.
-            if self.game_info.day != 0:
-                target = self.random_select(self.get_alive(self.not_judged_agents))
+        if self.fake_role == Role.SEER:
+            # Fake seer chooses the target and the result that let the werewolves win most likely
+            # (see FakeJudgePlanner), judging only humans as werewolves
+            # while fewer werewolves are found than exist.
+            if self.game_info.day == 0:
+                return JUDGE_EMPTY
+            candidates: List[Agent] = self.get_alive(self.not_judged_agents)
+            black_candidates: List[Agent] = [a for a in candidates if a in self.humans] \
+                if len(self.werewolves) < self.num_wolves else []
+            return self.fake_judge_planner.judge(self.game_info, candidates, black_candidates)
         elif self.fake_role == Role.MEDIUM:
             target = self.game_info.executed_agent if self.game_info.executed_agent is not None \
                 else AGENT_NONE
@@ -66,18 +78,27 @@ class SampleWerewolf(SamplePossessed):
         # and declare the target of attack vote after that.
         if self.game_info.day == 0:
             return Content(ComingoutContentBuilder(self.me, self.fake_role))
-        # Choose the target of attack vote.
-        # Vote for one of the agent that did comingout.
-        candidates = [a for a in self.get_alive(self.humans) if a in self.comingout_map]
-        # Vote for one of the alive human agents if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive(self.humans)
-        # Declare which to vote for if not declare yet or the candidate is changed.
-        if self.attack_vote_candidate == AGENT_NONE or self.attack_vote_candidate not in candidates:
-            self.attack_vote_candidate = self.random_select(candidates)
-            if self.attack_vote_candidate != AGENT_NONE:
-                return Content(AttackContentBuilder(self.attack_vote_candidate))
+        # Choose the target of attack vote by the value of each human (see AttackPlanner),
+        # following the target the allies agree on.
+        # Declare which to vote for if not declare yet or the target is changed.
+        target = self.attack_planner.whisper(self.game_info)
+        if target is not None:
+            self.attack_vote_candidate = target
+            return Content(AttackContentBuilder(target))
         return CONTENT_SKIP
 
+    def choose(self, action: str) -> Agent:
+        if action != "attack":
+            return super().choose(action)
+        # Attack the target the allies agree on (see AttackPlanner).
+        target: Agent = self.attack_planner.team_target(self.game_info)
+        return target if target != AGENT_NONE else self.me
+
+    def commit(self, action: str, target: Agent) -> Agent:
+        if action == "attack":
+            self.attack_vote_candidate = target if target != self.me else AGENT_NONE
+            self.attack_planner.last_target = self.attack_vote_candidate
+        return super().commit(action, target)
+
     def attack(self) -> Agent:
-        return self.attack_vote_candidate if self.attack_vote_candidate != AGENT_NONE else self.me
+        return self.commit("attack", self.choose("attack"))
@@ -1,71 +1,212 @@
+import random
+from importlib import import_module
+from typing import Dict, List, Optional, Tuple
+
 from aiwolf import AbstractPlayer, Agent, Content, GameInfo, GameSetting, Role
+from aiwolf.constant import AGENT_NONE
+
+from Budget import Budget
+from EventLog import INFO, EventLog
+from GameLog import GameLogWriter
+from Metrics import FALLBACKS, GAMES
+from Speculator import Speculator
+from Util import Util
 
-from o0bodyguard import SampleBodyguard
-from o0medium import SampleMedium
-from o0possessed import SamplePossessed
-from o0seer import SampleSeer
-from o0villager import SampleVillager
-from o0werewolf import SampleWerewolf
+# Module and class of the agent for each role.
+# The module is imported and the agent is constructed the first time the role is assigned.
+ROLE_AGENTS: Dict[Role, Tuple[str, str]] = {
+    Role.VILLAGER: ("o0villager", "SampleVillager"),
+    Role.BODYGUARD: ("o0bodyguard", "SampleBodyguard"),
+    Role.MEDIUM: ("o0medium", "SampleMedium"),
+    Role.SEER: ("o0seer", "SampleSeer"),
+    Role.POSSESSED: ("o0possessed", "SamplePossessed"),
+    Role.WEREWOLF: ("o0werewolf", "SampleWerewolf"),
+}
 
 
 class SamplePlayer(AbstractPlayer):
 
-    villager: AbstractPlayer
-    bodyguard: AbstractPlayer
-    medium: AbstractPlayer
-    seer: AbstractPlayer
-    possessed: AbstractPlayer
-    werewolf: AbstractPlayer
+    agents: Dict[Role, AbstractPlayer]
+    """Agents constructed so far, by role."""
     player: AbstractPlayer
+    game_log: Optional[GameLogWriter]
+    game_info: Optional[GameInfo]
+    speculator: Speculator
+    """Next actions computed between requests (see speculate)."""
+    tree_search: Optional["TreeSearch"]
+    """Tree search choosing the actions in small villages, if enabled."""
+
+    def __init__(self, log_path: Optional[str] = None, tree_search: Optional["TreeSearch"] = None) -> None:
+        self.agents = {}
+        self.player = None  # type: ignore
+        self.game_log = GameLogWriter(log_path) if log_path is not None else None
+        self.game_info = None
+        self.speculator = Speculator()
+        self.tree_search = tree_search
+
+    def get_agent(self, role: Role) -> AbstractPlayer:
+        """Return the agent for the role, constructing it on first use.
+
+        Args:
+            role: The role.
+
+        Returns:
+            The agent for the role, or the villager agent for a role without its own agent.
+        """
+        if role not in ROLE_AGENTS:
+            role = Role.VILLAGER
+        agent: Optional[AbstractPlayer] = self.agents.get(role)
+        if agent is None:
+            module_name, class_name = ROLE_AGENTS[role]
+            agent = getattr(import_module(module_name), class_name)()
+            self.agents[role] = agent
+        return agent
+
+    def speculate(self) -> None:
+        """Compute the likely next actions before they are requested.
+
+        Called by AsyncClient while waiting for the next request. The synchronous client (start.py without -a)
+        never calls it, so then every action is computed on its request.
+        """
+        if self.player is not None and self.game_info is not None:
+            # No request is being answered, so the engines must not cut their work short.
+            Budget.idle()
+            self.speculator.speculate(self.player, self.game_info, self.game_info.my_role)
+
+    def act(self, action: str) -> Agent:
+        """Return the cached result of the action if it is still valid, otherwise ask the agent.
+
+        If the tree search is enabled and applies to the game, the action is searched for instead (see TreeSearch).
+        If there is no cached result and the time left for the request is shorter than the action usually takes,
+        a heuristic target is returned instead (see fallback).
+
+        Args:
+            action: Name of the action ("vote", "divine", "guard" or "attack").
+
+        Returns:
+            The target of the action.
+        """
+        EventLog.enter(action)
+        if self.tree_search is not None and self.game_info is not None and self.tree_search.applies(self.game_info, action):
+            searched: Agent = self.tree_search.choose(self.player.belief, self.game_info, action)
+            if searched != AGENT_NONE:
+                return self.player.commit(action, searched)
+        # 先読みした結果は状態を変えずに計算されているので、使うときに行動の副作用を反映する
+        agent: Optional[Agent] = self.speculator.take(action, self.game_info) if self.game_info is not None else None
+        if agent is not None:
+            return self.player.commit(action, agent)
+        if self.game_info is not None and Budget.short(action):
+            agent = self.fallback(action)
+            FALLBACKS.inc()
+            EventLog.log("time", INFO, "budget_fallback", action=action, target=agent,
+                         remaining=round(Budget.deadline().remaining(), 1), expected=round(Budget.expected(action), 1))
+            # 測らなかった分だけ見込みを減らす (一度遅かっただけで、ずっと代わりの対象を返さないように)
+            Budget.skip(action)
+            return self.player.commit(action, agent)
+        Budget.enter(action)
+        try:
+            return getattr(self.player, action)()
+        finally:
+            Budget.leave(action)
+
+    def fallback(self, action: str) -> Agent:
+        """Return a target of the action chosen without inference.
+
+        Args:
+            action: Name of the action ("vote", "divine", "guard" or "attack").
 
-    def __init__(self) -> None:
-        self.villager = SampleVillager()
-        self.bodyguard = SampleBodyguard()
-        self.medium = SampleMedium()
-        self.seer = SampleSeer()
-        self.possessed = SamplePossessed()
-        self.werewolf = SampleWerewolf()
-        self.player = self.villager
+        Returns:
+            The declared vote candidate for a vote, otherwise an alive agent chosen randomly
+            (excluding myself, and the allies for an attack).
+        """
+        game_info = self.game_info
+        candidates: List[Agent] = [a for a in game_info.alive_agent_list
+                                   if a != game_info.me and (action != "attack" or a not in game_info.role_map)]
+        vote_candidate: Optional[Agent] = getattr(self.player, "vote_candidate", None)
+        if action == "vote" and vote_candidate in candidates:
+            return vote_candidate
+        return random.choice(candidates) if candidates else game_info.me
 
     def attack(self) -> Agent:
-        return self.player.attack()
+        return self.act("attack")
 
     def day_start(self) -> None:
-        self.player.day_start()
+        EventLog.enter("day_start")
+        self.speculator.invalidate()
+        Budget.enter("day_start")
+        try:
+            self.player.day_start()
+        finally:
+            Budget.leave("day_start")
 
     def divine(self) -> Agent:
-        return self.player.divine()
+        return self.act("divine")
 
     def finish(self) -> None:
+        EventLog.enter("finish")
+        self.speculator.invalidate()
+        if self.game_log is not None:
+            self.game_log.finish()
+        # 勝敗と対戦相手の行動を数えて、まとめて書き込む
+        if self.game_info is not None:
+            # Profile needs numpy, so it is imported after the first game rather than at startup.
+            import Profile
+            Util.update_win_rate(self.game_info, Util.is_villager_win(self.game_info))
+            Profile.record(Util.stats, self.game_info.role_map, self.player.comingout_map, self.player.divination_reports)
+            Util.stats.flush()
         self.player.finish()
 
     def guard(self) -> Agent:
-        return self.player.guard()
+        return self.act("guard")
 
     def initialize(self, game_info: GameInfo, game_setting: GameSetting) -> None:
-        role: Role = game_info.my_role
-        if role == Role.VILLAGER:
-            self.player = self.villager
-        elif role == Role.BODYGUARD:
-            self.player = self.bodyguard
-        elif role == Role.MEDIUM:
-            self.player = self.medium
-        elif role == Role.SEER:
-            self.player = self.seer
-        elif role == Role.POSSESSED:
-            self.player = self.possessed
-        elif role == Role.WEREWOLF:
-            self.player = self.werewolf
-        self.player.initialize(game_info, game_setting)
+        Budget.configure(getattr(game_setting, "action_timeout", None), getattr(game_setting, "response_timeout", None))
+        Budget.start()
+        Budget.set_role(game_info.my_role.name)
+        GAMES.inc()
+        self.player = self.get_agent(game_info.my_role)
+        self.game_info = game_info
+        EventLog.start_game(game_info.day)
+        self.speculator.invalidate()
+        if self.game_log is not None:
+            self.game_log.start_game(game_info, game_setting)
+        Budget.enter("initialize")
+        try:
+            self.player.initialize(game_info, game_setting)
+        finally:
+            Budget.leave("initialize")
 
     def talk(self) -> Content:
-        return self.player.talk()
+        EventLog.enter("talk")
+        self.speculator.invalidate()
+        Budget.enter("talk")
+        try:
+            return self.player.talk()
+        finally:
+            Budget.leave("talk")
 
     def update(self, game_info: GameInfo) -> None:
-        self.player.update(game_info)
+        # Every request but INITIALIZE starts with update, so the time budget of the request starts here.
+        Budget.start()
+        Budget.enter("update")
+        try:
+            EventLog.day = game_info.day
+            self.game_info = game_info
+            self.speculator.update(game_info)
+            if self.game_log is not None:
+                self.game_log.update(game_info)
+            self.player.update(game_info)
+        finally:
+            Budget.leave("update")
 
     def vote(self) -> Agent:
-        return self.player.vote()
+        return self.act("vote")
 
     def whisper(self) -> Content:
-        return self.player.whisper()
+        EventLog.enter("whisper")
+        self.speculator.invalidate()
+        Budget.enter("whisper")
+        try:
+            return self.player.whisper()
+        finally:
+            Budget.leave("whisper")
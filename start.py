@@ -5,11 +5,44 @@ from aiwolf import AbstractPlayer, TcpipClient
 from sample import SamplePlayer
 
 if __name__ == "__main__":
-    agent: AbstractPlayer = SamplePlayer()
     parser: ArgumentParser = ArgumentParser(add_help=False)
     parser.add_argument("-p", type=int, action="store", dest="port", required=True)
     parser.add_argument("-h", type=str, action="store", dest="hostname", required=True)
     parser.add_argument("-r", type=str, action="store", dest="role", default="none")
     parser.add_argument("-n", type=str, action="store", dest="name")
+    parser.add_argument("-l", type=str, action="store", dest="log_path", default=None)
+    parser.add_argument("-a", action="store_true", dest="use_async")
+    parser.add_argument("-e", type=str, action="store", dest="event_log_path", default=None)
+    parser.add_argument("--log-level", type=str, action="store", dest="log_level", default="*=INFO")
+    parser.add_argument("-s", type=str, action="store", dest="stats_path", default=None)
+    parser.add_argument("-m", type=int, action="store", dest="metrics_port", default=None)
+    parser.add_argument("--metrics-file", type=str, action="store", dest="metrics_path", default=None)
+    parser.add_argument("--mcts", type=int, action="store", dest="mcts_workers", default=None)
+    parser.add_argument("-d", action="store_true", dest="debug_mode")
     input_args = parser.parse_args()
-    TcpipClient(agent, input_args.name, input_args.hostname, input_args.port, input_args.role).connect()
+    if input_args.debug_mode:
+        from Util import Util
+        Util.debug_mode = True
+    if input_args.event_log_path is not None:
+        from EventLog import EventLog
+        EventLog.configure(input_args.event_log_path, input_args.log_level)
+    if input_args.stats_path is not None:
+        from StatsStore import StatsStore
+        from Util import Util
+        Util.stats = StatsStore(input_args.stats_path)
+    if input_args.metrics_port is not None or input_args.metrics_path is not None:
+        from Metrics import Metrics
+        if input_args.metrics_port is not None:
+            Metrics.serve(input_args.metrics_port)
+        if input_args.metrics_path is not None:
+            Metrics.dump(input_args.metrics_path)
+    tree_search = None
+    if input_args.mcts_workers is not None:
+        from TreeSearch import TreeSearch
+        tree_search = TreeSearch(input_args.mcts_workers)
+    agent: AbstractPlayer = SamplePlayer(input_args.log_path, tree_search)
+    if input_args.use_async:
+        from AsyncClient import AsyncClient
+        AsyncClient(agent, input_args.name, input_args.hostname, input_args.port, input_args.role).connect()
+    else:
+        TcpipClient(agent, input_args.name, input_args.hostname, input_args.port, input_args.role).connect()